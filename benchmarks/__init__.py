@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks of the SDK, run from the root of the repository:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.<name>
+
+"""
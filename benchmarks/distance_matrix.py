@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local distance matrices: vectorized blocks against a pure Python loop (on a
+sample), in one process and in a process pool
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.distance_matrix [POINTS]
+
+"""
+
+import sys
+import math
+import time
+import multiprocessing
+
+import numpy
+
+from route4me.sdk.enums import RouteMetricEnum
+from route4me.sdk._internals.matrix import distance_matrix
+
+RADIUS = 3958.7613
+
+METRICS = (
+	RouteMetricEnum.GEODESIC,
+	RouteMetricEnum.EUCLIDEAN,
+	RouteMetricEnum.MANHATTAN,
+)
+
+
+def random_points(n):
+	rnd = numpy.random.RandomState(0)
+	return numpy.column_stack([40 + rnd.rand(n), -74 + rnd.rand(n)])
+
+
+def haversine_loop(points):
+	res = []
+	for lat1, lng1 in points:
+		row = []
+		for lat2, lng2 in points:
+			dlat = math.sin(math.radians(lat2 - lat1) / 2)
+			dlng = math.sin(math.radians(lng2 - lng1) / 2)
+			h = dlat ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * dlng ** 2
+			row.append(2 * RADIUS * math.asin(math.sqrt(h)))
+		res.append(row)
+	return res
+
+
+def seconds(fn, *args, **kwargs):
+	start = time.time()
+	fn(*args, **kwargs)
+	return time.time() - start
+
+
+def main(n):
+	points = random_points(n)
+	sample = points[:500].tolist()
+	pairs = float(n) * n
+
+	loop = seconds(haversine_loop, sample) / (len(sample) ** 2) * pairs
+	print('points: {}, CPUs: {}'.format(n, multiprocessing.cpu_count()))
+	print('{:<12} {:<10} {:>10}'.format('metric', 'mode', 'sec'))
+	print('{:<12} {:<10} {:>10.2f}  (estimated)'.format('GEODESIC', 'loop', loop))
+
+	for metric in METRICS:
+		for mode, processes in [('numpy', 1), ('pool', 0)]:
+			sec = seconds(distance_matrix, points, metric=metric, processes=processes, dtype='float32')
+			print('{:<12} {:<10} {:>10.2f}'.format(metric.name, mode, sec))
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+Import time of ``route4me.sdk`` (cold start of short-living processes),
+measured with ``python -X importtime`` (Python 3.7+)
+
+Exits with non-zero code when the median import time exceeds the budget, or
+when a heavy dependency is imported by ``import route4me.sdk``.
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.import_time [budget_ms]
+
+"""
+
+import re
+import sys
+import subprocess
+
+
+#: Regression budget (median import time), milliseconds
+BUDGET_MS = 50
+
+#: Modules, that must not be imported by ``import route4me.sdk``
+HEAVY = [
+	'requests',
+	'urllib3',
+	'pydash',
+	'arrow',
+	'aiohttp',
+	'route4me.sdk.endpoints',
+	'route4me.sdk.models',
+]
+
+RUNS = 15
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def measure():
+	"""
+	:returns: Cumulative import time of ``route4me.sdk`` (microseconds) and \
+		names of all imported modules
+	:rtype: tuple(int, set)
+	"""
+	res = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', 'import route4me.sdk'],
+		stdout=subprocess.PIPE,
+		stderr=subprocess.PIPE,
+		universal_newlines=True,
+		check=True,
+	)
+
+	us = None
+	modules = set()
+	for line in res.stderr.splitlines():
+		m = _LINE.match(line)
+		if m is None:
+			continue
+		modules.add(m.group(4))
+		if m.group(4) == 'route4me.sdk':
+			us = int(m.group(2))
+	return us, modules
+
+
+def main(budget_ms):
+	times = []
+	modules = set()
+	for _ in range(RUNS):
+		us, imported = measure()
+		times.append(us)
+		modules |= imported
+
+	times.sort()
+	median_ms = times[len(times) // 2] / 1000.0
+
+	print('import route4me.sdk: median {:.1f} ms, min {:.1f} ms ({} runs), budget {} ms'.format(
+		median_ms,
+		times[0] / 1000.0,
+		RUNS,
+		budget_ms,
+	))
+
+	heavy = sorted(m for m in modules if m in HEAVY)
+	ok = True
+	if heavy:
+		print('FAIL: heavy modules are imported: {}'.format(', '.join(heavy)))
+		ok = False
+	if median_ms > budget_ms:
+		print('FAIL: import time is over budget')
+		ok = False
+
+	return 0 if ok else 1
+
+
+if __name__ == '__main__':
+	sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS))
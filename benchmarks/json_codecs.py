@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Encoding and decoding of API payloads with installed JSON codecs
+
+Sample requests and responses are taken from
+``submodules/route4me-api-data-examples``; the addresses of each sample are
+repeated to get an optimization of a realistic size.
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.json_codecs [SCALE]
+
+"""
+
+import os
+import sys
+import glob
+import json
+import timeit
+
+from route4me.sdk._internals.codec import get_codec
+from route4me.sdk._internals.codec import PREFERRED
+
+SAMPLES = os.path.join('submodules', 'route4me-api-data-examples', 'Optimizations', '*.json')
+
+
+def installed_codecs():
+	codecs = []
+	for name in PREFERRED:
+		try:
+			codecs.append(get_codec(name))
+		except ImportError:
+			pass
+	return codecs
+
+
+def load_samples(scale):
+	samples = []
+	for path in sorted(glob.glob(SAMPLES)):
+		with open(path) as f:
+			data = json.load(f)
+
+		if isinstance(data, dict) and data.get('addresses'):
+			data['addresses'] = data['addresses'] * scale
+		samples.append((os.path.basename(path), data))
+	return samples
+
+
+def per_call_ms(fn, arg):
+	number, sec = timeit.Timer(lambda: fn(arg)).autorange()
+	return sec / number * 1000
+
+
+def main(scale):
+	codecs = installed_codecs()
+	samples = load_samples(scale)
+	if not samples:
+		print('no samples found in {}'.format(SAMPLES))
+		return
+
+	print('scale: {}, codecs: {}'.format(scale, ', '.join(c.name for c in codecs)))
+	print('{:<40} {:<10} {:>10} {:>10}'.format('sample', 'codec', 'dumps, ms', 'loads, ms'))
+	for name, data in samples:
+		encoded = get_codec('json').dumps(data)
+		for codec in codecs:
+			print('{:<40} {:<10} {:>10.3f} {:>10.3f}'.format(
+				'{} ({} KB)'.format(name, len(encoded) // 1024),
+				codec.name,
+				per_call_ms(codec.dumps, data),
+				per_call_ms(codec.loads, encoded),
+			))
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Peak memory and time of parsing a large optimization: the whole response
+(:func:`json.loads`) vs streaming (:func:`iter_array_items`), with and
+without skipping of heavy subtrees (``directions``, ``path_to_next``)
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.json_stream [ADDRESSES_COUNT]
+
+"""
+
+import sys
+import json
+import time
+import tracemalloc
+
+from route4me.sdk._internals.jsonstream import iter_array_items
+from route4me.sdk._internals.jsonstream import HEAVY_KEYS
+
+CHUNK_SIZE = 65536
+
+
+def make_text(count):
+	def address(i):
+		return {
+			'route_destination_id': i,
+			'alias': 'address #{}'.format(i),
+			'address': '{} Main St, New York, NY'.format(i),
+			'lat': 40.0 + i / 10000.0,
+			'lng': -73.0 - i / 10000.0,
+			'is_depot': i == 0,
+			'sequence_no': i,
+			'path_to_next': [
+				{'lat': 40.0 + j / 1000.0, 'lng': -73.0 - j / 1000.0}
+				for j in range(100)
+			],
+			'directions': [
+				{
+					'location': {'name': 'step', 'time': 10, 'segment_distance': 0.5},
+					'steps': [
+						{'direction': 'Head north', 'distance': 0.1, 'duration_sec': 5}
+						for _ in range(5)
+					],
+				}
+				for _ in range(5)
+			],
+		}
+
+	return json.dumps({
+		'optimization_problem_id': '07372F2CF3814EC6DFFAFE92E22771AA',
+		'state': 4,
+		'addresses': [address(i) for i in range(count)],
+	}).encode('utf-8')
+
+
+def chunks(text):
+	for i in range(0, len(text), CHUNK_SIZE):
+		yield text[i:i + CHUNK_SIZE]
+
+
+def loads(text):
+	for a in json.loads(b''.join(chunks(text)).decode('utf-8'))['addresses']:
+		a['lat']
+
+
+def stream(text, skip=()):
+	for a in iter_array_items(chunks(text), 'addresses', skip=skip):
+		a['lat']
+
+
+def measure(fn, *args):
+	"""
+	Seconds and peak memory (bytes, measured in a separate run: tracing
+	slows down parsing)
+	"""
+	t = time.time()
+	fn(*args)
+	sec = time.time() - t
+
+	tracemalloc.start()
+	fn(*args)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return sec, peak
+
+
+def main(count):
+	text = make_text(count)
+
+	print('addresses: {}, response: {:.1f} MB'.format(count, len(text) / 1e6))
+	print('{:<14} {:>10} {:>14}'.format('mode', 'sec', 'peak, MB'))
+	for name, fn, args in (
+		('json.loads', loads, (text,)),
+		('stream', stream, (text,)),
+		('stream, skip', stream, (text, HEAVY_KEYS)),
+	):
+		sec, peak = measure(fn, *args)
+		print('{:<14} {:>10.2f} {:>14.1f}'.format(name, sec, peak / 1e6))
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+Memory allocations of model access: views (current models) vs copies
+
+The previous implementation of models copied raw data: each
+``Optimization(raw)`` and each access to ``Optimization.addresses`` items
+created a new :class:`dict`. This benchmark materializes all addresses of
+an optimization as models and compares allocations of current views with
+allocations of copies.
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.models_allocations [ADDRESSES_COUNT]
+
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+from route4me.sdk.models import Address
+from route4me.sdk.models import Optimization
+
+
+def make_raw(count):
+	return {
+		'optimization_problem_id': '07372F2CF3814EC6DFFAFE92E22771AA',
+		'state': 4,
+		'parameters': {'route_name': 'benchmark', 'algorithm_type': 3},
+		'addresses': [
+			{
+				'route_destination_id': i,
+				'alias': 'address #{}'.format(i),
+				'address': '{} Main St, New York, NY'.format(i),
+				'lat': 40.0 + i / 10000.0,
+				'lng': -73.0 - i / 10000.0,
+				'is_depot': i == 0,
+				'sequence_no': i,
+				'time': 300,
+				'geocoded': True,
+				'failed_geocoding': False,
+				'route_id': 'F0C842829D8799067F9BF7A495076335',
+			}
+			for i in range(count)
+		],
+	}
+
+
+def views(raw):
+	return list(Optimization(raw).addresses)
+
+
+def copies(raw):
+	opt = dict(raw)
+	return [Address(dict(r)) for r in opt['addresses']]
+
+
+def allocations(fn, raw):
+	"""
+	Memory blocks and bytes, allocated (and still held) by models
+	"""
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	models = fn(raw)
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+
+	stats = after.compare_to(before, 'filename')
+	blocks = sum(st.count_diff for st in stats)
+	size = sum(st.size_diff for st in stats)
+
+	del models
+	return blocks, size
+
+
+def read_time(fn, raw, number=20):
+	"""
+	Seconds per full pass over addresses (reading one field)
+	"""
+	def read():
+		for a in fn(raw):
+			a.latitude
+
+	return timeit.timeit(read, number=number) / number
+
+
+def main(count):
+	raw = make_raw(count)
+
+	print('addresses: {}'.format(count))
+	print('{:<8} {:>10} {:>12} {:>12}'.format('mode', 'blocks', 'bytes', 'pass, ms'))
+	for name, fn in (('views', views), ('copies', copies)):
+		blocks, size = allocations(fn, raw)
+		sec = read_time(fn, raw)
+		print('{:<8} {:>10} {:>12} {:>12.3f}'.format(name, blocks, size, sec * 1000))
+
+
+if __name__ == '__main__':
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark of model property access: compiled key-lookup chains vs
+parsing the dotted path with :mod:`pydash` on each access
+
+Usage:
+
+.. code-block:: bash
+
+	$ python -m benchmarks.property_access
+
+"""
+
+import timeit
+
+import pydash
+
+from route4me.sdk.models import Optimization
+from route4me.sdk._internals.decorators import compile_getter
+from route4me.sdk._internals.decorators import compile_setter
+
+
+RAW = {
+	'optimization_problem_id': '07372F2CF3814EC6DFFAFE92E22771AA',
+	'state': 4,
+	'parameters': {
+		'route_name': 'benchmark',
+		'algorithm_type': 3,
+		'member_id': 44143,
+		'route_date': 1504137600,
+		'route_time': 16281,
+	},
+}
+
+NUMBER = 100000
+
+
+def bench(name, stmt):
+	sec = timeit.timeit(stmt, number=NUMBER)
+	print('{:<40} {:>10.3f} us'.format(name, sec / NUMBER * 1e6))
+
+
+def main():
+	path = 'parameters.member_id'
+	getter = compile_getter(path)
+	setter = compile_setter(path)
+
+	print('{} calls each'.format(NUMBER))
+
+	bench('pydash.get', lambda: pydash.get(RAW, path))
+	bench('compiled getter', lambda: getter(RAW))
+	bench('pydash.set_', lambda: pydash.set_(RAW, path, 1))
+	bench('compiled setter', lambda: setter(RAW, 1))
+
+	opt = Optimization(RAW)
+	bench('Optimization.member_id', lambda: opt.member_id)
+	bench('Optimization.algorithm_type', lambda: opt.algorithm_type)
+	bench('Optimization.state', lambda: opt.state)
+	bench('Optimization.route_datetime', lambda: opt.route_datetime)
+
+
+if __name__ == '__main__':
+	main()
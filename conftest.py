@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+Configuration of pytest for the whole repository
+"""
+
+import sys
+
+import mock
+import pytest
+
+from route4me.sdk.self_test import FakeClock
+
+#: Modules, that measure intervals with the monotonic clock
+CLOCK_MODULES = (
+	'route4me.sdk._internals.ratelimit',
+	'route4me.sdk._internals.breaker',
+	'route4me.sdk._internals.timeouts',
+)
+
+collect_ignore = []
+
+if sys.version_info < (3, 5):
+	# async def and await: syntax errors before Python 3.5
+	collect_ignore.extend([
+		'route4me/sdk/aio.py',
+		'route4me/sdk/self_test_aio.py',
+		'route4me/sdk/_internals/aionet.py',
+		'route4me/sdk/_internals/aionet_test.py',
+		'route4me/sdk/_internals/callbacks_aio.py',
+		'route4me/sdk/_internals/callbacks_aio_test.py',
+		'route4me/sdk/endpoints/optimizations_aio.py',
+		'route4me/sdk/endpoints/optimizations_aio_test.py',
+	])
+
+
+@pytest.fixture
+def clock():
+	"""
+	:class:`~route4me.sdk.self_test.FakeClock` in place of the monotonic
+	clock of the SDK
+	"""
+	c = FakeClock()
+	patchers = [mock.patch(module + '._clock', c) for module in CLOCK_MODULES]
+	for p in patchers:
+		p.start()
+	try:
+		yield c
+	finally:
+		for p in patchers:
+			p.stop()
@@ -11,14 +11,14 @@
 
 Look out the appropriate section for details.
 
+Endpoints (and their dependencies) are imported on the first access, so
+``import route4me.sdk`` stays cheap for short-living processes.
+
 """
 
+import sys
 import logging
-
-from .endpoints.geocodings import Geocodings
-from .endpoints.members import Members
-from .endpoints.optimizations import Optimizations
-from .endpoints.telematics import Telematics
+import importlib
 
 from .version import PROJECT
 from .version import COPYRIGHT
@@ -51,6 +51,38 @@
 	'ApiClient',
 ]
 
+#: Lazy attributes of the module: ``name -> submodule``
+_LAZY_ATTRIBUTES = {
+	'Geocodings': '.endpoints.geocodings',
+	'Members': '.endpoints.members',
+	'Optimizations': '.endpoints.optimizations',
+	'Telematics': '.endpoints.telematics',
+}
+
+if sys.version_info >= (3, 5):
+	_LAZY_ATTRIBUTES['AsyncApiClient'] = '.aio'
+	__all__.append('AsyncApiClient')
+
+
+def _import_attribute(name):
+	module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+	value = getattr(module, name)
+	globals()[name] = value
+	return value
+
+
+def __getattr__(name):
+	# PEP 562, Python 3.7+
+	if name not in _LAZY_ATTRIBUTES:
+		raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+	return _import_attribute(name)
+
+
+if sys.version_info < (3, 7):
+	# no module-level __getattr__, import everything now
+	for _name in list(_LAZY_ATTRIBUTES):
+		_import_attribute(_name)
+
 
 class ApiClient(object):
 	"""
@@ -59,11 +91,26 @@ class ApiClient(object):
 	Provides an access to API's endpoints through a convenient interface. In
 	other words, all the power of Route4Me API is accessible through this
 	class.
+
+	All endpoints share one network client, and therefore one pool of
+	keep-alive connections. Close the client when it is not needed anymore:
+
+	.. code-block:: python
+
+		with ApiClient(api_key='11111111111111111111111111111111') as r4m:
+			opt = r4m.optimizations.get('07372F2CF3814EC6DFFAFE92E22771AA')
 	"""
 
 	version = __version__
 
-	def __init__(self, api_key=None):
+	def __init__(self, api_key=None, **network_options):
+		"""
+		:param api_key: Route4Me API key
+		:type api_key: str
+		:param network_options: Options of the network client (connection \
+			pool size, keep-alive, timeouts per API method etc.), see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		"""
 		log.info(
 			'Init Route4Me Python SDK [%s] build [%s] commit [%s]',
 			self.version,
@@ -71,28 +118,50 @@ def __init__(self, api_key=None):
 			__commit__,
 		)
 
-		nc = NetworkClient(api_key=api_key)
+		nc = NetworkClient(api_key=api_key, **network_options)
+		self._network_client = nc
 
 		resource_params = {
 			'api_key': api_key,
 			'_network_client': nc,
 		}
 
+		self._resource_params = resource_params
+		self._endpoints = {}
+
 		self.activity_feed   = {}  # noqa: E221  # TODO: implement
 		self.addresses       = {}  # noqa: E221  # TODO: implement
 		self.address_book    = {}  # noqa: E221  # TODO: implement
 		self.avoidance_zones = {}  # noqa: E221  # TODO: implement
-		self._geocodings = Geocodings(**resource_params)
-		self._members = Members(**resource_params)
 		self.notes           = {}  # noqa: E221  # TODO: implement
-		self._optimizations = Optimizations(**resource_params)
 		self.orders          = {}  # noqa: E221  # TODO: implement
 		self.routes          = {}  # noqa: E221  # TODO: implement
-		self._telematics = Telematics(**resource_params)
 		self.territories     = {}  # noqa: E221  # TODO: implement
 		self.tracking        = {}  # noqa: E221  # TODO: implement
 		self.vehicles        = {}  # noqa: E221  # TODO: implement
 
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def close(self):
+		"""
+		Closes all pooled connections, shared by endpoints
+		"""
+		self._network_client.close()
+
+	def _endpoint(self, name):
+		"""
+		Creates the endpoint on the first access (importing its module)
+		"""
+		ep = self._endpoints.get(name)
+		if ep is None:
+			cls = _import_attribute(name)
+			ep = self._endpoints.setdefault(name, cls(**self._resource_params))
+		return ep
+
 	@property
 	def geocodings(self):
 		"""
@@ -101,11 +170,11 @@ def geocodings(self):
 		:returns: Geocoding namespace
 		:rtype: :class:`~endpoints.geocodings.Geocodings`
 		"""
-		return self._geocodings
+		return self._endpoint('Geocodings')
 
 	@property
 	def members(self):
-		return self._members
+		return self._endpoint('Members')
 
 	@property
 	def optimizations(self):
@@ -115,8 +184,8 @@ def optimizations(self):
 		:returns: Optimization namespace
 		:rtype: :class:`~endpoints.optimizations.Optimizations`
 		"""
-		return self._optimizations
+		return self._endpoint('Optimizations')
 
 	@property
 	def telematics(self):
-		return self._telematics
+		return self._endpoint('Telematics')
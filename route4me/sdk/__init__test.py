@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import sys
+import subprocess
+
 import pytest
+import mock
 
+import route4me.sdk
 from . import ApiClient
+from ._internals.net import NetworkClient
+from ._internals.ratelimit import TokenBucket
 
 
 class TestApiClient:
@@ -34,3 +41,68 @@ def test_has_resource_attr(self, resource_name):
 		route4me = ApiClient(api_key='11111111111111111111111111111111')
 
 		assert hasattr(route4me, resource_name)
+
+	def test_endpoints_share_network_client(self):
+		route4me = ApiClient(api_key='11111111111111111111111111111111')
+
+		nc = route4me._network_client
+		assert route4me.optimizations._Optimizations__nc is nc
+
+	def test_network_options(self):
+		route4me = ApiClient(
+			api_key='11111111111111111111111111111111',
+			pool_maxsize=3,
+		)
+
+		adapter = route4me._network_client.session.get_adapter('https://route4me.com')
+		assert adapter._pool_maxsize == 3
+
+	def test_context_manager_closes_connections(self):
+		with mock.patch.object(NetworkClient, 'close') as mock_close:
+			with ApiClient(api_key='11111111111111111111111111111111'):
+				assert not mock_close.called
+
+		mock_close.assert_called_once_with()
+
+	def test_rate_limit_is_shared_by_endpoints(self):
+		limiter = TokenBucket(rate=10)
+		route4me = ApiClient(api_key='11111111111111111111111111111111', rate_limit=limiter)
+
+		assert route4me._network_client.rate_limit is limiter
+		assert route4me.optimizations._Optimizations__nc.rate_limit is limiter
+
+	def test_endpoint_is_created_once(self):
+		route4me = ApiClient(api_key='11111111111111111111111111111111')
+
+		assert route4me.optimizations is route4me.optimizations
+
+
+class TestLazyImport:
+	@pytest.mark.skipif(sys.version_info < (3, 7), reason='endpoints are imported eagerly without PEP 562')
+	def test_import_does_not_load_heavy_modules(self):
+		code = (
+			'import sys, route4me.sdk; '
+			'print(",".join(sorted(m for m in sys.modules if m in ('
+			'"requests", "pydash", "arrow", "aiohttp", "route4me.sdk.endpoints", '
+			'"email.utils"'
+			'))))'
+		)
+		out = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+
+		assert out.strip() == ''
+
+	@pytest.mark.parametrize('name', [
+		'Geocodings',
+		'Members',
+		'Optimizations',
+		'Telematics',
+	])
+	def test_lazy_endpoint_attribute(self, name):
+		cls = getattr(route4me.sdk, name)
+
+		assert cls.__name__ == name
+		assert cls.__module__ == 'route4me.sdk.endpoints.{}'.format(name.lower())
+
+	def test_unknown_attribute(self):
+		with pytest.raises(AttributeError):
+			route4me.sdk.NoSuchEndpoint
@@ -1,8 +1,50 @@
 # -*- coding: utf-8 -*-
 
+import time
 import datetime
 
-import arrow
+try:
+	UTC = datetime.timezone.utc
+except AttributeError:  # pragma: no cover
+	# python 2
+	class _UTC(datetime.tzinfo):
+		def utcoffset(self, dt):
+			return datetime.timedelta(0)
+
+		def tzname(self, dt):
+			return 'UTC'
+
+		def dst(self, dt):
+			return datetime.timedelta(0)
+
+	UTC = _UTC()
+
+
+#: Monotonic clock (seconds) of timeouts, rate limits and circuit breakers
+monotonic = getattr(time, 'monotonic', time.time)
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=UTC)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _timestamp(dt):
+	"""
+	Unix timestamp (int, seconds) of the datetime, naive datetime is treated
+	as UTC. Fractions of seconds are dropped (like :func:`calendar.timegm`).
+	"""
+	days = dt.toordinal() - _EPOCH_ORDINAL
+	ts = days * _SECONDS_PER_DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+	offset = dt.utcoffset()
+	if offset:
+		ts -= offset.days * _SECONDS_PER_DAY + offset.seconds
+
+	return ts
+
+
+def _floor_day(dt):
+	return dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
 def unix_timestamp_today(tz=None):
@@ -14,31 +56,89 @@ def unix_timestamp_today(tz=None):
 	:returns: Unix-timestamp (seconds) for today
 	:rtype: int
 	"""
-	return arrow.get(tz).floor('day').timestamp
+	if tz is None:
+		now = int(time.time())
+		return now - now % _SECONDS_PER_DAY
+
+	return _timestamp(_floor_day(datetime.datetime.now(tz)))
 
 
 def timestamp_and_seconds2datetime(ts, sec=0):
+	"""
+	Combines unix timestamp and seconds (from the start of the day) into
+	:class:`~datetime.datetime`
+
+	:param ts: Unix timestamp (seconds)
+	:type ts: int
+	:param sec: Seconds, added to :paramref:`~timestamp_and_seconds2datetime.ts`, \
+		defaults to 0
+	:type sec: int, optional
+	:returns: tz-aware datetime in UTC, or :data:`None` if \
+		:paramref:`~timestamp_and_seconds2datetime.ts` is :data:`None`
+	:rtype: ~datetime.datetime
+	"""
 
 	if ts is None:
 		return None
 	if sec is None:
 		sec = 0
 
-	dd = arrow.get(int(ts) + int(sec))
-	return dd.datetime
+	return _EPOCH + datetime.timedelta(seconds=int(ts) + int(sec))
 
 
 def datetime2timestamp_and_seconds(dt):
+	"""
+	Splits :class:`~datetime.datetime` into unix timestamp of the start of the
+	day (in the timezone of :paramref:`~datetime2timestamp_and_seconds.dt`) and
+	seconds from the start of the day. Naive datetime is treated as UTC.
+
+	:param dt: Datetime
+	:type dt: ~datetime.datetime
+	:returns: Pair: unix timestamp of the day start, seconds
+	:rtype: tuple(int, int)
+	:raises TypeError: if not a datetime was passed
+	"""
 	if not isinstance(dt, datetime.datetime):
 		raise TypeError('dt', 'datetime.datetime expected!')
 
-	adt = arrow.get(dt)
-
-	ts = adt.floor('day').timestamp
-	sec = adt.timestamp - ts
+	ts = _timestamp(_floor_day(dt))
+	sec = _timestamp(dt) - ts
 	return ts, sec
 
 
+def timestamps_and_seconds2datetimes(pairs):
+	"""
+	Vectorized :func:`timestamp_and_seconds2datetime`: converts many pairs
+	at once
+
+	:param pairs: Pairs of unix timestamps and seconds
+	:type pairs: iterable(tuple(int, int))
+	:returns: Datetimes (or :data:`None`), in order of pairs
+	:rtype: list(~datetime.datetime)
+	"""
+	epoch = _EPOCH
+	td = datetime.timedelta
+
+	return [
+		None if ts is None else epoch + td(seconds=int(ts) + int(sec or 0))
+		for ts, sec in pairs
+	]
+
+
+def datetimes2timestamps_and_seconds(dts):
+	"""
+	Vectorized :func:`datetime2timestamp_and_seconds`: converts many
+	datetimes at once
+
+	:param dts: Datetimes
+	:type dts: iterable(~datetime.datetime)
+	:returns: Pairs of unix timestamps and seconds, in order of datetimes
+	:rtype: list(tuple(int, int))
+	:raises TypeError: if not a datetime was passed
+	"""
+	return [datetime2timestamp_and_seconds(dt) for dt in dts]
+
+
 def add_limit_offset_to_query_string(limit, offset, qs):
 	if limit is not None:
 		qs['limit'] = limit
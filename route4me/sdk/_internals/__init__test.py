@@ -3,10 +3,39 @@
 import pytest
 import datetime
 
+import mock
 import pytz
 
+from . import UTC
+from . import unix_timestamp_today
 from . import timestamp_and_seconds2datetime
 from . import datetime2timestamp_and_seconds
+from . import timestamps_and_seconds2datetimes
+from . import datetimes2timestamps_and_seconds
+
+
+class Test_unix_timestamp_today(object):
+
+	def test_utc(self):
+		# 2017-08-31T04:31:21+00:00
+		with mock.patch('time.time', return_value=1504153881.5):
+			act = unix_timestamp_today()
+
+		assert act == 1504137600
+
+	@pytest.mark.parametrize('tz', [
+		UTC,
+		pytz.utc,
+		pytz.FixedOffset(180),
+		pytz.FixedOffset(-300),
+		pytz.timezone('America/New_York'),
+	])
+	def test_midnight_in_tz(self, tz):
+		act = unix_timestamp_today(tz)
+
+		dt = datetime.datetime.fromtimestamp(act, tz)
+		assert (dt.hour, dt.minute, dt.second) == (0, 0, 0)
+		assert dt.date() == datetime.datetime.now(tz).date()
 
 
 class Test_timestamp_and_seconds2datetime(object):
@@ -99,3 +128,75 @@ def test_normal_conversion_in_0300(self, dt, exp_ts, exp_sec):
 
 		assert act_ts == exp_ts
 		assert act_sec == exp_sec
+
+	@pytest.mark.parametrize('dt, exp_ts, exp_sec', [
+		# naive datetime is UTC
+		(datetime.datetime(2017, 8, 31, 4, 31, 21), 1504137600, 16281),
+		# fractions of seconds are dropped
+		(datetime.datetime(2017, 8, 31, 4, 31, 21, 999999, tzinfo=UTC), 1504137600, 16281),
+		# before epoch
+		(datetime.datetime(1960, 3, 12, 5, 30, 7, 999999), -309484800, 19807),
+		# DST started at 02:00, pytz keeps the offset of the datetime (-04:00)
+		(
+			pytz.timezone('America/New_York').localize(datetime.datetime(2017, 3, 12, 5, 30, 7)),
+			1489291200,
+			19807,
+		),
+	])
+	def test_edge_cases(self, dt, exp_ts, exp_sec):
+		act_ts, act_sec = datetime2timestamp_and_seconds(dt)
+
+		assert act_ts == exp_ts
+		assert act_sec == exp_sec
+
+	def test_dynamic_tz(self):
+		zoneinfo = pytest.importorskip('zoneinfo')
+
+		# DST started at 02:00: the day started at 00:00-05:00
+		dt = datetime.datetime(2017, 3, 12, 5, 30, 7, tzinfo=zoneinfo.ZoneInfo('America/New_York'))
+
+		act_ts, act_sec = datetime2timestamp_and_seconds(dt)
+
+		assert act_ts == 1489294800
+		assert act_sec == 16207
+
+	@pytest.mark.parametrize('dt', [
+		datetime.datetime(2017, 8, 31, 4, 31, 21, tzinfo=pytz.utc),
+		datetime.datetime(2017, 8, 31, 23, 59, 59, tzinfo=pytz.FixedOffset(180)),
+		datetime.datetime(2017, 8, 31, 0, 0, 1, tzinfo=pytz.FixedOffset(-300)),
+	])
+	def test_roundtrip(self, dt):
+		ts, sec = datetime2timestamp_and_seconds(dt)
+
+		assert timestamp_and_seconds2datetime(ts, sec) == dt
+
+
+class Test_vectorized(object):
+
+	def test_timestamps_and_seconds2datetimes(self):
+		act = timestamps_and_seconds2datetimes([
+			(1504137600, 16281),
+			(None, 11),
+			(1400111222, None),
+		])
+
+		assert act == [
+			datetime.datetime(2017, 8, 31, 4, 31, 21, tzinfo=pytz.utc),
+			None,
+			datetime.datetime(2014, 5, 14, 23, 47, 2, tzinfo=pytz.utc),
+		]
+
+	def test_datetimes2timestamps_and_seconds(self):
+		act = datetimes2timestamps_and_seconds([
+			datetime.datetime(2017, 8, 31, 4, 31, 21, tzinfo=pytz.utc),
+			datetime.datetime(2017, 8, 31, 4, 31, 21, tzinfo=pytz.FixedOffset(180)),
+		])
+
+		assert act == [
+			(1504137600, 16281),
+			(1504126800, 16281),
+		]
+
+	def test_datetimes2timestamps_and_seconds_raises_on_wrong_type(self):
+		with pytest.raises(TypeError):
+			datetimes2timestamps_and_seconds([datetime.datetime(2017, 1, 1), 11])
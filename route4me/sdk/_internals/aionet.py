@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+
+"""
+Internal module, provides asynchronous (:mod:`asyncio`) HTTP access to API
+
+Requires `aiohttp <https://pypi.org/project/aiohttp/>`_ (an optional
+dependency of the SDK):
+
+.. code-block:: bash
+
+	$ pip install route4me-sdk[async]
+
+"""
+
+import asyncio
+import logging
+
+from ..errors import Route4MeError
+from ..errors import Route4MeNetworkError
+from ..errors import Route4MeApiError
+
+from ..version import RELEASE_STRING
+from ..version import BUILD
+from ..version import COMMIT
+
+from .net import build_url
+from .net import build_user_agent
+
+from .retry import RetryPolicy
+from .retry import RetryStats
+from .retry import _delay_or_raise
+from .codec import get_codec
+from .timeouts import TimeoutPolicy
+from .timeouts import Deadline
+from .timeouts import derive_deadline
+
+log = logging.getLogger(__name__)
+
+
+def _accept_encoding(aiohttp):
+	"""
+	Encodings of responses, that :mod:`aiohttp` decodes (``br`` only with
+	``brotli`` installed)
+	"""
+	utils = getattr(aiohttp, 'compression_utils', None) or getattr(aiohttp, 'http_parser', None)
+	if getattr(utils, 'HAS_BROTLI', False):
+		return 'gzip, deflate, br'
+	return 'gzip, deflate'
+
+
+def _import_aiohttp():
+	try:
+		import aiohttp
+	except ImportError as exc:  # pragma: no cover
+		raise ImportError(
+			'Async client requires `aiohttp` package, install it with '
+			'`pip install route4me-sdk[async]` ({})'.format(exc)
+		)
+	return aiohttp
+
+
+class AsyncNetworkClient(object):
+	"""
+	Internal asynchronous API-client, a twin of
+	:class:`~route4me.sdk._internals.net.NetworkClient`
+
+	Owns one :class:`aiohttp.ClientSession` with its own connection pool.
+	The session is opened on the first request (inside the running event
+	loop) and should be closed with :meth:`close` or with the async context
+	manager:
+
+	.. code-block:: python
+
+		async with AsyncNetworkClient(api_key) as nc:
+			await nc.get('/api.v4/optimization_problem.php')
+
+	Methods accept ``deadline`` as the sync client does (see
+	:meth:`~route4me.sdk._internals.net.NetworkClient.get`), but deadline
+	scopes of threads do not apply to coroutines.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(
+		self,
+		api_key,
+		base_host='route4me.com',
+		limit=100,
+		limit_per_host=10,
+		keepalive_timeout=15,
+		concurrency=None,
+		timeout_sec=None,
+		scheme='https',
+		subdomains=True,
+		retry=None,
+		rate_limit=None,
+		circuit_breaker=None,
+		json_codec=None,
+		compression=None,
+		timeouts=None,
+	):
+		"""
+		:param api_key: Route4Me API key
+		:type api_key: str
+		:param base_host: API host, defaults to ``route4me.com``
+		:type base_host: str, optional
+		:param limit: Max number of simultaneous connections in the pool
+		:type limit: int, optional
+		:param limit_per_host: Max number of simultaneous connections per \
+			host/subdomain
+		:type limit_per_host: int, optional
+		:param keepalive_timeout: How long (seconds) to keep idle \
+			connections open
+		:type keepalive_timeout: float, optional
+		:param concurrency: Max number of requests in flight (waiting for \
+			response), unlimited by default
+		:type concurrency: int, optional
+		:param timeout_sec: Max duration of one attempt (connecting, \
+			sending and reading the response), seconds, unlimited by default
+		:type timeout_sec: float, optional
+		:param scheme: URL scheme, defaults to ``https``
+		:type scheme: str, optional
+		:param subdomains: Send requests to subdomains of the \
+			:paramref:`~AsyncNetworkClient.base_host`, see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type subdomains: bool, optional
+		:param retry: Retry policy for transient failures, see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type retry: ~route4me.sdk._internals.retry.RetryPolicy, optional
+		:param rate_limit: Client-side rate limiter (waiting for a token does \
+			not block the event loop), see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type rate_limit: ~route4me.sdk._internals.ratelimit.TokenBucket, \
+			optional
+		:param circuit_breaker: Fail fast while an API method is \
+			unavailable, see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type circuit_breaker: \
+			~route4me.sdk._internals.breaker.CircuitBreaker, optional
+		:param json_codec: Codec of request bodies and responses, see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type json_codec: ~route4me.sdk._internals.codec.JsonCodec, optional
+		:param compression: Compression of JSON bodies, see \
+			:class:`~route4me.sdk._internals.net.NetworkClient`
+		:type compression: \
+			~route4me.sdk._internals.compression.Compression, optional
+		:param timeouts: Connect, read and total timeouts per API method, \
+			see :class:`~route4me.sdk._internals.net.NetworkClient`
+		:type timeouts: ~route4me.sdk._internals.timeouts.TimeoutPolicy, \
+			optional
+		"""
+		self._aiohttp = _import_aiohttp()
+
+		self.api_key = api_key
+		self.base_host = base_host
+		self.scheme = scheme
+		self.subdomains = subdomains
+		self.timeout_sec = timeout_sec
+		self.timeouts = timeouts if timeouts is not None else TimeoutPolicy()
+		self.concurrency = concurrency
+		self.retry = retry if retry is not None else RetryPolicy()
+		self._retry_stats = RetryStats()
+		self.rate_limit = rate_limit
+		self.circuit_breaker = circuit_breaker
+		self.json_codec = json_codec if json_codec is not None else get_codec()
+		self.compression = compression
+
+		self._connector_options = {
+			'limit': limit,
+			'limit_per_host': limit_per_host,
+			'keepalive_timeout': keepalive_timeout,
+		}
+
+		self._user_agent = build_user_agent('aiohttp', self._aiohttp.__version__)
+		self._accept_encoding = _accept_encoding(self._aiohttp)
+
+		self._session = None
+		self._semaphore = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	@property
+	def user_agent(self):
+		"""
+		The value of `User-Agent` HTTP-header.
+
+		:rtype: str
+		"""
+		return self._user_agent
+
+	@property
+	def retry_stats(self):
+		"""
+		Retry metrics of the client
+
+		:rtype: ~route4me.sdk._internals.retry.RetryStats
+		"""
+		return self._retry_stats
+
+	@property
+	def session(self):
+		"""
+		Long-living session with the connection pool, shared by all requests
+		of this client. Created on first access, must be accessed inside the
+		running event loop.
+
+		:rtype: aiohttp.ClientSession
+		"""
+		if self._session is None or self._session.closed:
+			aiohttp = self._aiohttp
+			connector = aiohttp.TCPConnector(**self._connector_options)
+			self._session = aiohttp.ClientSession(connector=connector)
+		return self._session
+
+	async def close(self):
+		"""
+		Closes all pooled connections.
+
+		It is safe to call this method several times.
+		"""
+		s = self._session
+		self._session = None
+
+		if s is not None and not s.closed:
+			await s.close()
+
+	def __limiter(self):
+		if self.concurrency is None:
+			return _NoLimit()
+		if self._semaphore is None:
+			self._semaphore = asyncio.Semaphore(self.concurrency)
+		return self._semaphore
+
+	def __url(self, path, subdomain):
+		return build_url(
+			self.base_host,
+			path,
+			subdomain=subdomain if self.subdomains else None,
+			scheme=self.scheme,
+		)
+
+	def __headers(self):
+		return {
+			'User-Agent': self.user_agent,
+			'Route4Me-Agent': self.user_agent,
+			'Route4Me-Agent-Release': RELEASE_STRING,
+			'Route4Me-Agent-Commit': str(COMMIT),
+			'Route4Me-Agent-Build': str(BUILD),
+			'Accept': 'application/json',
+			'Accept-Encoding': self._accept_encoding,
+			'Route4Me-Api-Key': self.api_key or '',
+		}
+
+	def __query(self, query):
+		qs = {}
+		if query:
+			qs.update(query)
+		qs.update({
+			'api_key': self.api_key or '',    # TODO: security issue
+			'format': 'json',
+		})
+
+		# aiohttp accepts only str/int/float values in query, parameters
+		# set to None are left out (as requests does)
+		return dict(
+			(k, str(v) if isinstance(v, bool) else v)
+			for k, v in qs.items()
+			if v is not None
+		)
+
+	async def __request(self, method, path, idempotent=None, timeout_sec=None, deadline=None, **kwargs):
+		if idempotent is None:
+			idempotent = self.retry.is_idempotent(method)
+
+		timeout = self.timeouts.resolve(method, path, timeout_sec)
+		deadline = derive_deadline(timeout.total, Deadline.of(deadline))
+
+		self._retry_stats.record_request()
+
+		attempt = 1
+		while True:
+			if deadline is not None:
+				deadline.check()
+			try:
+				return await self.__guarded_attempt(method, path, timeout=timeout, deadline=deadline, **kwargs)
+			except Route4MeError as exc:
+				delay = _delay_or_raise(self.retry, self._retry_stats, attempt, exc, idempotent, deadline)
+
+			await asyncio.sleep(delay)
+			attempt += 1
+
+	async def __wait_for_token(self, deadline):
+		if self.rate_limit is None:
+			return
+		delay = self.rate_limit.reserve()
+		if delay > 0:
+			await asyncio.sleep(delay if deadline is None else deadline.clamp(delay))
+			if deadline is not None:
+				deadline.check()
+
+	async def __guarded_attempt(self, method, path, **kwargs):
+		# the token is taken before the circuit is checked: waiting for it
+		# says nothing about the API method, and must not hold a trial call
+		await self.__wait_for_token(kwargs.get('deadline'))
+
+		breaker = self.circuit_breaker
+		if breaker is None:
+			return await self.__attempt(method, path, **kwargs)
+
+		circuit = (kwargs.get('subdomain'), path.lstrip('/'))
+		breaker.before_call(circuit)
+
+		try:
+			res = await self.__attempt(method, path, **kwargs)
+		except Route4MeError as exc:
+			breaker.record(circuit, exc)
+			raise
+		except BaseException:
+			# cancelled, or an unexpected error: not a success of the probe
+			breaker.release(circuit)
+			raise
+		breaker.record(circuit)
+		return res
+
+	async def __attempt(
+		self,
+		method,
+		path,
+		query=None,
+		json_data=None,
+		form=None,
+		subdomain=None,
+		timeout=None,
+		deadline=None,
+	):
+		aiohttp = self._aiohttp
+
+		url = self.__url(path, subdomain=subdomain)
+
+		connect, read, total = timeout.connect, timeout.read, self.timeout_sec
+		if deadline is not None:
+			connect, read, total = deadline.clamp(connect), deadline.clamp(read), deadline.clamp(total)
+
+		kwargs = {
+			'params': self.__query(query),
+			'headers': self.__headers(),
+			'timeout': aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read),
+			'max_redirects': 1,
+		}
+		if json_data is not None:
+			if not isinstance(json_data, (bytes, bytearray)):
+				json_data = self.json_codec.dumps(json_data)
+			if self.compression is not None:
+				json_data, encoding = self.compression.compress(json_data)
+				if encoding is not None:
+					kwargs['headers']['Content-Encoding'] = encoding
+			kwargs['data'] = json_data
+			kwargs['headers']['Content-Type'] = 'application/json'
+		if form is not None:
+			kwargs['data'] = form
+
+		log.debug('send request [%s] [%s]', method, url)
+
+		async with self.__limiter():
+			try:
+				async with self.session.request(method, url, **kwargs) as res:
+					body = await res.read()
+					status_code = res.status
+					headers = dict(res.headers)
+
+			except aiohttp.ClientSSLError as exc:
+				err = Route4MeNetworkError(
+					message='SSL check failed',
+					code='route4me.sdk.security.invalid_certificate',
+					inner=exc,
+				)
+				log.error(err, exc_info=True)
+				raise err
+			except aiohttp.TooManyRedirects as exc:
+				err = Route4MeNetworkError(
+					message='Too many redirects',
+					code='route4me.sdk.network.many_redirects',
+					inner=exc,
+				)
+				log.error(err, exc_info=True)
+				raise err
+			except asyncio.TimeoutError as exc:
+				err = Route4MeNetworkError(
+					message='Network timeout (still no bytes received)',
+					code='route4me.sdk.network.timeout',
+					details={
+						'timeout': (connect, read) if total is None else total,
+						'timeout_unit': 'sec',
+						# aiohttp >= 3.10 distinguishes timeouts of connection
+						'request_sent': not isinstance(exc, getattr(aiohttp, 'ConnectionTimeoutError', ())),
+					},
+					inner=exc,
+				)
+				log.error(err, exc_info=True)
+				raise err
+			except aiohttp.ClientPayloadError as exc:
+				err = Route4MeNetworkError(
+					message='Connection lost while reading the response',
+					code='route4me.sdk.network.no_connection',
+					details={
+						'request_sent': True,
+					},
+					inner=exc,
+				)
+				log.error(err, exc_info=True)
+				raise err
+			except aiohttp.ClientConnectionError as exc:
+				err = Route4MeNetworkError(
+					message='Can not connect, check your connection settings',
+					code='route4me.sdk.network.no_connection',
+					details={
+						# connection was not established: the request is not sent
+						'request_sent': not isinstance(exc, aiohttp.ClientConnectorError),
+					},
+					inner=exc,
+				)
+				log.error(err, exc_info=True)
+				raise err
+
+		if status_code >= 300:
+			raise Route4MeApiError(
+				body.decode('utf-8', 'replace'),
+				code='route4me.sdk.api_error',
+				details={
+					'req': '<AsyncRequest, [{}] [{}]>'.format(method, url),
+					'status_code': status_code,
+				},
+				method=method,
+				url=url,
+				status_code=status_code,
+				headers=headers,
+			)
+
+		if not body:
+			return None
+		return self.json_codec.loads(body)
+
+	async def get(self, path, query=None, subdomain=None, timeout_sec=None, deadline=None):
+		return await self.__request(
+			'GET',
+			path,
+			query=query,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			deadline=deadline,
+		)
+
+	async def post(self, path, query=None, data=None, subdomain=None, timeout_sec=None, idempotent=None, deadline=None):
+		return await self.__request(
+			'POST',
+			path,
+			query=query,
+			json_data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			idempotent=idempotent,
+			deadline=deadline,
+		)
+
+	async def put(self, path, query=None, data=None, subdomain=None, timeout_sec=None, deadline=None):
+		return await self.__request(
+			'PUT',
+			path,
+			query=query,
+			json_data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			deadline=deadline,
+		)
+
+	async def delete(self, path, query=None, data=None, subdomain=None, timeout_sec=None, deadline=None):
+		return await self.__request(
+			'DELETE',
+			path,
+			query=query,
+			json_data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			deadline=deadline,
+		)
+
+	async def form(self, path, query=None, data=None, subdomain=None, timeout_sec=None, idempotent=None, deadline=None):
+		"""
+		Posts form data as `application/x-www-form-urlencoded`.
+		"""
+		return await self.__request(
+			'POST',
+			path,
+			query=query,
+			form=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			idempotent=idempotent,
+			deadline=deadline,
+		)
+
+
+class _NoLimit(object):
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		return False
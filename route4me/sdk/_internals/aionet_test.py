@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+import re
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from route4me.sdk.self_test_aio import StubApiServer  # noqa: E402
+from route4me.sdk.self_test_aio import run  # noqa: E402
+
+from .aionet import AsyncNetworkClient  # noqa: E402
+from .retry import RetryPolicy  # noqa: E402
+from .retry import NO_RETRY  # noqa: E402
+from .codec import get_codec  # noqa: E402
+from .breaker import CircuitBreaker  # noqa: E402
+from .compression import Compression  # noqa: E402
+from .timeouts import Timeout  # noqa: E402
+from .timeouts import Deadline  # noqa: E402
+from .timeouts import TimeoutPolicy  # noqa: E402
+from ..errors import Route4MeError  # noqa: E402
+from ..errors import Route4MeNetworkError  # noqa: E402
+from ..errors import Route4MeApiError  # noqa: E402
+from ..self_test import api_error  # noqa: E402
+
+
+class TestAsyncNetworkClient(object):
+	def test_constructor(self):
+		nc = AsyncNetworkClient(api_key='11111111111111111111111111111111')
+
+		assert isinstance(nc, AsyncNetworkClient)
+		assert re.match(r'^aiohttp\/.*Route4Me-Python-SDK\/.*$', nc.user_agent)
+
+	def test_get(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={'ok': 1})
+
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					res = await nc.get('/anything', query={'p1': 1, 'p2': False, 'p3': None})
+
+				return res, srv.requests
+
+		res, requests = run(scenario())
+
+		assert res == {'ok': 1}
+		assert len(requests) == 1
+		r = requests[0]
+		assert r['method'] == 'GET'
+		assert r['path'] == '/anything'
+		assert r['query'] == {
+			'p1': '1',
+			'p2': 'False',
+			'api_key': 'AAAA',
+			'format': 'json',
+		}
+		assert r['headers']['Accept'] == 'application/json'
+		assert r['headers']['Route4Me-Api-Key'] == 'AAAA'
+
+	@pytest.mark.parametrize('method', ['post', 'put', 'delete'])
+	def test_json_body(self, method):
+		async def scenario():
+			async with StubApiServer() as srv:
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					await getattr(nc, method)('anything', data={'a': [1, 2]})
+				return srv.requests
+
+		requests = run(scenario())
+
+		assert requests[0]['method'] == method.upper()
+		assert requests[0]['json'] == {'a': [1, 2]}
+
+	def test_pre_encoded_json_body(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				async with AsyncNetworkClient('AAAA', json_codec=get_codec('json'), **srv.client_options) as nc:
+					await nc.post('anything', data=b'{"a": [1]}')
+				return srv.requests
+
+		requests = run(scenario())
+
+		assert requests[0]['headers']['Content-Type'] == 'application/json'
+		assert requests[0]['json'] == {'a': [1]}
+
+	def test_compressed_json_body(self):
+		data = {'addresses': ['Main St'] * 1000}
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				async with AsyncNetworkClient('AAAA', compression=Compression(), **srv.client_options) as nc:
+					await nc.post('anything', data=data)
+				return srv.requests
+
+		requests = run(scenario())
+
+		assert requests[0]['headers']['Content-Encoding'] == 'gzip'
+		assert 'gzip' in requests[0]['headers']['Accept-Encoding']
+		assert requests[0]['json'] == data
+
+	def test_form(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					await nc.form('anything', data={'a': '1'})
+				return srv.requests
+
+		requests = run(scenario())
+
+		assert requests[0]['headers']['Content-Type'] == 'application/x-www-form-urlencoded'
+		assert requests[0]['body'] == 'a=1'
+
+	def test_raises_on_status_400(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(status_code=404, data={'errors': ['nope']})
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					await nc.get('anything')
+
+		with pytest.raises(Route4MeApiError) as exc_info:
+			run(scenario())
+
+		exc = exc_info.value
+		assert exc.code == 'route4me.sdk.api_error'
+		assert exc.status_code == 404
+		assert exc.method == 'GET'
+
+	def test_raises_on_timeout(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={}, delay=1)
+				async with AsyncNetworkClient('AAAA', retry=NO_RETRY, **srv.client_options) as nc:
+					await nc.get('anything', timeout_sec=0.1)
+
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.code == 'route4me.sdk.network.timeout'
+
+	def test_total_timeout_includes_retries(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				for _ in range(3):
+					srv.add_response(data={}, delay=1)
+				timeouts = TimeoutPolicy(default=Timeout(connect=1, read=0.1, total=0.3))
+				retry = RetryPolicy(max_attempts=10, backoff_factor=0.05, jitter=False)
+				async with AsyncNetworkClient('AAAA', retry=retry, timeouts=timeouts, **srv.client_options) as nc:
+					started = asyncio.get_event_loop().time()
+					try:
+						await nc.get('anything')
+					finally:
+						elapsed = asyncio.get_event_loop().time() - started
+						assert elapsed < 0.5
+						assert len(srv.requests) < 4
+
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.code in ('route4me.sdk.network.timeout', 'route4me.sdk.network.deadline_exceeded')
+
+	def test_cancelled_deadline(self):
+		token = Deadline()
+		token.cancel()
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					try:
+						await nc.get('anything', deadline=token)
+					finally:
+						assert srv.requests == []
+
+		with pytest.raises(Route4MeError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
+
+	def test_raises_on_no_connection(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				opts = srv.client_options
+			# server is stopped here
+			async with AsyncNetworkClient('AAAA', retry=NO_RETRY, **opts) as nc:
+				await nc.get('anything')
+
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.code == 'route4me.sdk.network.no_connection'
+
+	def test_raises_on_incomplete_body(self):
+		async def respond(reader, writer):
+			await reader.readuntil(b'\r\n\r\n')
+			writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 100\r\n\r\n{"a"')
+			await writer.drain()
+			writer.close()
+
+		async def scenario():
+			server = await asyncio.start_server(respond, '127.0.0.1', 0)
+			port = server.sockets[0].getsockname()[1]
+			try:
+				async with AsyncNetworkClient(
+					'AAAA',
+					retry=NO_RETRY,
+					base_host='127.0.0.1:{}'.format(port),
+					scheme='http',
+					subdomains=False,
+				) as nc:
+					await nc.get('anything')
+			finally:
+				server.close()
+				await server.wait_closed()
+
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.code == 'route4me.sdk.network.no_connection'
+		assert exc_info.value.details['request_sent'] is True
+
+	def test_concurrency_limit(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={}, delay=0.05)
+
+				async with AsyncNetworkClient('AAAA', concurrency=2, **srv.client_options) as nc:
+					await asyncio.gather(*[nc.get('anything') for _ in range(6)])
+
+				return srv.max_in_flight, len(srv.requests)
+
+		max_in_flight, cnt = run(scenario())
+
+		assert cnt == 6
+		assert max_in_flight == 2
+
+	def test_cancelled_probe_is_not_success(self):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+		circuit = (None, 'anything')
+		breaker.before_call(circuit)
+		breaker.record(circuit, api_error(503))
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={}, delay=1)
+
+				async with AsyncNetworkClient('AAAA', circuit_breaker=breaker, **srv.client_options) as nc:
+					task = asyncio.ensure_future(nc.get('anything'))
+					await asyncio.sleep(0.1)
+					task.cancel()
+					with pytest.raises(asyncio.CancelledError):
+						await task
+
+		run(scenario())
+
+		assert breaker.state(circuit) == 'half_open'
+
+	def test_rate_limit_wait_does_not_hold_trial_call(self):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+		circuit = (None, 'anything')
+		breaker.before_call(circuit)
+		breaker.record(circuit, api_error(503))
+
+		class Limiter(object):
+			delay = 30
+
+			def reserve(self):
+				return self.delay
+
+		limiter = Limiter()
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={'ok': 1})
+
+				async with AsyncNetworkClient(
+					'AAAA',
+					retry=NO_RETRY,
+					rate_limit=limiter,
+					circuit_breaker=breaker,
+					**srv.client_options
+				) as nc:
+					with pytest.raises(Route4MeNetworkError) as exc_info:
+						await nc.get('anything', deadline=0.05)
+
+					assert exc_info.value.code == 'route4me.sdk.network.deadline_exceeded'
+					# no probe is sent: the circuit is neither closed, nor busy
+					assert breaker.state(circuit) == 'half_open'
+					assert not srv.requests
+
+					limiter.delay = 0
+					return await nc.get('anything', deadline=5)
+
+		assert run(scenario()) == {'ok': 1}
+		assert breaker.state(circuit) == 'closed'
+
+
+class TestAsyncNetworkClientRetry(object):
+	def test_retries_503(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(status_code=503, data={}, headers={'Retry-After': '0'})
+				srv.add_response(data={'ok': 1})
+
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					res = await nc.get('anything')
+
+				return res, len(srv.requests), nc.retry_stats.as_dict()
+
+		res, cnt, stats = run(scenario())
+
+		assert res == {'ok': 1}
+		assert cnt == 2
+		assert stats['retries'] == 1
+		assert stats['reasons'] == {'status:503': 1}
+
+	def test_post_is_not_retried_on_503(self):
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(status_code=503, data={})
+				srv.add_response(data={'ok': 1})
+
+				async with AsyncNetworkClient('AAAA', **srv.client_options) as nc:
+					try:
+						await nc.post('anything', data={})
+					finally:
+						assert len(srv.requests) == 1
+
+		with pytest.raises(Route4MeApiError):
+			run(scenario())
+
+	def test_gives_up(self):
+		retry = RetryPolicy(max_attempts=2, backoff_factor=0)
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(status_code=502, data={})
+
+				async with AsyncNetworkClient('AAAA', retry=retry, **srv.client_options) as nc:
+					try:
+						await nc.get('anything')
+					finally:
+						assert len(srv.requests) == 2
+						assert nc.retry_stats.as_dict()['given_up'] == 1
+
+		with pytest.raises(Route4MeApiError) as exc_info:
+			run(scenario())
+
+		assert exc_info.value.status_code == 502
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helpers for batch operations: many similar requests to the Route4Me API
+"""
+
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from route4me.sdk.utils import BatchResult
+
+from .timeouts import bind_deadline
+from .timeouts import current_deadline
+
+log = logging.getLogger(__name__)
+
+
+def unique(keys):
+	"""
+	Removes duplicates, preserving order
+
+	:param keys: Keys
+	:type keys: iterable
+	:rtype: list
+	"""
+	seen = set()
+	res = []
+	for k in keys:
+		if k not in seen:
+			seen.add(k)
+			res.append(k)
+	return res
+
+
+def map_bounded(fn, keys, concurrency):
+	"""
+	Calls :paramref:`~map_bounded.fn` for each key, using a pool of
+	:paramref:`~map_bounded.concurrency` threads.
+
+	Errors do not stop the batch, they are collected per key. Calls run in
+	the deadline scope of the caller (see
+	:func:`~route4me.sdk._internals.timeouts.deadline_scope`): keys, not
+	started before the deadline, fail with
+	``route4me.sdk.network.deadline_exceeded`` (or
+	``route4me.sdk.cancelled``, if it is cancelled).
+
+	:param fn: Function, that accepts one key
+	:type fn: callable
+	:param keys: Keys
+	:type keys: iterable
+	:param concurrency: Max number of simultaneous calls
+	:type concurrency: int
+	:returns: Results and errors, by key in order of :paramref:`~map_bounded.keys`
+	:rtype: ~route4me.sdk.utils.BatchResult
+	:raises ValueError: if :paramref:`~map_bounded.concurrency` is not positive
+	"""
+	concurrency = int(concurrency)
+	if concurrency <= 0:
+		raise ValueError('concurrency', 'positive int expected')
+
+	keys = unique(keys)
+
+	@bind_deadline
+	def call(key):
+		deadline = current_deadline()
+		if deadline is not None and deadline.expired():
+			return None, deadline.error()
+		try:
+			return fn(key), None
+		except Exception as exc:
+			log.warning('batch item [%s] failed: %s', key, exc)
+			return None, exc
+
+	res = BatchResult()
+	if not keys:
+		return res
+
+	with ThreadPoolExecutor(max_workers=min(concurrency, len(keys))) as executor:
+		for key, (value, exc) in zip(keys, executor.map(call, keys)):
+			if exc is None:
+				res[key] = value
+			else:
+				res.errors[key] = exc
+
+	return res
+
+
+def pipeline(items, send, concurrency, prepare=None, max_pending=None):
+	"""
+	Sends items in two stages: :paramref:`~pipeline.prepare` (like
+	serialization, in a dedicated thread) and :paramref:`~pipeline.send`
+	(in a pool of :paramref:`~pipeline.concurrency` threads). Items are
+	prepared, while previous ones are being sent.
+
+	Items are consumed lazily (a generator is fine): no more than
+	:paramref:`~pipeline.max_pending` items are taken, but not sent yet
+	(backpressure). Errors do not stop the batch, they are collected per
+	item. Calls run in the deadline scope of the caller, as in
+	:func:`map_bounded`.
+
+	:param items: Items to send
+	:type items: iterable
+	:param send: Function, that accepts a prepared item
+	:type send: callable
+	:param concurrency: Max number of simultaneous sends
+	:type concurrency: int
+	:param prepare: Function, that accepts an item and returns what to \
+		send, defaults to the item itself
+	:type prepare: callable, optional
+	:param max_pending: Max number of taken, not sent items, defaults to \
+		``2 * concurrency``
+	:type max_pending: int, optional
+	:returns: Results and errors, by index of the item (in order of \
+		:paramref:`~pipeline.items`)
+	:rtype: ~route4me.sdk.utils.BatchResult
+	:raises ValueError: if :paramref:`~pipeline.concurrency` or \
+		:paramref:`~pipeline.max_pending` is not positive
+	"""
+	concurrency = int(concurrency)
+	if concurrency <= 0:
+		raise ValueError('concurrency', 'positive int expected')
+	max_pending = 2 * concurrency if max_pending is None else int(max_pending)
+	if max_pending <= 0:
+		raise ValueError('max_pending', 'positive int expected')
+
+	slots = threading.BoundedSemaphore(max_pending)
+
+	def release(future):
+		slots.release()
+
+	with ThreadPoolExecutor(max_workers=concurrency) as senders, ThreadPoolExecutor(max_workers=1) as preparer:
+
+		@bind_deadline
+		def send_one(index, value):
+			try:
+				return send(value), None
+			except Exception as exc:
+				log.warning('batch item [%s] failed: %s', index, exc)
+				return None, exc
+
+		@bind_deadline
+		def prepare_one(index, item):
+			deadline = current_deadline()
+			if deadline is not None and deadline.expired():
+				slots.release()
+				return None, deadline.error()
+			try:
+				value = prepare(item) if prepare is not None else item
+			except Exception as exc:
+				slots.release()
+				log.warning('batch item [%s] is not prepared: %s', index, exc)
+				return None, exc
+
+			future = senders.submit(send_one, index, value)
+			future.add_done_callback(release)
+			return future, None
+
+		stages = []
+		for index, item in enumerate(items):
+			# blocks taking items, while the senders are busy
+			slots.acquire()
+			stages.append(preparer.submit(prepare_one, index, item))
+
+		res = BatchResult()
+		for index, stage in enumerate(stages):
+			future, exc = stage.result()
+			if exc is None:
+				value, exc = future.result()
+			if exc is None:
+				res[index] = value
+			else:
+				res.errors[index] = exc
+
+	return res
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from route4me.sdk.utils import BatchResult
+
+from ..errors import Route4MeNetworkError
+
+from .batch import map_bounded
+from .batch import pipeline
+from .batch import unique
+from .timeouts import deadline_scope
+from .timeouts import current_deadline
+
+
+class Test_unique(object):
+	def test_preserves_order(self):
+		assert unique(['b', 'a', 'b', 'c', 'a']) == ['b', 'a', 'c']
+
+
+class Test_map_bounded(object):
+	def test_results_in_order_of_keys(self):
+		res = map_bounded(lambda k: k * 2, [5, 3, 1, 3, 4], concurrency=3)
+
+		assert isinstance(res, BatchResult)
+		assert list(res.items()) == [(5, 10), (3, 6), (1, 2), (4, 8)]
+		assert res.ok is True
+		assert res.errors == {}
+
+	def test_errors_collected_per_key(self):
+		exc = Route4MeNetworkError('boom')
+
+		def fn(k):
+			if k % 2:
+				raise exc
+			return k
+
+		res = map_bounded(fn, range(6), concurrency=2)
+
+		assert list(res.keys()) == [0, 2, 4]
+		assert list(res.errors.keys()) == [1, 3, 5]
+		assert res.errors[1] is exc
+		assert res.ok is False
+
+	def test_concurrency_is_bounded(self):
+		state = {'now': 0, 'max': 0}
+		lock = threading.Lock()
+
+		def fn(k):
+			with lock:
+				state['now'] += 1
+				state['max'] = max(state['max'], state['now'])
+			time.sleep(0.01)
+			with lock:
+				state['now'] -= 1
+			return k
+
+		res = map_bounded(fn, range(20), concurrency=3)
+
+		assert len(res) == 20
+		assert 1 < state['max'] <= 3
+
+	def test_empty(self):
+		res = map_bounded(lambda k: k, [], concurrency=3)
+
+		assert res == {}
+		assert res.ok is True
+
+	def test_raise_on_wrong_concurrency(self):
+		with pytest.raises(ValueError):
+			map_bounded(lambda k: k, [1], concurrency=0)
+
+	def test_deadline(self):
+		def fn(k):
+			# every call spends the whole budget
+			time.sleep(0.05)
+			return current_deadline()
+
+		with deadline_scope(0.02) as d:
+			res = map_bounded(fn, range(4), concurrency=1)
+
+		assert list(res.values()) == [d]
+		assert set(res.errors) == {1, 2, 3}
+		assert res.errors[1].code == 'route4me.sdk.network.deadline_exceeded'
+
+
+class Test_pipeline(object):
+	def test_results_in_order_of_items(self):
+		def send(v):
+			# later items complete first
+			time.sleep(0.001 * (10 - v))
+			return v * 2
+
+		res = pipeline((i for i in range(10)), send, concurrency=4, prepare=lambda i: i + 1)
+
+		assert isinstance(res, BatchResult)
+		assert list(res.items()) == [(i, (i + 1) * 2) for i in range(10)]
+		assert res.ok is True
+
+	def test_errors_collected_per_item(self):
+		exc = Route4MeNetworkError('boom')
+
+		def prepare(i):
+			if i == 1:
+				raise ValueError('not serializable')
+			return i
+
+		def send(i):
+			if i == 2:
+				raise exc
+			return i
+
+		res = pipeline(range(4), send, concurrency=2, prepare=prepare)
+
+		assert list(res.keys()) == [0, 3]
+		assert list(res.errors.keys()) == [1, 2]
+		assert isinstance(res.errors[1], ValueError)
+		assert res.errors[2] is exc
+
+	def test_backpressure(self):
+		taken = []
+		unblock = threading.Event()
+
+		def items():
+			for i in range(100):
+				taken.append(i)
+				yield i
+
+		def send(i):
+			unblock.wait(5)
+			return i
+
+		t = threading.Thread(target=pipeline, args=(items(), send, 2), kwargs={'max_pending': 3})
+		t.start()
+		time.sleep(0.1)
+
+		# pending items and the one, waiting for a free slot
+		assert len(taken) == 4
+
+		unblock.set()
+		t.join(5)
+		assert len(taken) == 100
+
+	def test_prepared_off_sending_threads(self):
+		threads = {'prepare': set(), 'send': set()}
+
+		def prepare(i):
+			threads['prepare'].add(threading.current_thread().name)
+			return i
+
+		def send(i):
+			threads['send'].add(threading.current_thread().name)
+			return i
+
+		pipeline(range(20), send, concurrency=3, prepare=prepare)
+
+		assert len(threads['prepare']) == 1
+		assert not threads['prepare'] & threads['send']
+
+	def test_empty(self):
+		assert pipeline([], lambda i: i, concurrency=2) == {}
+
+	@pytest.mark.parametrize('kwargs', [
+		{'concurrency': 0},
+		{'concurrency': 1, 'max_pending': 0},
+	])
+	def test_raise_on_wrong_limits(self, kwargs):
+		with pytest.raises(ValueError):
+			pipeline([1], lambda i: i, **kwargs)
+
+	def test_deadline(self):
+		def send(i):
+			time.sleep(0.05)
+			return i
+
+		with deadline_scope(0.02):
+			res = pipeline(range(4), send, concurrency=1, max_pending=1)
+
+		assert list(res.keys()) == [0]
+		assert res.errors[1].code == 'route4me.sdk.network.deadline_exceeded'
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+Circuit breaker: fail fast while an API method is unavailable, instead of
+waiting for timeouts
+
+Every API method (``subdomain`` + ``path``) has its own circuit. The circuit
+is *closed* while requests succeed. After ``failure_threshold`` consecutive
+failures it is *open*: requests fail immediately with
+:class:`~route4me.sdk.errors.Route4MeNetworkError` (code
+``route4me.sdk.network.circuit_open``) for ``recovery_timeout`` seconds.
+Then the circuit is *half-open*: up to ``half_open_max_calls`` trial
+requests are sent, success closes the circuit, failure opens it again.
+
+Failures are network errors (timeout, no connection) and ``5xx`` responses;
+other API errors (``4xx``) mean the API is alive.
+"""
+
+import logging
+import threading
+
+from ..errors import Route4MeNetworkError
+from ..errors import Route4MeApiError
+
+from . import monotonic as _clock
+
+log = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+#: Statuses, that count as failures
+FAILURE_STATUSES = frozenset([500, 502, 503, 504])
+
+#: Codes of network errors, that count as failures
+FAILURE_CODES = frozenset([
+	'route4me.sdk.network.timeout',
+	'route4me.sdk.network.no_connection',
+])
+
+
+class _Circuit(object):
+	__slots__ = ('state', 'failures', 'opened_at', 'trials')
+
+	def __init__(self):
+		self.state = CLOSED
+		self.failures = 0
+		self.opened_at = None
+		self.trials = 0
+
+
+class CircuitBreaker(object):
+	"""
+	Thread-safe set of circuits, one per API method
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(
+		self,
+		failure_threshold=5,
+		recovery_timeout=30,
+		half_open_max_calls=1,
+		statuses=FAILURE_STATUSES,
+		codes=FAILURE_CODES,
+	):
+		"""
+		:param failure_threshold: Consecutive failures to open the circuit
+		:type failure_threshold: int, optional
+		:param recovery_timeout: How long (seconds) the circuit stays open \
+			before trial requests
+		:type recovery_timeout: float, optional
+		:param half_open_max_calls: Max number of trial requests at the \
+			same time
+		:type half_open_max_calls: int, optional
+		:param statuses: HTTP statuses, that count as failures
+		:type statuses: set(int), optional
+		:param codes: Codes of network errors, that count as failures
+		:type codes: set(str), optional
+		:raises ValueError: if :paramref:`~CircuitBreaker.failure_threshold` \
+			or :paramref:`~CircuitBreaker.half_open_max_calls` is not positive
+		"""
+		failure_threshold = int(failure_threshold)
+		if failure_threshold <= 0:
+			raise ValueError('failure_threshold', 'positive int expected')
+		half_open_max_calls = int(half_open_max_calls)
+		if half_open_max_calls <= 0:
+			raise ValueError('half_open_max_calls', 'positive int expected')
+
+		self.failure_threshold = failure_threshold
+		self.recovery_timeout = float(recovery_timeout)
+		self.half_open_max_calls = half_open_max_calls
+		self.statuses = frozenset(statuses)
+		self.codes = frozenset(codes)
+
+		self._lock = threading.Lock()
+		self._circuits = {}
+
+	def __repr__(self):
+		return '<CircuitBreaker, failure_threshold={}, recovery_timeout={}>'.format(
+			self.failure_threshold,
+			self.recovery_timeout,
+		)
+
+	def state(self, key):
+		"""
+		:param key: API method, ``(subdomain, path)``
+		:type key: tuple
+		:returns: ``closed``, ``open`` or ``half_open``
+		:rtype: str
+		"""
+		with self._lock:
+			c = self._circuits.get(key)
+			if c is None:
+				return CLOSED
+			if c.state == OPEN and _clock() - c.opened_at >= self.recovery_timeout:
+				return HALF_OPEN
+			return c.state
+
+	def is_failure(self, error):
+		"""
+		:param error: Failure of the request
+		:type error: ~route4me.sdk.errors.Route4MeError
+		:returns: Does the error mean, that the API method is unavailable
+		:rtype: bool
+		"""
+		if isinstance(error, Route4MeApiError):
+			return error.status_code in self.statuses
+		return error.code in self.codes
+
+	def before_call(self, key):
+		"""
+		Checks the circuit before sending the request
+
+		:param key: API method, ``(subdomain, path)``
+		:type key: tuple
+		:raises ~route4me.sdk.errors.Route4MeNetworkError: when the circuit \
+			is open (code ``route4me.sdk.network.circuit_open``)
+		"""
+		with self._lock:
+			c = self._circuits.get(key)
+			if c is None or c.state == CLOSED:
+				return
+
+			if c.state == OPEN:
+				retry_in = self.recovery_timeout - (_clock() - c.opened_at)
+				if retry_in > 0:
+					raise self.__open_error(key, retry_in)
+				c.state = HALF_OPEN
+				c.trials = 0
+				log.info('circuit [%s] is half-open', key)
+
+			if c.trials >= self.half_open_max_calls:
+				raise self.__open_error(key, 0)
+			c.trials += 1
+
+	def record(self, key, error=None):
+		"""
+		Records the outcome of the request
+
+		:param key: API method, ``(subdomain, path)``
+		:type key: tuple
+		:param error: Failure of the request, :data:`None` on success
+		:type error: ~route4me.sdk.errors.Route4MeError, optional
+		"""
+		failed = error is not None and self.is_failure(error)
+
+		with self._lock:
+			c = self._circuits.get(key)
+			if not failed:
+				if c is not None:
+					if c.state != CLOSED:
+						log.info('circuit [%s] is closed', key)
+					del self._circuits[key]
+				return
+
+			if c is None:
+				c = self._circuits[key] = _Circuit()
+
+			c.failures += 1
+			if c.state == HALF_OPEN or c.failures >= self.failure_threshold:
+				if c.state != OPEN:
+					log.warning('circuit [%s] is open after %s failures: %s', key, c.failures, error)
+				c.state = OPEN
+				c.opened_at = _clock()
+				c.trials = 0
+
+	def release(self, key):
+		"""
+		Frees the trial call of a half-open circuit without an outcome: the
+		request was interrupted or failed with an unexpected error, that
+		says nothing about the API method
+
+		:param key: API method, ``(subdomain, path)``
+		:type key: tuple
+		"""
+		with self._lock:
+			c = self._circuits.get(key)
+			if c is not None and c.state == HALF_OPEN and c.trials > 0:
+				c.trials -= 1
+
+	@staticmethod
+	def __open_error(key, retry_in):
+		return Route4MeNetworkError(
+			message='Circuit is open, the API method is unavailable',
+			code='route4me.sdk.network.circuit_open',
+			details={
+				'subdomain': key[0],
+				'path': key[1],
+				'retry_in': max(0.0, retry_in),
+				'retry_in_unit': 'sec',
+				'request_sent': False,
+			},
+		)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ..errors import Route4MeNetworkError
+from ..self_test import api_error
+
+from .breaker import CircuitBreaker
+
+
+KEY = ('www', 'api.v4/optimization_problem.php')
+OTHER_KEY = ('www', 'api.v4/address.php')
+
+
+def timeout_error():
+	return Route4MeNetworkError('error', code='route4me.sdk.network.timeout')
+
+
+def fail(breaker, key, times, error=None):
+	for _ in range(times):
+		breaker.before_call(key)
+		breaker.record(key, error or api_error(503))
+
+
+class TestCircuitBreaker(object):
+	@pytest.mark.parametrize('kwargs', [
+		{'failure_threshold': 0},
+		{'half_open_max_calls': 0},
+	])
+	def test_invalid(self, kwargs):
+		with pytest.raises(ValueError):
+			CircuitBreaker(**kwargs)
+
+	@pytest.mark.parametrize('error, exp', [
+		(api_error(503), True),
+		(api_error(500), True),
+		(api_error(404), False),
+		(api_error(429), False),
+		(timeout_error(), True),
+		(Route4MeNetworkError('ssl', code='route4me.sdk.security.invalid_certificate'), False),
+	])
+	def test_is_failure(self, error, exp):
+		assert CircuitBreaker().is_failure(error) is exp
+
+	def test_opens_after_threshold(self, clock):
+		breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+
+		fail(breaker, KEY, 2, timeout_error())
+		assert breaker.state(KEY) == 'closed'
+
+		fail(breaker, KEY, 1)
+		assert breaker.state(KEY) == 'open'
+
+		clock.now += 4
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			breaker.before_call(KEY)
+
+		exc = exc_info.value
+		assert exc.code == 'route4me.sdk.network.circuit_open'
+		assert exc.details['retry_in'] == 6
+		assert exc.details['path'] == KEY[1]
+
+		# other API methods are not affected
+		breaker.before_call(OTHER_KEY)
+
+	def test_failures_should_be_consecutive(self, clock):
+		breaker = CircuitBreaker(failure_threshold=2)
+
+		fail(breaker, KEY, 1)
+		breaker.record(KEY)
+		fail(breaker, KEY, 1)
+
+		assert breaker.state(KEY) == 'closed'
+
+	def test_client_errors_are_not_failures(self, clock):
+		breaker = CircuitBreaker(failure_threshold=1)
+
+		fail(breaker, KEY, 5, api_error(400))
+
+		assert breaker.state(KEY) == 'closed'
+
+	def test_half_open_success_closes(self, clock):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, half_open_max_calls=1)
+		fail(breaker, KEY, 1)
+
+		clock.now += 10
+		assert breaker.state(KEY) == 'half_open'
+
+		breaker.before_call(KEY)
+		with pytest.raises(Route4MeNetworkError):
+			# only one trial call at the same time
+			breaker.before_call(KEY)
+
+		breaker.record(KEY)
+		assert breaker.state(KEY) == 'closed'
+		breaker.before_call(KEY)
+
+	def test_half_open_failure_opens(self, clock):
+		breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+		fail(breaker, KEY, 3)
+
+		clock.now += 10
+		fail(breaker, KEY, 1)
+
+		assert breaker.state(KEY) == 'open'
+		with pytest.raises(Route4MeNetworkError):
+			breaker.before_call(KEY)
+
+	def test_release(self, clock):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+		fail(breaker, KEY, 1)
+
+		clock.now += 10
+		breaker.before_call(KEY)
+		breaker.release(KEY)
+
+		assert breaker.state(KEY) == 'half_open'
+		# the trial is free again
+		breaker.before_call(KEY)
+
+		# closed circuits are not affected
+		breaker.release(OTHER_KEY)
+		assert breaker.state(OTHER_KEY) == 'closed'
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache of API responses for idempotent ``GET`` requests
+
+Responses are stored as JSON text (every hit returns new objects, so
+callers could modify returned data without corrupting the cache) in a
+pluggable backend: :class:`MemoryCache` (LRU) or :class:`DiskCache`.
+
+Expired responses with validators (``ETag``, ``Last-Modified``) are
+revalidated with conditional requests (``If-None-Match``,
+``If-Modified-Since``): on ``304 Not Modified`` the stored body is used, and
+the response is not downloaded again.
+
+The cache key is built from the subdomain, the path and the query of the
+request. The API key is **not** a part of the key: do not share one cache
+between clients with different API keys.
+
+.. code-block:: python
+
+	cache = ResponseCache(MemoryCache(maxsize=1000), default_ttl=30)
+	r4m = ApiClient(api_key, cache=cache)
+"""
+
+import os
+import json
+import time
+import errno
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+
+from six.moves.urllib.parse import urlencode
+
+log = logging.getLogger(__name__)
+
+# atomic on all platforms (Python 3.3+)
+_replace = getattr(os, 'replace', os.rename)
+
+#: TTL of responses, that never change
+FOREVER = float('inf')
+
+
+class MemoryCache(object):
+	"""
+	In-memory LRU backend (thread-safe)
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, maxsize=1024):
+		"""
+		:param maxsize: Max number of entries, least recently used entries \
+			are evicted
+		:type maxsize: int, optional
+		:raises ValueError: if :paramref:`~MemoryCache.maxsize` is not \
+			positive
+		"""
+		maxsize = int(maxsize)
+		if maxsize <= 0:
+			raise ValueError('maxsize', 'positive int expected')
+
+		self.maxsize = maxsize
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def get(self, key):
+		with self._lock:
+			entry = self._entries.pop(key, None)
+			if entry is not None:
+				# move to the end: most recently used
+				self._entries[key] = entry
+			return entry
+
+	def set(self, key, entry):
+		with self._lock:
+			self._entries.pop(key, None)
+			self._entries[key] = entry
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+
+	def delete(self, key):
+		with self._lock:
+			self._entries.pop(key, None)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+
+class DiskCache(object):
+	"""
+	On-disk backend: one JSON file per entry, could be shared by processes
+
+	Files are replaced atomically. With :paramref:`~DiskCache.maxsize` the
+	least recently used files are removed.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	_SUFFIX = '.json'
+
+	def __init__(self, directory, maxsize=None):
+		"""
+		:param directory: Directory for cache files (created if it is \
+			missing)
+		:type directory: str
+		:param maxsize: Max number of entries, unlimited by default
+		:type maxsize: int, optional
+		"""
+		self.directory = directory
+		self.maxsize = maxsize
+
+		try:
+			os.makedirs(directory)
+		except OSError as exc:
+			if exc.errno != errno.EEXIST:
+				raise
+
+	def __len__(self):
+		return len(self.__files())
+
+	def __path(self, key):
+		name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+		return os.path.join(self.directory, name + self._SUFFIX)
+
+	def __files(self):
+		return [
+			os.path.join(self.directory, n)
+			for n in os.listdir(self.directory)
+			if n.endswith(self._SUFFIX)
+		]
+
+	def get(self, key):
+		path = self.__path(key)
+		try:
+			with open(path, 'r') as f:
+				data = json.load(f)
+			# LRU order is the modification time
+			os.utime(path, None)
+		except (IOError, OSError, ValueError):
+			return None
+
+		if data.get('key') != key:
+			# hash collision
+			return None
+		return data['entry']
+
+	def set(self, key, entry):
+		path = self.__path(key)
+		tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+
+		with open(tmp, 'w') as f:
+			json.dump({'key': key, 'entry': entry}, f)
+		_replace(tmp, path)
+
+		if self.maxsize is not None:
+			self.__evict()
+
+	def delete(self, key):
+		try:
+			os.remove(self.__path(key))
+		except OSError:
+			pass
+
+	def clear(self):
+		for path in self.__files():
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+	def __evict(self):
+		files = []
+		for path in self.__files():
+			try:
+				files.append((os.path.getmtime(path), path))
+			except OSError:
+				pass
+
+		files.sort()
+		for _, path in files[:max(0, len(files) - self.maxsize)]:
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+
+class ResponseCache(object):
+	"""
+	Cache policy: what to store, for how long, and when to invalidate
+
+	TTL of a response is taken from :paramref:`~ResponseCache.ttl` of the
+	path, then from the hint of the endpoint (for example, optimizations in
+	final states are cached :data:`FOREVER`, other ones --- for several
+	seconds), then from :paramref:`~ResponseCache.default_ttl`.
+
+	Mutating requests (``POST``, ``PUT``, ``DELETE``) to the same path
+	invalidate the entry of the same entity (query parameters ending with
+	``_id``). Changes made by other clients are visible only after expiration.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, backend=None, default_ttl=60, ttl=None):
+		"""
+		:param backend: Storage, defaults to :class:`MemoryCache`
+		:type backend: MemoryCache or DiskCache, optional
+		:param default_ttl: TTL (seconds) of responses, defaults to 60
+		:type default_ttl: float, optional
+		:param ttl: TTL per path (like \
+			``api.v4/optimization_problem.php``): number of seconds, or \
+			a function, that accepts the response and returns the number \
+			of seconds. Zero disables caching of the path.
+		:type ttl: dict, optional
+		"""
+		self.backend = backend if backend is not None else MemoryCache()
+		self.default_ttl = default_ttl
+		self.ttl = dict((k.lstrip('/'), v) for k, v in (ttl or {}).items())
+
+		self._lock = threading.Lock()
+		self._hits = 0
+		self._misses = 0
+		self._not_modified = 0
+
+	@property
+	def stats(self):
+		"""
+		:returns: Number of ``hits``, ``misses`` and ``not_modified`` \
+			(misses, served from the stale entry after ``304 Not Modified``)
+		:rtype: dict
+		"""
+		with self._lock:
+			return {
+				'hits': self._hits,
+				'misses': self._misses,
+				'not_modified': self._not_modified,
+			}
+
+	@staticmethod
+	def key(subdomain, path, query=None):
+		"""
+		Builds the cache key of the request
+
+		:param subdomain: Subdomain of the API
+		:type subdomain: str
+		:param path: Path to API method
+		:type path: str
+		:param query: Query parameters (without API key)
+		:type query: dict, optional
+		:rtype: str
+		"""
+		items = sorted(
+			(k, v) for k, v in (query or {}).items()
+			if k not in ('api_key', 'format')
+		)
+		return 'GET {}/{}?{}'.format(subdomain or '', path.lstrip('/'), urlencode(items))
+
+	def ttl_for(self, path, value, hint=None):
+		"""
+		:param path: Path to API method
+		:type path: str
+		:param value: Response (decoded JSON)
+		:param hint: TTL, suggested by the endpoint (number or function)
+		:returns: TTL, seconds
+		:rtype: float
+		"""
+		ttl = self.ttl.get(path.lstrip('/'), hint)
+		if ttl is None:
+			ttl = self.default_ttl
+		if callable(ttl):
+			ttl = ttl(value)
+		return ttl or 0
+
+	def lookup(self, key):
+		"""
+		:returns: Stored response text, :data:`None` if it is missing or \
+			expired
+		:rtype: str
+		"""
+		entry = self.backend.get(key)
+		if entry is not None and entry['expires'] is not None and entry['expires'] <= time.time():
+			if not entry.get('validators'):
+				self.backend.delete(key)
+			entry = None
+
+		with self._lock:
+			if entry is None:
+				self._misses += 1
+				return None
+			self._hits += 1
+		return entry['body']
+
+	def stale_entry(self, key):
+		"""
+		Expired entry, that could be revalidated with a conditional request
+
+		:returns: ``body`` and ``validators`` (``ETag`` and \
+			``Last-Modified`` of the response), :data:`None` if the entry \
+			is missing or has no validators
+		:rtype: dict
+		"""
+		entry = self.backend.get(key)
+		if entry is None or not entry.get('validators'):
+			return None
+		return entry
+
+	@staticmethod
+	def conditional_headers(entry):
+		"""
+		:param entry: Stale entry, see :meth:`stale_entry`
+		:type entry: dict
+		:returns: ``If-None-Match`` and ``If-Modified-Since`` headers
+		:rtype: dict
+		"""
+		headers = {}
+		if entry is None:
+			return headers
+
+		validators = entry['validators']
+		if validators.get('etag'):
+			headers['If-None-Match'] = validators['etag']
+		if validators.get('last_modified'):
+			headers['If-Modified-Since'] = validators['last_modified']
+		return headers
+
+	def store(self, key, body, ttl, headers=None, not_modified=False):
+		"""
+		:param key: Cache key
+		:type key: str
+		:param body: Response text
+		:type body: str
+		:param ttl: TTL, seconds (:data:`FOREVER` for responses, that never \
+			change, zero to skip)
+		:type ttl: float
+		:param headers: Response headers: ``ETag`` and ``Last-Modified`` \
+			are stored to revalidate the entry after expiration (even \
+			with zero TTL)
+		:type headers: dict, optional
+		:param not_modified: The body is taken from the stale entry \
+			(the API responded ``304 Not Modified``)
+		:type not_modified: bool, optional
+		"""
+		if not_modified:
+			with self._lock:
+				self._not_modified += 1
+
+		validators = _validators(headers)
+		if not_modified and not validators:
+			# 304 may omit validators, keep the stored ones
+			old = self.backend.get(key)
+			validators = old.get('validators') if old else None
+
+		if (not ttl or ttl <= 0) and not validators:
+			return
+
+		self.backend.set(key, {
+			'body': body,
+			'expires': None if ttl == FOREVER else time.time() + max(0, ttl or 0),
+			'validators': validators,
+		})
+
+	def invalidate(self, subdomain, path, query=None):
+		"""
+		Invalidates the entry of the entity, changed by a mutating request
+
+		:param subdomain: Subdomain of the API
+		:type subdomain: str
+		:param path: Path to API method
+		:type path: str
+		:param query: Query of the mutating request, parameters ending \
+			with ``_id`` identify the entity
+		:type query: dict, optional
+		"""
+		ids = dict(
+			(k, v) for k, v in (query or {}).items()
+			if k.endswith('_id')
+		)
+		if not ids:
+			return
+
+		key = self.key(subdomain, path, ids)
+		log.debug('invalidate cache [%s]', key)
+		self.backend.delete(key)
+
+	def clear(self):
+		self.backend.clear()
+
+
+def _validators(headers):
+	if not headers:
+		return None
+
+	validators = {}
+	for k, v in headers.items():
+		name = k.lower()
+		if name == 'etag':
+			validators['etag'] = v
+		elif name == 'last-modified':
+			validators['last_modified'] = v
+	return validators or None
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import mock
+
+from .cache import MemoryCache
+from .cache import DiskCache
+from .cache import ResponseCache
+from .cache import FOREVER
+
+
+PATH = 'api.v4/optimization_problem.php'
+
+
+class TestMemoryCache(object):
+	def test_maxsize_should_be_positive(self):
+		with pytest.raises(ValueError):
+			MemoryCache(maxsize=0)
+
+	def test_lru(self):
+		c = MemoryCache(maxsize=2)
+		c.set('a', 1)
+		c.set('b', 2)
+
+		assert c.get('a') == 1
+		c.set('c', 3)
+
+		assert c.get('b') is None
+		assert c.get('a') == 1
+		assert c.get('c') == 3
+		assert len(c) == 2
+
+	def test_delete_and_clear(self):
+		c = MemoryCache()
+		c.set('a', 1)
+		c.set('b', 2)
+
+		c.delete('a')
+		c.delete('missing')
+		assert c.get('a') is None
+
+		c.clear()
+		assert len(c) == 0
+
+
+class TestDiskCache(object):
+	def test_roundtrip(self, tmpdir):
+		c = DiskCache(str(tmpdir.join('cache')))
+		c.set('GET www/a?x=1', {'body': '{}', 'expires': None})
+
+		other = DiskCache(str(tmpdir.join('cache')))
+		assert other.get('GET www/a?x=1') == {'body': '{}', 'expires': None}
+		assert other.get('GET www/a?x=2') is None
+
+		other.delete('GET www/a?x=1')
+		assert c.get('GET www/a?x=1') is None
+
+	def test_eviction(self, tmpdir):
+		c = DiskCache(str(tmpdir), maxsize=2)
+
+		with mock.patch('os.path.getmtime', side_effect=lambda p: 1 if p == c._DiskCache__path('a') else 2):
+			c.set('a', 1)
+			c.set('b', 2)
+			c.set('c', 3)
+
+		assert len(c) == 2
+		assert c.get('a') is None
+		assert c.get('c') == 3
+
+	def test_broken_file(self, tmpdir):
+		c = DiskCache(str(tmpdir))
+		c.set('a', 1)
+		with open(c._DiskCache__path('a'), 'w') as f:
+			f.write('{broken')
+
+		assert c.get('a') is None
+
+
+class TestResponseCache(object):
+	def test_key(self):
+		k1 = ResponseCache.key('www', '/' + PATH, {'b': 2, 'a': 1, 'api_key': 'SECRET'})
+		k2 = ResponseCache.key('www', PATH, {'a': 1, 'b': 2})
+
+		assert k1 == k2
+		assert 'SECRET' not in k1
+		assert k1 == 'GET www/api.v4/optimization_problem.php?a=1&b=2'
+
+	@pytest.mark.parametrize('ttl, hint, exp', [
+		(None, None, 60),
+		(None, 5, 5),
+		(None, lambda res: res['ttl'], 7),
+		({PATH: 10}, 5, 10),
+		({'/' + PATH: 0}, 5, 0),
+		({'other': 10}, None, 60),
+	])
+	def test_ttl_for(self, ttl, hint, exp):
+		cache = ResponseCache(default_ttl=60, ttl=ttl)
+
+		assert cache.ttl_for(PATH, {'ttl': 7}, hint) == exp
+
+	def test_expiration(self):
+		cache = ResponseCache()
+
+		with mock.patch('route4me.sdk._internals.cache.time.time', return_value=1000):
+			cache.store('k', '{"a": 1}', 10)
+			cache.store('forever', '{"a": 2}', FOREVER)
+			cache.store('skipped', '{"a": 3}', 0)
+
+			assert cache.lookup('k') == '{"a": 1}'
+
+		with mock.patch('route4me.sdk._internals.cache.time.time', return_value=1010):
+			assert cache.lookup('k') is None
+			assert cache.lookup('forever') == '{"a": 2}'
+			assert cache.lookup('skipped') is None
+
+		assert cache.stats == {'hits': 2, 'misses': 2, 'not_modified': 0}
+		assert len(cache.backend) == 1
+
+	def test_invalidate(self):
+		cache = ResponseCache()
+		key = cache.key('www', PATH, {'optimization_problem_id': 'A'})
+		cache.store(key, '{}', 60)
+
+		cache.invalidate('www', PATH, {'reoptimize': 1})
+		assert cache.lookup(key) == '{}'
+
+		cache.invalidate('www', PATH, {'optimization_problem_id': 'A', 'reoptimize': 1})
+		assert cache.lookup(key) is None
+
+	def test_validators(self):
+		cache = ResponseCache()
+
+		with mock.patch('route4me.sdk._internals.cache.time.time', return_value=1000):
+			cache.store('k', '{"a": 1}', 0, headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+			cache.store('no-validators', '{"a": 1}', 0, headers={'Content-Type': 'application/json'})
+
+			assert cache.lookup('k') is None
+			stale = cache.stale_entry('k')
+
+		assert stale['body'] == '{"a": 1}'
+		assert cache.conditional_headers(stale) == {
+			'If-None-Match': '"v1"',
+			'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+		}
+		assert cache.stale_entry('no-validators') is None
+		assert cache.conditional_headers(None) == {}
+
+	def test_not_modified_keeps_validators(self):
+		cache = ResponseCache()
+		cache.store('k', '{"a": 1}', 0, headers={'etag': '"v1"'})
+
+		with mock.patch('route4me.sdk._internals.cache.time.time', return_value=1000):
+			cache.store('k', '{"a": 1}', 10, headers={}, not_modified=True)
+
+		with mock.patch('route4me.sdk._internals.cache.time.time', return_value=1005):
+			assert cache.lookup('k') == '{"a": 1}'
+
+		assert cache.stale_entry('k')['validators'] == {'etag': '"v1"'}
+		assert cache.stats['not_modified'] == 1
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+"""
+Receiver of optimization callbacks (``optimized_callback_url``)
+
+Route4Me API calls the callback URL of an optimization, when it is solved
+(or failed). :class:`CallbackReceiver` parses these calls and resolves
+futures of the waiting optimizations, so thousands of them complete without
+polling. The receiver is a WSGI application (wrap it with
+:func:`~route4me.sdk._internals.callbacks_aio.asgi_app` for ASGI), that
+could be mounted into the web application of the service, or served by the
+standalone threaded :class:`CallbackServer`:
+
+.. code-block:: python
+
+	with CallbackServer(port=8080, public_url='https://example.com:8080/') as srv:
+		futures = [
+			r4m.optimizations.create_async_with_callback(data, srv.receiver)
+			for data in problems
+		]
+		for f in concurrent.futures.as_completed(futures):
+			print(f.result().ID, f.result().state)
+
+Callback URLs carry a secret token, callbacks without it are rejected.
+Coroutines could await the futures with :func:`asyncio.wrap_future`.
+"""
+
+import hmac
+import json
+import uuid
+import logging
+import threading
+import collections
+
+from concurrent.futures import Future
+from wsgiref.simple_server import make_server
+from wsgiref.simple_server import WSGIServer
+from wsgiref.simple_server import WSGIRequestHandler
+
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.urllib.parse import parse_qsl
+from six.moves.urllib.parse import urlencode
+
+from ..enums import OptimizationStateEnum
+
+log = logging.getLogger(__name__)
+
+#: States, reported by callbacks of done optimizations
+FINAL_STATES = frozenset([
+	OptimizationStateEnum.OPTIMIZED.value,
+	OptimizationStateEnum.ERROR.value,
+])
+
+#: Max size of the callback body, bytes
+MAX_BODY_SIZE = 64 * 1024
+
+
+class OptimizationCallback(collections.namedtuple('OptimizationCallback', 'ID state timestamp raw')):
+	"""
+	Parsed callback: ``ID`` of the optimization, its ``state``
+	(:class:`~route4me.sdk.enums.OptimizationStateEnum`), ``timestamp``
+	(seconds) and ``raw`` data
+	"""
+	__slots__ = ()
+
+
+def parse_callback(body, content_type=None, query_string=''):
+	"""
+	Parses the callback: JSON or form data in the body, or query string
+	parameters
+
+	:param body: Request body
+	:type body: bytes
+	:param content_type: Value of the ``Content-Type`` header
+	:type content_type: str, optional
+	:param query_string: Query string of the callback URL
+	:type query_string: str, optional
+	:rtype: OptimizationCallback
+	:raises ValueError: if the callback is malformed
+	"""
+	raw = dict(parse_qsl(query_string))
+	raw.pop('token', None)
+
+	if body:
+		text = body.decode('utf-8')
+		if 'json' in (content_type or '') or text.lstrip().startswith('{'):
+			data = json.loads(text)
+			if not isinstance(data, dict):
+				raise ValueError('body', 'JSON object expected')
+		else:
+			data = dict(parse_qsl(text))
+		raw.update(data)
+
+	ID = raw.get('optimization_problem_id')
+	if not ID:
+		raise ValueError('optimization_problem_id', 'required')
+
+	try:
+		state = OptimizationStateEnum(int(raw.get('state')))
+		timestamp = int(raw['timestamp']) if raw.get('timestamp') is not None else None
+	except (TypeError, ValueError):
+		raise ValueError('state', 'integer state and timestamp expected')
+
+	return OptimizationCallback(str(ID), state, timestamp, raw)
+
+
+class CallbackReceiver(object):
+	"""
+	Resolves futures of optimizations with received callbacks (WSGI
+	application, see :func:`~route4me.sdk._internals.callbacks_aio.asgi_app`
+	for ASGI)
+
+	A callback could arrive before the future is requested (the
+	optimization is solved before :meth:`expect` is called): such callbacks
+	are kept (up to ``max_unclaimed``) and resolve the future immediately.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, url=None, secret=None, max_unclaimed=10000):
+		"""
+		:param url: Public URL of the receiver (reachable by Route4Me API), \
+			set by :class:`CallbackServer` when not given
+		:type url: str, optional
+		:param secret: Token, that callbacks should carry, generated by \
+			default
+		:type secret: str, optional
+		:param max_unclaimed: Max number of kept callbacks, that nobody \
+			waits for
+		:type max_unclaimed: int, optional
+		"""
+		self.url = url
+		self.secret = secret if secret is not None else uuid.uuid4().hex
+		self.max_unclaimed = int(max_unclaimed)
+
+		self._lock = threading.Lock()
+		self._futures = {}
+		self._unclaimed = collections.OrderedDict()
+
+	def __repr__(self):
+		return '<CallbackReceiver, url={}, pending={}>'.format(self.url, self.pending)
+
+	@property
+	def callback_url(self):
+		"""
+		Value of ``optimized_callback_url``: the URL with the token
+
+		:rtype: str
+		:raises ValueError: if the URL is not set
+		"""
+		if not self.url:
+			raise ValueError('url', 'the public URL of the receiver is not set')
+		sep = '&' if '?' in self.url else '?'
+		return '{}{}{}'.format(self.url, sep, urlencode({'token': self.secret}))
+
+	@property
+	def pending(self):
+		"""
+		Number of futures, waiting for callbacks
+
+		:rtype: int
+		"""
+		with self._lock:
+			return len(self._futures)
+
+	def expect(self, ID):
+		"""
+		:param ID: Optimization Problem ID
+		:type ID: str
+		:returns: Future, resolved with \
+			:class:`OptimizationCallback` of the solved (or failed) \
+			optimization. Cancel it to stop waiting.
+		:rtype: concurrent.futures.Future
+		"""
+		ID = str(ID)
+		with self._lock:
+			future = self._futures.get(ID)
+			if future is None:
+				future = self._futures[ID] = Future()
+				future.add_done_callback(lambda f: self.__forget(ID, f))
+			callback = self._unclaimed.pop(ID, None)
+
+		if callback is not None:
+			_resolve(future, callback)
+		return future
+
+	def resolve(self, callback):
+		"""
+		Resolves the future of the optimization (callbacks of optimizations
+		in progress are ignored)
+
+		:param callback: Received callback
+		:type callback: OptimizationCallback
+		:returns: Was anybody waiting for the callback
+		:rtype: bool
+		"""
+		if callback.state.value not in FINAL_STATES:
+			return False
+
+		with self._lock:
+			future = self._futures.get(callback.ID)
+			if future is None:
+				self._unclaimed[callback.ID] = callback
+				while len(self._unclaimed) > self.max_unclaimed:
+					self._unclaimed.popitem(last=False)
+				return False
+
+		_resolve(future, callback)
+		return True
+
+	def __forget(self, ID, future):
+		with self._lock:
+			if self._futures.get(ID) is future:
+				del self._futures[ID]
+
+	def handle(self, method, query_string, body, content_type=None):
+		"""
+		Handles the callback request (the transport-independent part of WSGI
+		and ASGI applications)
+
+		:returns: HTTP status and the response body
+		:rtype: tuple(int, bytes)
+		"""
+		if method != 'POST':
+			return 405, b'POST expected'
+
+		token = dict(parse_qsl(query_string)).get('token', '')
+		if not hmac.compare_digest(token.encode('utf-8'), self.secret.encode('utf-8')):
+			log.warning('callback with invalid token rejected')
+			return 403, b'invalid token'
+
+		if len(body) > MAX_BODY_SIZE:
+			return 413, b'too large'
+
+		try:
+			callback = parse_callback(body, content_type, query_string)
+		except ValueError as exc:
+			log.warning('malformed callback: %s', exc)
+			return 400, b'malformed callback'
+
+		log.debug('callback [%s]: %s', callback.ID, callback.state)
+		self.resolve(callback)
+		return 200, b'{"status":true}'
+
+	def __call__(self, environ, start_response):
+		try:
+			size = int(environ.get('CONTENT_LENGTH') or 0)
+		except ValueError:
+			size = 0
+		body = environ['wsgi.input'].read(min(size, MAX_BODY_SIZE + 1)) if size > 0 else b''
+
+		status, payload = self.handle(
+			environ.get('REQUEST_METHOD', 'GET'),
+			environ.get('QUERY_STRING', ''),
+			body,
+			environ.get('CONTENT_TYPE'),
+		)
+		start_response(_STATUS_LINES[status], [
+			('Content-Type', 'application/json' if status == 200 else 'text/plain'),
+			('Content-Length', str(len(payload))),
+		])
+		return [payload]
+
+
+_STATUS_LINES = {
+	200: '200 OK',
+	400: '400 Bad Request',
+	403: '403 Forbidden',
+	405: '405 Method Not Allowed',
+	413: '413 Payload Too Large',
+}
+
+
+def _resolve(future, callback):
+	if future.done():
+		return
+	try:
+		future.set_result(callback)
+	except Exception:
+		# cancelled or resolved concurrently
+		pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+	daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+	def log_message(self, format, *args):
+		log.debug('callback server: ' + format, *args)
+
+
+class CallbackServer(object):
+	"""
+	Standalone HTTP server of :class:`CallbackReceiver`, handles requests
+	in threads
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, receiver=None, host='127.0.0.1', port=0, public_url=None):
+		"""
+		:param receiver: Receiver of callbacks, created by default
+		:type receiver: CallbackReceiver, optional
+		:param host: Interface to listen on
+		:type host: str, optional
+		:param port: Port to listen on, any free one by default
+		:type port: int, optional
+		:param public_url: URL of the server for Route4Me API (when the \
+			server is behind a proxy or NAT), defaults to \
+			``http://host:port/``
+		:type public_url: str, optional
+		"""
+		self.receiver = receiver if receiver is not None else CallbackReceiver()
+		self.host = host
+		self.port = port
+		self.public_url = public_url
+
+		self._server = None
+		self._thread = None
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+	def start(self):
+		"""
+		Starts serving in a background thread
+		"""
+		self._server = make_server(
+			self.host,
+			self.port,
+			self.receiver,
+			server_class=_ThreadingWSGIServer,
+			handler_class=_QuietHandler,
+		)
+		self.port = self._server.server_address[1]
+		if self.receiver.url is None:
+			self.receiver.url = self.public_url or 'http://{}:{}/'.format(self.host, self.port)
+
+		self._thread = threading.Thread(
+			target=self._server.serve_forever,
+			kwargs={'poll_interval': 0.1},
+			name='route4me-sdk-callbacks',
+		)
+		self._thread.daemon = True
+		self._thread.start()
+		log.info('callback server is listening on %s:%s', self.host, self.port)
+
+	def stop(self):
+		"""
+		Stops the server, futures stay pending
+		"""
+		server, self._server = self._server, None
+		if server is not None:
+			server.shutdown()
+			server.server_close()
+			self._thread.join()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+ASGI application of :class:`~route4me.sdk._internals.callbacks.CallbackReceiver`
+(Python 3.5+)
+
+.. code-block:: python
+
+	receiver = CallbackReceiver(url='https://example.com/route4me/callback')
+	app = asgi_app(receiver)    # mount it into the ASGI application
+
+	opt = r4m.optimizations.create_async_with_callback(data, receiver)
+	done = await asyncio.wrap_future(opt)
+"""
+
+from .callbacks import MAX_BODY_SIZE
+
+
+def asgi_app(receiver):
+	"""
+	:param receiver: Receiver of callbacks
+	:type receiver: ~route4me.sdk._internals.callbacks.CallbackReceiver
+	:returns: ASGI application (HTTP only)
+	:rtype: coroutine function
+	"""
+	async def app(scope, receive, send):
+		if scope['type'] != 'http':
+			return
+
+		body = b''
+		more = True
+		while more:
+			message = await receive()
+			body += message.get('body', b'')
+			more = message.get('more_body', False) and len(body) <= MAX_BODY_SIZE
+
+		headers = dict(scope.get('headers') or [])
+		status, payload = receiver.handle(
+			scope.get('method', 'GET'),
+			scope.get('query_string', b'').decode('latin-1'),
+			body,
+			headers.get(b'content-type', b'').decode('latin-1'),
+		)
+		await send({
+			'type': 'http.response.start',
+			'status': status,
+			'headers': [
+				(b'content-type', b'application/json' if status == 200 else b'text/plain'),
+				(b'content-length', str(len(payload)).encode('ascii')),
+			],
+		})
+		await send({'type': 'http.response.body', 'body': payload})
+
+	return app
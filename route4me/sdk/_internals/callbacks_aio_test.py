@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from route4me.sdk.self_test_aio import run
+
+from .callbacks import CallbackReceiver
+from .callbacks_aio import asgi_app
+
+
+def call_asgi(app, method='POST', query=b'', chunks=(b'',)):
+	sent = []
+	messages = [
+		{'type': 'http.request', 'body': c, 'more_body': i < len(chunks) - 1}
+		for i, c in enumerate(chunks)
+	]
+
+	async def receive():
+		return messages.pop(0)
+
+	async def send(message):
+		sent.append(message)
+
+	scope = {
+		'type': 'http',
+		'method': method,
+		'query_string': query,
+		'headers': [(b'content-type', b'application/json')],
+	}
+	run(app(scope, receive, send))
+	return sent
+
+
+class Test_asgi_app(object):
+	def test_resolves_future(self):
+		r = CallbackReceiver(secret='s')
+		f = r.expect('A')
+
+		sent = call_asgi(
+			asgi_app(r),
+			query=b'token=s',
+			chunks=(b'{"optimization_problem_id": ', b'"A", "state": 5}'),
+		)
+
+		assert sent[0]['status'] == 200
+		assert sent[1]['body'] == b'{"status":true}'
+		assert f.result().ID == 'A'
+
+	def test_invalid_token(self):
+		sent = call_asgi(asgi_app(CallbackReceiver(secret='s')), query=b'token=x')
+
+		assert sent[0]['status'] == 403
+
+	def test_other_protocols(self):
+		async def fail(*args):
+			raise AssertionError('not expected')
+
+		run(asgi_app(CallbackReceiver())({'type': 'lifespan'}, fail, fail))
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from wsgiref.util import setup_testing_defaults
+
+from ..enums import OptimizationStateEnum
+
+from .callbacks import CallbackReceiver
+from .callbacks import CallbackServer
+from .callbacks import OptimizationCallback
+from .callbacks import parse_callback
+
+
+def callback(ID='A', state=4):
+	return OptimizationCallback(ID, OptimizationStateEnum(state), 1500111222, {})
+
+
+def call_wsgi(app, method='POST', query='', body=b'', content_type='application/json'):
+	environ = {
+		'REQUEST_METHOD': method,
+		'QUERY_STRING': query,
+		'CONTENT_TYPE': content_type,
+		'CONTENT_LENGTH': str(len(body)),
+		'wsgi.input': io.BytesIO(body),
+	}
+	setup_testing_defaults(environ)
+
+	started = []
+	payload = b''.join(app(environ, lambda status, headers: started.append(status)))
+	return started[0], payload
+
+
+class Test_parse_callback(object):
+	def test_json(self):
+		body = json.dumps({
+			'timestamp': 1500111222,
+			'state': 4,
+			'optimization_problem_id': '1EDB78F63556D99336E06A13A34CF139',
+		}).encode('utf-8')
+
+		cb = parse_callback(body, 'application/json')
+
+		assert cb.ID == '1EDB78F63556D99336E06A13A34CF139'
+		assert cb.state == OptimizationStateEnum.OPTIMIZED
+		assert cb.timestamp == 1500111222
+
+	def test_form(self):
+		cb = parse_callback(b'state=5&optimization_problem_id=A', 'application/x-www-form-urlencoded')
+
+		assert cb.state == OptimizationStateEnum.ERROR
+		assert cb.timestamp is None
+
+	def test_query_string(self):
+		cb = parse_callback(b'', query_string='token=x&optimization_problem_id=A&state=4&timestamp=1')
+
+		assert cb.ID == 'A'
+		assert 'token' not in cb.raw
+
+	@pytest.mark.parametrize('body', [
+		b'{"state": 4}',
+		b'{"state": 99, "optimization_problem_id": "A"}',
+		b'{"state": "x", "optimization_problem_id": "A"}',
+		b'[1]',
+		b'{',
+		b'\xff',
+	])
+	def test_malformed(self, body):
+		with pytest.raises(ValueError):
+			parse_callback(body)
+
+
+class TestCallbackReceiver(object):
+	def test_callback_url(self):
+		r = CallbackReceiver(url='https://example.com/cb?x=1', secret='s')
+		assert r.callback_url == 'https://example.com/cb?x=1&token=s'
+
+		with pytest.raises(ValueError):
+			CallbackReceiver().callback_url
+
+	def test_resolve(self):
+		r = CallbackReceiver()
+		f = r.expect('A')
+
+		assert r.expect('A') is f
+		assert r.pending == 1
+		assert not r.resolve(callback(state=3))
+		assert not f.done()
+
+		assert r.resolve(callback())
+		assert f.result().state == OptimizationStateEnum.OPTIMIZED
+		assert r.pending == 0
+
+	def test_callback_before_expect(self):
+		r = CallbackReceiver(max_unclaimed=2)
+		for ID in 'ABC':
+			r.resolve(callback(ID))
+
+		assert r.expect('C').done()
+		assert not r.expect('A').done()
+
+	def test_cancel(self):
+		r = CallbackReceiver()
+		r.expect('A').cancel()
+
+		assert r.pending == 0
+		assert not r.resolve(callback())
+
+	def test_wsgi(self):
+		r = CallbackReceiver(secret='s')
+		f = r.expect('A')
+
+		status, payload = call_wsgi(r, query='token=s', body=b'{"optimization_problem_id": "A", "state": 4}')
+
+		assert status == '200 OK'
+		assert json.loads(payload.decode('utf-8')) == {'status': True}
+		assert f.result().ID == 'A'
+
+	@pytest.mark.parametrize('kwargs, exp', [
+		({'method': 'GET', 'query': 'token=s'}, '405 Method Not Allowed'),
+		({'query': 'token=x'}, '403 Forbidden'),
+		({}, '403 Forbidden'),
+		({'query': 'token=s', 'body': b'{}'}, '400 Bad Request'),
+		({'query': 'token=s', 'body': b' ' * 70000}, '413 Payload Too Large'),
+	])
+	def test_wsgi_rejects(self, kwargs, exp):
+		status, _ = call_wsgi(CallbackReceiver(secret='s'), **kwargs)
+		assert status == exp
+
+
+@pytest.mark.network
+class TestCallbackServer(object):
+	def test_serves_callbacks(self):
+		import requests
+
+		with CallbackServer() as srv:
+			f = srv.receiver.expect('A')
+			url = srv.receiver.callback_url
+
+			assert url.startswith('http://127.0.0.1:{}/?token='.format(srv.port))
+
+			res = requests.post(url, json={'optimization_problem_id': 'A', 'state': 4}, timeout=5)
+			assert res.status_code == 200
+			assert f.result(timeout=5).state == OptimizationStateEnum.OPTIMIZED
+
+			res = requests.post(url + 'x', data={'optimization_problem_id': 'A', 'state': 4}, timeout=5)
+			assert res.status_code == 403
+
+	def test_public_url(self):
+		with CallbackServer(public_url='https://example.com/cb') as srv:
+			assert srv.receiver.callback_url.startswith('https://example.com/cb?token=')
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+JSON codecs for request bodies and responses
+
+The standard :mod:`json` module is slow on large optimizations (thousands
+of addresses). When a faster library is installed, it is used instead:
+``orjson``, ``ujson`` or ``rapidjson`` (in order of preference). All codecs
+produce and accept the same JSON: objects, that the fast library can not
+encode (integers over 64 bits, non-string keys), are encoded with
+:mod:`json`.
+
+The library is imported on the first use:
+
+.. code-block:: python
+
+	codec = get_codec()           # the fastest installed one
+	codec = get_codec('json')     # the standard library
+	r4m = ApiClient(api_key, json_codec=codec)
+"""
+
+import json
+
+import six
+
+#: Names of codecs, in order of preference
+PREFERRED = ('orjson', 'ujson', 'rapidjson', 'json')
+
+
+class JsonCodec(object):
+	"""
+	Codec of the standard library, the base class of other codecs
+
+	.. versionadded:: 0.1.0
+	"""
+
+	name = 'json'
+
+	def dumps(self, obj):
+		"""
+		:param obj: Python objects (parsed JSON)
+		:returns: UTF-8 encoded JSON
+		:rtype: bytes
+		"""
+		return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+	def loads(self, data):
+		"""
+		:param data: JSON text (UTF-8 encoded or decoded)
+		:type data: bytes or str
+		:returns: Python objects
+		:raises ValueError: on invalid JSON
+		"""
+		if not isinstance(data, six.text_type):
+			data = data.decode('utf-8')
+		return json.loads(data)
+
+	def __repr__(self):
+		return '<{}>'.format(type(self).__name__)
+
+
+class OrjsonCodec(JsonCodec):
+	name = 'orjson'
+
+	def __init__(self):
+		import orjson
+		self._lib = orjson
+
+	def dumps(self, obj):
+		try:
+			return self._lib.dumps(obj)
+		except TypeError:
+			return super(OrjsonCodec, self).dumps(obj)
+
+	def loads(self, data):
+		return self._lib.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+	name = 'ujson'
+
+	def __init__(self):
+		import ujson
+		self._lib = ujson
+
+	def dumps(self, obj):
+		try:
+			return self._lib.dumps(obj, ensure_ascii=False).encode('utf-8')
+		except (TypeError, OverflowError):
+			return super(UjsonCodec, self).dumps(obj)
+
+	def loads(self, data):
+		return self._lib.loads(data)
+
+
+class RapidjsonCodec(JsonCodec):
+	name = 'rapidjson'
+
+	def __init__(self):
+		import rapidjson
+		self._lib = rapidjson
+
+	def dumps(self, obj):
+		try:
+			return self._lib.dumps(obj, ensure_ascii=False).encode('utf-8')
+		except (TypeError, OverflowError):
+			return super(RapidjsonCodec, self).dumps(obj)
+
+	def loads(self, data):
+		return self._lib.loads(data)
+
+
+_CODECS = {
+	'orjson': OrjsonCodec,
+	'ujson': UjsonCodec,
+	'rapidjson': RapidjsonCodec,
+	'json': JsonCodec,
+}
+
+# codecs are stateless, so instances are shared
+_instances = {}
+
+
+def get_codec(name=None):
+	"""
+	:param name: One of :data:`PREFERRED`, the first installed codec by \
+		default
+	:type name: str, optional
+	:returns: Shared instance of the codec
+	:rtype: JsonCodec
+	:raises ImportError: if the library of the codec is not installed
+	:raises ValueError: if the name is unknown
+	"""
+	if name is not None and name not in _CODECS:
+		raise ValueError('name', 'one of {} expected'.format(', '.join(PREFERRED)))
+
+	codec = _instances.get(name)
+	if codec is None:
+		codec = _instances.setdefault(name, _create(name))
+	return codec
+
+
+def _create(name):
+	if name is not None:
+		return _CODECS[name]()
+
+	for n in PREFERRED:
+		try:
+			return get_codec(n)
+		except ImportError:
+			pass
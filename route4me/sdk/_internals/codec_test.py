@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from .codec import get_codec
+from .codec import JsonCodec
+from .codec import PREFERRED
+
+
+def codec_or_skip(name):
+	try:
+		return get_codec(name)
+	except ImportError:
+		pytest.skip('{} is not installed'.format(name))
+
+
+DOC = {
+	'optimization_problem_id': '07372F2CF3814EC6DFFAFE92E22771AA',
+	'state': 4,
+	'addresses': [
+		{'address': u'Straße "12" ☃', 'lat': 40.7, 'lng': -73.9, 'is_depot': True, 'manifest': None},
+	],
+}
+
+
+class TestCodecs(object):
+	@pytest.mark.parametrize('name', PREFERRED)
+	def test_roundtrip(self, name):
+		codec = codec_or_skip(name)
+
+		data = codec.dumps(DOC)
+
+		assert isinstance(data, bytes)
+		assert json.loads(data.decode('utf-8')) == DOC
+		assert codec.loads(data) == DOC
+		assert codec.loads(data.decode('utf-8')) == DOC
+
+	@pytest.mark.parametrize('name', PREFERRED)
+	@pytest.mark.parametrize('obj', [
+		{'big': 2 ** 70},
+		{1: 'int key'},
+	])
+	def test_not_supported_by_fast_library(self, name, obj):
+		codec = codec_or_skip(name)
+
+		assert codec.dumps(obj) == JsonCodec().dumps(obj)
+
+	@pytest.mark.parametrize('name', PREFERRED)
+	def test_invalid(self, name):
+		codec = codec_or_skip(name)
+
+		with pytest.raises(ValueError):
+			codec.loads(b'{"a": ')
+
+
+class TestGetCodec(object):
+	def test_default_is_preferred(self):
+		codec = get_codec()
+
+		installed = [n for n in PREFERRED if n == codec.name]
+		assert installed == [codec.name]
+		for name in PREFERRED[:PREFERRED.index(codec.name)]:
+			with pytest.raises(ImportError):
+				get_codec(name)
+
+	def test_shared(self):
+		assert get_codec() is get_codec()
+		assert get_codec('json') is get_codec('json')
+		assert isinstance(get_codec('json'), JsonCodec)
+
+	def test_unknown(self):
+		with pytest.raises(ValueError):
+			get_codec('pickle')
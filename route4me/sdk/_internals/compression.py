@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compression of request bodies (``Content-Encoding``)
+
+Optimizations with thousands of addresses are uploaded as multi-megabyte
+JSON, which compresses well (5--10 times). Compression is opt-in: the API
+server should accept compressed bodies.
+
+.. code-block:: python
+
+	r4m = ApiClient(api_key, compression=Compression('gzip', level=6))
+
+Bodies smaller than the threshold are sent as is, compression costs more
+than it saves on them. ``br`` requires the ``brotli`` package.
+
+Responses are decompressed by the HTTP libraries, the clients advertise
+the supported encodings in ``Accept-Encoding``.
+"""
+
+import zlib
+import logging
+
+log = logging.getLogger(__name__)
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+BROTLI = 'br'
+
+#: Supported encodings
+ENCODINGS = (GZIP, DEFLATE, BROTLI)
+
+_DEFAULT_LEVELS = {
+	GZIP: 6,
+	DEFLATE: 6,
+	# 11 (the default of brotli) is too slow for on-the-fly compression
+	BROTLI: 5,
+}
+
+_MAX_LEVELS = {
+	GZIP: 9,
+	DEFLATE: 9,
+	BROTLI: 11,
+}
+
+
+def _import_brotli():
+	import brotli
+	return brotli
+
+
+class Compression(object):
+	"""
+	Compression settings of request bodies
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, encoding=GZIP, level=None, threshold=1024):
+		"""
+		:param encoding: ``gzip``, ``deflate`` or ``br``, defaults to \
+			``gzip``
+		:type encoding: str, optional
+		:param level: Compression level: ``1`` (fast) -- ``9`` (small) for \
+			``gzip`` and ``deflate``, ``0`` -- ``11`` for ``br``
+		:type level: int, optional
+		:param threshold: Min size (bytes) of bodies to compress, defaults to \
+			1 KiB
+		:type threshold: int, optional
+		:raises ValueError: on unknown encoding or invalid level
+		:raises ImportError: if ``brotli`` is not installed (for ``br``)
+		"""
+		if encoding not in ENCODINGS:
+			raise ValueError('encoding', 'one of {} expected'.format(', '.join(ENCODINGS)))
+
+		if level is None:
+			level = _DEFAULT_LEVELS[encoding]
+		level = int(level)
+		if not 0 <= level <= _MAX_LEVELS[encoding]:
+			raise ValueError('level', 'from 0 to {} expected'.format(_MAX_LEVELS[encoding]))
+
+		if encoding == BROTLI:
+			# fail early, not on the first request
+			self._brotli = _import_brotli()
+
+		self.encoding = encoding
+		self.level = level
+		self.threshold = int(threshold)
+
+	def __repr__(self):
+		return '<Compression, {}, level={}, threshold={}>'.format(
+			self.encoding,
+			self.level,
+			self.threshold,
+		)
+
+	def compress(self, body):
+		"""
+		:param body: Request body
+		:type body: bytes
+		:returns: Body and value of ``Content-Encoding`` header \
+			(:data:`None`, when the body is sent as is: it is smaller than \
+			the threshold, or does not compress)
+		:rtype: tuple(bytes, str)
+		"""
+		if len(body) < self.threshold:
+			return body, None
+
+		if self.encoding == GZIP:
+			c = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+			compressed = c.compress(body) + c.flush()
+		elif self.encoding == DEFLATE:
+			compressed = zlib.compress(body, self.level)
+		else:
+			compressed = self._brotli.compress(body, quality=self.level)
+
+		if len(compressed) >= len(body):
+			return body, None
+
+		log.debug('compressed body [%s]: %s -> %s bytes', self.encoding, len(body), len(compressed))
+		return compressed, self.encoding
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import os
+import zlib
+
+import pytest
+
+from .compression import Compression
+
+BODY = b'{"addresses":[' + b','.join([b'{"address":"Main St","lat":40.7,"lng":-73.9}'] * 100) + b']}'
+
+
+class TestCompression(object):
+	@pytest.mark.parametrize('encoding, wbits', [
+		('gzip', 16 + zlib.MAX_WBITS),
+		('deflate', zlib.MAX_WBITS),
+	])
+	def test_compress(self, encoding, wbits):
+		body, content_encoding = Compression(encoding).compress(BODY)
+
+		assert content_encoding == encoding
+		assert len(body) < len(BODY) / 5
+		assert zlib.decompress(body, wbits) == BODY
+
+	def test_brotli(self):
+		brotli = pytest.importorskip('brotli')
+
+		body, content_encoding = Compression('br').compress(BODY)
+
+		assert content_encoding == 'br'
+		assert brotli.decompress(body) == BODY
+
+	def test_threshold(self):
+		c = Compression(threshold=len(BODY) + 1)
+
+		assert c.compress(BODY) == (BODY, None)
+
+	def test_not_compressible(self):
+		body = os.urandom(1024)
+
+		assert Compression(threshold=0).compress(body) == (body, None)
+
+	@pytest.mark.parametrize('kwargs', [
+		{'encoding': 'zip'},
+		{'encoding': 'gzip', 'level': 10},
+		{'encoding': 'deflate', 'level': -1},
+	])
+	def test_invalid(self, kwargs):
+		with pytest.raises(ValueError):
+			Compression(**kwargs)
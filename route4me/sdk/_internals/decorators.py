@@ -3,11 +3,90 @@
 import six
 import logging
 
-import pydash
-
 log = logging.getLogger(__name__)
 
 
+def compile_getter(path):
+	"""
+	Compiles a dotted path (like ``'parameters.route_name'``) into a function,
+	that reads the value from nested dicts.
+
+	The path is split once, here, not on each call. Works like
+	:func:`pydash.get`: returns :data:`None` when any part of the path is
+	missing.
+
+	:param path: Dotted path
+	:type path: str
+	:returns: Function ``getter(obj)``
+	:rtype: callable
+	"""
+	keys = tuple(path.split('.'))
+
+	if len(keys) == 1:
+		k0, = keys
+
+		def getter(obj):
+			try:
+				return obj[k0]
+			except (KeyError, TypeError, IndexError):
+				return None
+
+	elif len(keys) == 2:
+		k0, k1 = keys
+
+		def getter(obj):
+			try:
+				return obj[k0][k1]
+			except (KeyError, TypeError, IndexError):
+				return None
+
+	else:
+		def getter(obj):
+			try:
+				for k in keys:
+					obj = obj[k]
+			except (KeyError, TypeError, IndexError):
+				return None
+			return obj
+
+	return getter
+
+
+def compile_setter(path):
+	"""
+	Compiles a dotted path (like ``'parameters.route_name'``) into a function,
+	that writes the value to nested dicts.
+
+	The path is split once, here, not on each call. Works like
+	:func:`pydash.set_`: missing intermediate dicts are created. Unlike
+	:func:`pydash.set_`, :data:`None` intermediate values are replaced with
+	dicts too (instead of ignoring the value).
+
+	:param path: Dotted path
+	:type path: str
+	:returns: Function ``setter(obj, value)``
+	:rtype: callable
+	"""
+	keys = tuple(path.split('.'))
+	parents = keys[:-1]
+	last = keys[-1]
+
+	if not parents:
+		def setter(obj, value):
+			obj[last] = value
+
+	else:
+		def setter(obj, value):
+			for k in parents:
+				nxt = obj.get(k)
+				if nxt is None:
+					nxt = obj[k] = {}
+				obj = nxt
+			obj[last] = value
+
+	return setter
+
+
 def _handle_auto_doc_for_property(doc, typename):
 	if doc is None:
 		doc = '<AUTO>'
@@ -26,24 +105,58 @@ def _handle_auto_doc_for_property(doc, typename):
 	return doc
 
 
+def decode_cached(model, key, raw_value, decode):
+	"""
+	Decodes raw value, memoizing the result on the model instance
+
+	The cached result is used while the raw value is **the same object**
+	(``is``), so any change of the raw data (through the property setter or
+	directly in :attr:`~route4me.sdk.models.BaseModel.raw`) invalidates it.
+
+	:param model: Model with ``_decoded`` slot
+	:type model: ~route4me.sdk.models.BaseModel
+	:param key: Cache key (unique per property)
+	:type key: str
+	:param raw_value: Raw value
+	:param decode: Decoder, called with :paramref:`~decode_cached.raw_value`
+	:type decode: callable
+	:returns: Decoded value
+	"""
+	cache = model._decoded
+	if cache is None:
+		cache = model._decoded = {}
+	else:
+		c = cache.get(key)
+		if c is not None and c[0] is raw_value:
+			return c[1]
+
+	res = decode(raw_value)
+	cache[key] = (raw_value, res)
+	return res
+
+
 def dict_enum_property(path, enumtype):
+	getter = compile_getter(path)
+	setter = compile_setter(path)
+
 	def decorator(fn):
+		key = fn.__name__
 
 		def _get(self):
-			v = pydash.get(self.raw, path)
+			v = getter(self.raw)
 
 			if v is None:
 				return None
 
-			return enumtype(v)
+			return decode_cached(self, key, v, enumtype)
 
 		def _set(self, value):
 			if isinstance(value, enumtype):
 				value = value.value
 			value = fn(self, value)
-			pydash.set_(self.raw, path, value)
+			setter(self.raw, value)
 
-			return enumtype(value)
+			return decode_cached(self, key, value, enumtype)
 
 		doc = _handle_auto_doc_for_property(
 			fn.__doc__,
@@ -61,13 +174,15 @@ def _set(self, value):
 # TODO: test over unicode in python 2
 def dict_property(path, anytype):
 	"""
-	Creates new strict-typed PROPERTY for classes inherited from :class:`dict`
+	Creates new strict-typed PROPERTY for models (classes with ``raw`` dict)
 	"""
+	getter = compile_getter(path)
+	setter = compile_setter(path)
 
 	def decorator_str(fn):
 
 		def _get(self):
-			v = pydash.get(self.raw, path)
+			v = getter(self.raw)
 
 			if v is None:
 				return None
@@ -77,7 +192,7 @@ def _get(self):
 		def _set(self, value):
 			v = six.text_type(value)
 			v = fn(self, v)
-			pydash.set_(self.raw, path, v)
+			setter(self.raw, v)
 
 			return v
 
@@ -97,7 +212,7 @@ def _set(self, value):
 	def decorator_other(fn):
 
 		def _get(self):
-			v = pydash.get(self.raw, path)
+			v = getter(self.raw)
 
 			if v is None:
 				return None
@@ -106,7 +221,7 @@ def _get(self):
 
 		def _set(self, value):
 			v = fn(self, value)
-			pydash.set_(self.raw, path, v)
+			setter(self.raw, v)
 
 			return v
 
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import pydash
+
+from route4me.sdk.models import BaseModel
+
+from .decorators import compile_getter
+from .decorators import compile_setter
+from .decorators import dict_enum_property
+
+
+RAW = {
+	'state': 4,
+	'none': None,
+	'text': 'abc',
+	'list': [1, 2],
+	'parameters': {
+		'route_name': 'name',
+		'none': None,
+		'deep': {
+			'er': {
+				'value': 42,
+			},
+		},
+	},
+}
+
+
+class Test_compile_getter(object):
+	@pytest.mark.parametrize('path', [
+		'state',
+		'missing',
+		'none',
+		'none.key',
+		'text.key',
+		'list.key',
+		'state.key',
+		'parameters',
+		'parameters.route_name',
+		'parameters.missing',
+		'parameters.none',
+		'parameters.deep.er',
+		'parameters.deep.er.value',
+		'parameters.deep.missing.value',
+		'parameters.route_name.key.key',
+	])
+	def test_same_as_pydash(self, path):
+		getter = compile_getter(path)
+
+		assert getter(RAW) == pydash.get(RAW, path)
+
+	def test_returns_same_object(self):
+		getter = compile_getter('parameters.deep')
+
+		assert getter(RAW) is RAW['parameters']['deep']
+
+
+class Test_compile_setter(object):
+	@pytest.mark.parametrize('raw, path', [
+		({}, 'state'),
+		({'state': 1}, 'state'),
+		({}, 'parameters.route_name'),
+		({'parameters': {'a': 1}}, 'parameters.route_name'),
+		({}, 'parameters.deep.er.value'),
+		({'parameters': {'deep': {}}}, 'parameters.deep.er.value'),
+	])
+	def test_same_as_pydash(self, raw, path):
+		exp = pydash.clone_deep(raw)
+		pydash.set_(exp, path, 'VALUE')
+
+		setter = compile_setter(path)
+		setter(raw, 'VALUE')
+
+		assert raw == exp
+
+	def test_replaces_none_with_dict(self):
+		# NOTE: pydash.set_ silently ignores the value in this case
+		raw = {'parameters': None}
+
+		compile_setter('parameters.route_name')(raw, 'x')
+
+		assert raw == {'parameters': {'route_name': 'x'}}
+
+	def test_keeps_existing_dicts(self):
+		params = {'a': 1}
+		raw = {'parameters': params}
+
+		compile_setter('parameters.route_name')(raw, 'x')
+
+		assert raw['parameters'] is params
+		assert params == {'a': 1, 'route_name': 'x'}
+
+
+class CountingEnum(object):
+	"""
+	Enum-like type, which counts instances
+	"""
+	created = 0
+
+	def __init__(self, value):
+		CountingEnum.created += 1
+		self.value = value
+
+
+class ModelWithEnum(BaseModel):
+	__slots__ = ()
+
+	@dict_enum_property('parameters.kind', CountingEnum)
+	def kind(self, value):
+		return value
+
+
+class Test_dict_enum_property_cache(object):
+	def setup_method(self, *args, **kw):
+		CountingEnum.created = 0
+
+	def test_repeated_reads_are_cached(self):
+		m = ModelWithEnum({'parameters': {'kind': 'a'}})
+
+		k1 = m.kind
+		k2 = m.kind
+
+		assert k1 is k2
+		assert k1.value == 'a'
+		assert CountingEnum.created == 1
+
+	def test_setter_invalidates(self):
+		m = ModelWithEnum({'parameters': {'kind': 'a'}})
+		m.kind
+
+		m.kind = 'b'
+
+		assert m.kind.value == 'b'
+		assert m.raw['parameters']['kind'] == 'b'
+
+	def test_raw_change_invalidates(self):
+		m = ModelWithEnum({'parameters': {'kind': 'a'}})
+		m.kind
+
+		m.raw['parameters']['kind'] = 'c'
+		assert m.kind.value == 'c'
+
+		m.raw['parameters'] = {'kind': 'd'}
+		assert m.kind.value == 'd'
+
+		del m.raw['parameters']
+		assert m.kind is None
+
+	def test_cache_is_per_instance(self):
+		raw = {'parameters': {'kind': 'a'}}
+
+		m1 = ModelWithEnum(raw)
+		m2 = ModelWithEnum(raw)
+
+		assert m1.kind is not m2.kind
+		assert CountingEnum.created == 2
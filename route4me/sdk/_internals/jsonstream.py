@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental parsing of large JSON responses
+
+Reads the response chunk by chunk and yields items of one top-level array
+(like ``addresses`` of an optimization) as soon as they are received. Only
+the current item is kept in memory; heavy subtrees (like ``directions`` and
+``path_to_next``) could be skipped without building Python objects.
+
+Values are decoded with :meth:`json.JSONDecoder.raw_decode` straight from
+the buffer, skipped subtrees are scanned with regular expressions (no
+per-character Python loops).
+"""
+
+import re
+import json
+import codecs
+
+_DECODER = json.JSONDecoder()
+
+_WS = re.compile(r'[ \t\n\r]*')
+
+_NUMBER_START = frozenset(u'-0123456789')
+_NUMBER_END = frozenset(u',]} \t\n\r')
+
+# everything up to the next bracket (or not terminated string): other
+# characters, complete strings and complete containers without nested ones
+# (unrolled loops, no backtracking)
+_FLAT = r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*'
+_SKIP = re.compile(r'{0}(?:(?:\{{{0}\}}|\[{0}\]){0})*'.format(_FLAT), re.DOTALL)
+
+#: Keys of an optimization, which are not needed to enumerate addresses, but
+#: take most of the response
+HEAVY_KEYS = frozenset([
+	'directions',
+	'path_to_next',
+	'routes',
+	'tracking_history',
+])
+
+
+class _Scanner(object):
+	"""
+	Buffer over an iterable of chunks (:class:`bytes` or :class:`str`)
+	"""
+
+	def __init__(self, chunks):
+		self._chunks = iter(chunks)
+		self._decoder = codecs.getincrementaldecoder('utf-8')()
+		self._eof = False
+		self.buf = u''
+		self.pos = 0
+
+	def fill(self):
+		"""
+		Appends the next chunk to the buffer, drops consumed text
+
+		:returns: :data:`False` on the end of the input
+		"""
+		if self._eof:
+			return False
+
+		try:
+			chunk = next(self._chunks)
+		except StopIteration:
+			self._eof = True
+			chunk = b''
+
+		if isinstance(chunk, bytes):
+			chunk = self._decoder.decode(chunk, final=self._eof)
+
+		self.buf = self.buf[self.pos:] + chunk
+		self.pos = 0
+		return True
+
+	def error(self, msg):
+		return ValueError('{}: {!r}'.format(msg, self.buf[self.pos:self.pos + 20]))
+
+	def peek(self):
+		"""
+		Skips whitespaces
+
+		:returns: The next character, empty string on the end of the input
+		"""
+		while True:
+			self.pos = _WS.match(self.buf, self.pos).end()
+			if self.pos < len(self.buf):
+				return self.buf[self.pos]
+			if not self.fill():
+				return u''
+
+	def expect(self, chars):
+		c = self.peek()
+		if c == u'' or c not in chars:
+			raise self.error('expected one of {!r}'.format(chars))
+		self.pos += 1
+		return c
+
+	def string(self):
+		"""
+		:returns: Decoded string
+		:rtype: str
+		"""
+		if self.peek() != u'"':
+			raise self.error('string expected')
+		return self.decode()
+
+	def decode(self):
+		"""
+		Decodes one JSON value (with :meth:`json.JSONDecoder.raw_decode`)
+		"""
+		self.peek()
+		while True:
+			try:
+				value, end = _DECODER.raw_decode(self.buf, self.pos)
+			except ValueError:
+				# the value is not received completely (or invalid)
+				if not self.__grow():
+					raise
+				continue
+
+			truncated = self.buf[self.pos] in _NUMBER_START and self.buf[end:end + 1] not in _NUMBER_END
+			if truncated and self.__grow():
+				# the number could be continued in the next chunk
+				continue
+
+			self.pos = end
+			return value
+
+	def skip(self):
+		"""
+		Skips one JSON value without decoding it, consumed text is not kept in
+		the buffer
+		"""
+		if self.peek() not in u'[{':
+			self.decode()
+			return
+
+		self.pos += 1
+		depth = 1
+		while True:
+			self.pos = _SKIP.match(self.buf, self.pos).end()
+
+			if self.pos == len(self.buf):
+				if not self.fill():
+					raise self.error('unexpected end of input')
+				continue
+
+			ch = self.buf[self.pos]
+			if ch == u'"':
+				# the string is not received completely
+				if not self.__grow():
+					raise self.error('unterminated string')
+				continue
+
+			self.pos += 1
+			if ch in u'[{':
+				depth += 1
+			else:
+				depth -= 1
+				if depth == 0:
+					return
+
+	def __grow(self):
+		"""
+		Reads chunks, until the not consumed part of the buffer is doubled
+		(so the value is re-scanned at most log(N) times)
+
+		:returns: :data:`False` on the end of the input
+		"""
+		need = max(1, 2 * (len(self.buf) - self.pos))
+		grown = False
+		while len(self.buf) - self.pos < need and self.fill():
+			grown = True
+		return grown
+
+
+def _members(scanner):
+	"""
+	Enumerates keys of an object, the caller should consume values
+	"""
+	scanner.expect(u'{')
+	if scanner.peek() == u'}':
+		scanner.pos += 1
+		return
+
+	while True:
+		key = scanner.string()
+		scanner.expect(u':')
+		yield key
+		if scanner.expect(u',}') == u'}':
+			return
+
+
+def _item(scanner, skip):
+	if scanner.peek() != u'{' or not skip:
+		return scanner.decode()
+
+	item = {}
+	for key in _members(scanner):
+		if key in skip:
+			scanner.skip()
+		else:
+			item[key] = scanner.decode()
+	return item
+
+
+def iter_array_items(chunks, key, skip=(), meta=None):
+	"""
+	Yields items of the array :paramref:`~iter_array_items.key` of the
+	top-level JSON object
+
+	:param chunks: Parts of the JSON text (like \
+		:meth:`requests.Response.iter_content`)
+	:type chunks: iterable of bytes or str
+	:param key: Key of the array in the top-level object
+	:type key: str
+	:param skip: Keys to skip (without decoding) in items and in the \
+		top-level object
+	:type skip: set(str), optional
+	:param meta: Receives other (not skipped) members of the top-level \
+		object, filled completely after the iteration
+	:type meta: dict, optional
+	:returns: Generator of decoded items
+	:raises ValueError: on invalid JSON
+	"""
+	skip = frozenset(skip)
+	scanner = _Scanner(chunks)
+
+	for k in _members(scanner):
+		if k == key and scanner.peek() == u'[':
+			scanner.pos += 1
+			if scanner.peek() == u']':
+				scanner.pos += 1
+				continue
+			while True:
+				yield _item(scanner, skip)
+				if scanner.expect(u',]') == u']':
+					break
+		elif k in skip or meta is None:
+			scanner.skip()
+		else:
+			meta[k] = scanner.decode()
+
+	if scanner.peek() != u'':
+		raise scanner.error('extra data')
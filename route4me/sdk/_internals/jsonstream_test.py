@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import json
+import random
+
+import pytest
+
+from .jsonstream import iter_array_items
+from .jsonstream import HEAVY_KEYS
+
+
+def split(text, size):
+	data = text.encode('utf-8')
+	return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+ADDRESS = {
+	'route_destination_id': 1,
+	'address': u'Straße "12" \\ {[,]}',
+	'lat': 1.5e-3,
+	'is_depot': False,
+	'manifest': None,
+	'custom_fields': {'a': [1, {'b': u'☃'}]},
+	'path_to_next': [{'lat': 1.0, 'lng': 2.0}, {'lat': 3.0, 'lng': 4.0}],
+	'directions': [{'location': {'name': u'}]"'}, 'steps': [{'direction': 'N'}]}],
+}
+
+DOC = {
+	'optimization_problem_id': 'A',
+	'routes': [{'addresses': [ADDRESS]}],
+	'addresses': [
+		dict(ADDRESS, route_destination_id=i) for i in range(5)
+	],
+	'state': 4,
+	'parameters': {'round_trip': True},
+}
+
+
+def light(item):
+	return dict((k, v) for k, v in item.items() if k not in HEAVY_KEYS)
+
+
+class TestIterArrayItems(object):
+	@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+	def test_chunks(self, size):
+		meta = {}
+		items = list(iter_array_items(split(json.dumps(DOC, indent=2), size), 'addresses', meta=meta))
+
+		assert items == DOC['addresses']
+		assert meta == {
+			'optimization_problem_id': 'A',
+			'routes': DOC['routes'],
+			'state': 4,
+			'parameters': {'round_trip': True},
+		}
+
+	@pytest.mark.parametrize('size', [1, 5, 100000])
+	def test_skip(self, size):
+		meta = {}
+		items = list(iter_array_items(split(json.dumps(DOC), size), 'addresses', skip=HEAVY_KEYS, meta=meta))
+
+		assert items == [light(a) for a in DOC['addresses']]
+		assert 'routes' not in meta
+		assert meta['state'] == 4
+
+	def test_text_chunks(self):
+		items = list(iter_array_items([u'{"addresses": [1, ', u'"☃", {}]}'], 'addresses'))
+
+		assert items == [1, u'☃', {}]
+
+	@pytest.mark.parametrize('text', [
+		'{}',
+		'{"addresses": []}',
+		'{"addresses": null}',
+		' { "other" : [ 1 ] } ',
+	])
+	def test_no_items(self, text):
+		assert list(iter_array_items(split(text, 2), 'addresses')) == []
+
+	@pytest.mark.parametrize('text', [
+		'',
+		'[1, 2]',
+		'{"addresses": [1, 2}',
+		'{"addresses": [{"a": 1]}',
+		'{"addresses": [1]',
+		'{"addresses": [1]} []',
+		'{"addresses": ["unterminated]}',
+	])
+	def test_invalid(self, text):
+		with pytest.raises(ValueError):
+			list(iter_array_items(split(text, 3), 'addresses', skip=['a']))
+
+	def test_random_documents(self):
+		rnd = random.Random(42)
+
+		def value(depth):
+			kind = rnd.randint(0, 6 if depth < 4 else 3)
+			if kind == 0:
+				return rnd.randint(-10 ** 6, 10 ** 6)
+			if kind == 1:
+				return rnd.random() * 10 ** rnd.randint(-5, 5)
+			if kind == 2:
+				return u''.join(rnd.choice(u'ab"\\/{}[],:é☃\n ') for _ in range(rnd.randint(0, 8)))
+			if kind == 3:
+				return rnd.choice([True, False, None])
+			if kind == 4:
+				return [value(depth + 1) for _ in range(rnd.randint(0, 4))]
+			return dict(
+				(rnd.choice(['a', 'skip', u'}"']), value(depth + 1))
+				for _ in range(rnd.randint(0, 4))
+			)
+
+		for _ in range(100):
+			doc = {'x': value(1), 'items': [value(1) for _ in range(rnd.randint(0, 5))]}
+			text = json.dumps(doc, ensure_ascii=rnd.random() < 0.5)
+			size = rnd.randint(1, 50)
+
+			assert list(iter_array_items(split(text, size), 'items')) == doc['items']
+
+			exp = [
+				dict((k, v) for k, v in i.items() if k != 'skip') if isinstance(i, dict) else i
+				for i in doc['items']
+			]
+			assert list(iter_array_items(split(text, size), 'items', skip=['skip'])) == exp
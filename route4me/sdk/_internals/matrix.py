@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local distance matrices of addresses
+
+Pre-screening and clustering of addresses do not need the API: distances
+by :class:`~route4me.sdk.enums.RouteMetricEnum` metrics (``GEODESIC``,
+``EUCLIDEAN`` and ``MANHATTAN``) are computed from coordinates, with
+vectorized :mod:`numpy` (install it with ``pip install
+route4me-sdk[matrix]``):
+
+.. code-block:: python
+
+	dist = distance_matrix(opt.addresses, metric=RouteMetricEnum.GEODESIC,
+		unit=DistanceUnitEnum.KILOMETER)
+
+	# 50k addresses: blocks of rows, computed by a process pool
+	for rows, block in iter_blocks(addresses, block_size=1000):
+		nearest[rows] = block.argmin(axis=1)
+
+A dense matrix of ``n`` addresses takes ``n * n * 8`` bytes (``4`` with
+``dtype='float32'``), so for big sets :func:`iter_blocks` is preferable.
+Blocks of big sets (see :data:`PARALLEL_THRESHOLD`) are computed by a
+process pool.
+
+``EUCLIDEAN`` and ``MANHATTAN`` distances are measured on the
+equirectangular projection around the mean latitude of all points (good
+enough for areas of a city or a region), ``GEODESIC`` ones are great-circle
+distances (computed from chords between unit vectors, that is exact and
+avoids trigonometry per pair of points).
+"""
+
+import collections
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from ..enums import DistanceUnitEnum
+from ..enums import RouteMetricEnum
+from ..models import Address
+
+#: Mean radius of the Earth, by unit
+EARTH_RADIUS = {
+	DistanceUnitEnum.MILE: 3958.7613,
+	DistanceUnitEnum.KILOMETER: 6371.0088,
+}
+
+#: Supported metrics
+METRICS = (
+	RouteMetricEnum.EUCLIDEAN,
+	RouteMetricEnum.MANHATTAN,
+	RouteMetricEnum.GEODESIC,
+)
+
+#: Min number of origins, computed by a process pool (when the number of
+#: processes is not set explicitly)
+PARALLEL_THRESHOLD = 10000
+
+#: Default number of rows per block
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def _import_numpy():
+	try:
+		import numpy
+	except ImportError as exc:  # pragma: no cover
+		raise ImportError(
+			'Distance matrices require `numpy` package, install it with '
+			'`pip install route4me-sdk[matrix]` ({})'.format(exc)
+		)
+	return numpy
+
+
+def coordinates(addresses):
+	"""
+	:param addresses: Addresses (models or raw dicts), or an array of \
+		coordinates (returned as is)
+	:type addresses: list(~route4me.sdk.models.Address) or numpy.ndarray
+	:returns: Array of shape ``(n, 2)``: latitude and longitude in degrees
+	:rtype: numpy.ndarray
+	:raises ValueError: when an address has no coordinates
+	"""
+	np = _import_numpy()
+	if isinstance(addresses, np.ndarray):
+		if addresses.ndim != 2 or addresses.shape[1] != 2:
+			raise ValueError('addresses', 'array of shape (n, 2) expected')
+		return addresses
+
+	res = np.empty((len(addresses), 2), dtype=np.float64)
+	for i, a in enumerate(addresses):
+		if not isinstance(a, Address):
+			a = Address(a)
+		if a.latitude is None or a.longitude is None:
+			raise ValueError('addresses', 'coordinates of all addresses expected: {!r}'.format(a.name))
+		res[i, 0] = a.latitude
+		res[i, 1] = a.longitude
+	return res
+
+
+def _options(metric, unit):
+	metric = RouteMetricEnum(metric)
+	if metric not in METRICS:
+		raise ValueError('metric', 'one of {} expected'.format(', '.join(m.name for m in METRICS)))
+	return metric, EARTH_RADIUS[DistanceUnitEnum(unit)]
+
+
+def _reference(*points):
+	"""
+	:returns: Latitude of the projection and whether longitudes should be \
+		shifted (points around the antimeridian)
+	:rtype: tuple(float, bool)
+	"""
+	np = _import_numpy()
+	points = [p for p in points if len(p)]
+	if not points:
+		return 0.0, False
+	lats = np.concatenate([p[:, 0] for p in points])
+	lngs = np.concatenate([p[:, 1] for p in points])
+	return float(lats.mean()), float(lngs.max() - lngs.min()) > 180
+
+
+def _features(points, metric, radius, ref_lat, shift):
+	"""
+	Per-point values, distances are computed from: unit vectors (for
+	``GEODESIC``) or projected coordinates in the units of the result
+	"""
+	np = _import_numpy()
+	lat = np.radians(points[:, 0])
+	lng = points[:, 1]
+	if shift:
+		lng = np.where(lng < 0, lng + 360, lng)
+	lng = np.radians(lng)
+
+	if metric == RouteMetricEnum.GEODESIC:
+		cos_lat = np.cos(lat)
+		return np.column_stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)])
+
+	return np.column_stack([lng * (radius * np.cos(np.radians(ref_lat))), lat * radius])
+
+
+def _distances(a, b, metric, radius, dtype):
+	"""
+	Distances between features of points: all operations are in place,
+	each element costs a few arithmetic operations
+	"""
+	np = _import_numpy()
+	res = np.empty((len(a), len(b)), dtype=np.float64)
+	tmp = np.empty_like(res)
+	for k in range(a.shape[1]):
+		out = res if k == 0 else tmp
+		np.subtract(a[:, k, None], b[None, :, k], out=out)
+		if metric == RouteMetricEnum.MANHATTAN:
+			np.abs(out, out=out)
+		else:
+			np.multiply(out, out, out=out)
+		if k:
+			res += tmp
+
+	if metric != RouteMetricEnum.MANHATTAN:
+		np.sqrt(res, out=res)
+	if metric == RouteMetricEnum.GEODESIC:
+		# chord of the unit sphere to the arc
+		res *= 0.5
+		np.clip(res, 0, 1, out=res)
+		np.arcsin(res, out=res)
+		res *= 2 * radius
+
+	return res.astype(dtype, copy=False)
+
+
+def distance_block(origins, destinations, metric, radius, ref_lat=None, dtype='float64'):
+	"""
+	Distances between two sets of points
+
+	:param origins: Coordinates of shape ``(n, 2)``, degrees
+	:type origins: numpy.ndarray
+	:param destinations: Coordinates of shape ``(m, 2)``, degrees
+	:type destinations: numpy.ndarray
+	:param metric: Metric, one of :data:`METRICS`
+	:type metric: ~route4me.sdk.enums.RouteMetricEnum
+	:param radius: Radius of the Earth in the units of the result
+	:type radius: float
+	:param ref_lat: Latitude of the projection (``EUCLIDEAN`` and \
+		``MANHATTAN``), degrees, defaults to the mean latitude of the points
+	:type ref_lat: float, optional
+	:param dtype: Type of values of the result
+	:type dtype: str, optional
+	:returns: Distances of shape ``(n, m)``
+	:rtype: numpy.ndarray
+	"""
+	mean_lat, shift = _reference(origins, destinations)
+	if ref_lat is None:
+		ref_lat = mean_lat
+	return _distances(
+		_features(origins, metric, radius, ref_lat, shift),
+		_features(destinations, metric, radius, ref_lat, shift),
+		metric,
+		radius,
+		dtype,
+	)
+
+
+def _block_task(args):
+	start, a, b, metric, radius, dtype = args
+	return start, _distances(a, b, metric, radius, dtype)
+
+
+def _blocks(origins, destinations, metric, radius, block_size, processes, dtype):
+	ref_lat, shift = _reference(origins, destinations)
+	a = _features(origins, metric, radius, ref_lat, shift)
+	b = a if destinations is origins else _features(destinations, metric, radius, ref_lat, shift)
+
+	tasks = (
+		(start, a[start:start + block_size], b, metric, radius, dtype)
+		for start in range(0, len(a), block_size)
+	)
+
+	if processes is None:
+		processes = 0 if len(a) >= PARALLEL_THRESHOLD and multiprocessing.cpu_count() > 1 else 1
+	if processes == 1:
+		for t in tasks:
+			yield _block_task(t)
+		return
+
+	workers = processes or multiprocessing.cpu_count()
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		# a few blocks ahead: results are consumed in order, and memory
+		# is bounded
+		ahead = 2 * workers
+		pending = collections.deque()
+		for t in tasks:
+			pending.append(executor.submit(_block_task, t))
+			if len(pending) >= ahead:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+
+
+def iter_blocks(
+	addresses,
+	destinations=None,
+	metric=RouteMetricEnum.GEODESIC,
+	unit=DistanceUnitEnum.MILE,
+	block_size=DEFAULT_BLOCK_SIZE,
+	processes=None,
+	dtype='float64',
+):
+	"""
+	Computes the distance matrix by blocks of rows
+
+	:param addresses: Origins (see :func:`coordinates`)
+	:type addresses: list(~route4me.sdk.models.Address) or numpy.ndarray
+	:param destinations: Destinations, defaults to origins
+	:type destinations: list(~route4me.sdk.models.Address) or \
+		numpy.ndarray, optional
+	:param metric: ``GEODESIC``, ``EUCLIDEAN`` or ``MANHATTAN``
+	:type metric: ~route4me.sdk.enums.RouteMetricEnum, optional
+	:param unit: Unit of distances, defaults to miles
+	:type unit: ~route4me.sdk.enums.DistanceUnitEnum, optional
+	:param block_size: Number of rows per block
+	:type block_size: int, optional
+	:param processes: Number of worker processes: ``1`` --- compute in \
+		the current process, ``0`` --- as many as CPUs, by default a pool \
+		is used for :data:`PARALLEL_THRESHOLD` or more origins (on \
+		machines with several CPUs)
+	:type processes: int, optional
+	:param dtype: Type of values, ``float32`` halves the memory
+	:type dtype: str, optional
+	:returns: Slices of rows and blocks of shape ``(rows, destinations)``, \
+		in order of rows
+	:rtype: iterator(tuple(slice, numpy.ndarray))
+	:raises ValueError: on unsupported metric, or when an address has no \
+		coordinates
+	"""
+	metric, radius = _options(metric, unit)
+	block_size = int(block_size)
+	if block_size <= 0:
+		raise ValueError('block_size', 'positive int expected')
+
+	origins = coordinates(addresses)
+	destinations = origins if destinations is None else coordinates(destinations)
+
+	for start, block in _blocks(origins, destinations, metric, radius, block_size, processes, dtype):
+		yield slice(start, start + len(block)), block
+
+
+def distance_matrix(
+	addresses,
+	destinations=None,
+	metric=RouteMetricEnum.GEODESIC,
+	unit=DistanceUnitEnum.MILE,
+	block_size=DEFAULT_BLOCK_SIZE,
+	processes=None,
+	dtype='float64',
+):
+	"""
+	Computes the dense distance matrix, see :func:`iter_blocks` for
+	parameters
+
+	:returns: Distances of shape ``(origins, destinations)``
+	:rtype: numpy.ndarray
+	"""
+	np = _import_numpy()
+	origins = coordinates(addresses)
+	destinations = origins if destinations is None else coordinates(destinations)
+
+	res = np.empty((len(origins), len(destinations)), dtype=dtype)
+	for rows, block in iter_blocks(
+		origins,
+		destinations,
+		metric=metric,
+		unit=unit,
+		block_size=block_size,
+		processes=processes,
+		dtype=dtype,
+	):
+		res[rows] = block
+	return res
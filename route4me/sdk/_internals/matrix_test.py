@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+import pytest
+import mock
+
+np = pytest.importorskip('numpy')
+
+from ..enums import DistanceUnitEnum  # noqa: E402
+from ..enums import RouteMetricEnum  # noqa: E402
+from ..models import Address  # noqa: E402
+
+from .matrix import coordinates  # noqa: E402
+from .matrix import distance_block  # noqa: E402
+from .matrix import distance_matrix  # noqa: E402
+from .matrix import iter_blocks  # noqa: E402
+from .matrix import _import_numpy  # noqa: E402
+
+
+NEW_YORK = {'address': 'New York', 'lat': 40.7128, 'lng': -74.0060}
+LOS_ANGELES = {'address': 'Los Angeles', 'lat': 34.0522, 'lng': -118.2437}
+
+
+def random_points(n, seed=0):
+	rnd = np.random.RandomState(seed)
+	return np.column_stack([40 + rnd.rand(n), -74 + rnd.rand(n)])
+
+
+def haversine(p, q, radius):
+	lat1, lng1, lat2, lng2 = map(np.radians, (p[0], p[1], q[0], q[1]))
+	h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+	return 2 * radius * np.arcsin(np.sqrt(h))
+
+
+class Test_coordinates(object):
+	def test_addresses(self):
+		res = coordinates([Address(NEW_YORK), LOS_ANGELES])
+
+		assert res.tolist() == [[40.7128, -74.0060], [34.0522, -118.2437]]
+
+	def test_array(self):
+		points = random_points(3)
+
+		assert coordinates(points) is points
+
+	@pytest.mark.parametrize('addresses', [
+		[{'address': 'nowhere', 'lat': 1}],
+		np.zeros((2, 3)),
+	])
+	def test_invalid(self, addresses):
+		with pytest.raises(ValueError):
+			coordinates(addresses)
+
+
+class Test_distance_matrix(object):
+	@pytest.mark.parametrize('unit, exp', [
+		(DistanceUnitEnum.KILOMETER, 3935.75),
+		(DistanceUnitEnum.MILE, 2445.56),
+		('km', 3935.75),
+	])
+	def test_geodesic(self, unit, exp):
+		res = distance_matrix([NEW_YORK, LOS_ANGELES], unit=unit)
+
+		assert res.shape == (2, 2)
+		assert res[0, 0] == res[1, 1] == 0
+		assert res[0, 1] == res[1, 0] == pytest.approx(exp, abs=0.01)
+
+	def test_geodesic_random(self):
+		points = random_points(50)
+
+		res = distance_matrix(points, metric=RouteMetricEnum.GEODESIC)
+
+		for i, j in [(0, 1), (3, 40), (49, 7)]:
+			assert res[i, j] == pytest.approx(haversine(points[i], points[j], 3958.7613), rel=1e-9)
+
+	def test_planar(self):
+		points = random_points(50)
+
+		geodesic = distance_matrix(points, metric=RouteMetricEnum.GEODESIC)
+		euclidean = distance_matrix(points, metric=RouteMetricEnum.EUCLIDEAN)
+		manhattan = distance_matrix(points, metric=RouteMetricEnum.MANHATTAN)
+
+		# a small area: the projection is close to the sphere
+		assert np.allclose(euclidean, geodesic, rtol=0.01)
+		assert np.all(manhattan >= euclidean - 1e-9)
+		assert np.all(manhattan <= euclidean * np.sqrt(2) + 1e-9)
+		assert np.allclose(euclidean, euclidean.T)
+
+	@pytest.mark.parametrize('metric', [RouteMetricEnum.EUCLIDEAN, RouteMetricEnum.GEODESIC])
+	def test_antimeridian(self, metric):
+		res = distance_matrix(np.array([[0, 179.9], [0, -179.9]]), metric=metric, unit='km')
+
+		assert res[0, 1] == pytest.approx(22.239, abs=0.001)
+
+	def test_destinations(self):
+		origins = random_points(5)
+		destinations = random_points(7, seed=1)
+
+		res = distance_matrix(origins, destinations, dtype='float32')
+
+		assert res.shape == (5, 7)
+		assert res.dtype == np.float32
+		assert np.allclose(res, distance_block(origins, destinations, RouteMetricEnum.GEODESIC, 3958.7613))
+
+	def test_empty(self):
+		assert distance_matrix([]).shape == (0, 0)
+
+	@pytest.mark.parametrize('kwargs', [
+		{'metric': RouteMetricEnum.MATRIX},
+		{'unit': 'ft'},
+		{'block_size': 0},
+	])
+	def test_invalid(self, kwargs):
+		with pytest.raises(ValueError):
+			distance_matrix([NEW_YORK], **kwargs)
+
+
+class Test_iter_blocks(object):
+	def test_blocks(self):
+		points = random_points(25)
+
+		blocks = list(iter_blocks(points, block_size=10))
+
+		assert [b[0] for b in blocks] == [slice(0, 10), slice(10, 20), slice(20, 25)]
+		assert np.array_equal(np.vstack([b[1] for b in blocks]), distance_matrix(points))
+
+	def test_process_pool(self):
+		points = random_points(40)
+
+		blocks = list(iter_blocks(points, block_size=7, processes=2))
+
+		assert [b[0].start for b in blocks] == list(range(0, 40, 7))
+		assert np.array_equal(np.vstack([b[1] for b in blocks]), distance_matrix(points, processes=1))
+
+	@mock.patch('route4me.sdk._internals.matrix.PARALLEL_THRESHOLD', 10)
+	@mock.patch('route4me.sdk._internals.matrix.multiprocessing.cpu_count', return_value=2)
+	@mock.patch('route4me.sdk._internals.matrix.ProcessPoolExecutor')
+	def test_pool_for_big_sets(self, mock_pool, mock_cpu_count):
+		assert len(list(iter_blocks(random_points(5)))) == 1
+		assert not mock_pool.called
+
+		mock_pool.return_value.__enter__.return_value.submit.side_effect = RuntimeError('pool')
+		with pytest.raises(RuntimeError):
+			list(iter_blocks(random_points(10)))
+		mock_pool.assert_called_once_with(max_workers=2)
+
+
+def test_import_numpy_missing():
+	with mock.patch.dict(sys.modules, {'numpy': None}):
+		with pytest.raises(ImportError) as exc_info:
+			_import_numpy()
+
+	assert 'route4me-sdk[matrix]' in str(exc_info.value)
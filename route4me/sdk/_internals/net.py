@@ -2,16 +2,29 @@
 
 """
 Internal module, provides HTTP access to API
+
+:mod:`requests` is imported on the first use (not on import of this module):
+it is the heaviest dependency of the SDK and short-living processes should
+not pay for it until the first request.
 """
 
 import re
-import requests
-import platform
 import logging
+import threading
 
+from ..errors import Route4MeError
 from ..errors import Route4MeNetworkError
 from ..errors import Route4MeApiError
 
+from .retry import RetryPolicy
+from .retry import RetryStats
+from .retry import call_with_retries
+from .codec import get_codec
+from .timeouts import TimeoutPolicy
+from .timeouts import Deadline
+from .timeouts import current_deadline
+from .timeouts import derive_deadline
+
 from ..version import VERSION_STRING
 from ..version import RELEASE_STRING
 from ..version import BUILD
@@ -19,13 +32,56 @@
 
 log = logging.getLogger(__name__)
 
+_USER_AGENTS = {}
+
+
+def _import_requests():
+	import requests
+	return requests
+
+
+def _accept_encoding():
+	"""
+	Encodings of responses, that :mod:`urllib3` decodes (``br`` only with
+	``brotli`` installed)
+	"""
+	try:
+		from urllib3.util.request import ACCEPT_ENCODING
+	except ImportError:
+		# requests < 2.16 vendors urllib3
+		from requests.packages.urllib3.util.request import ACCEPT_ENCODING
+	return ACCEPT_ENCODING
+
+
+def _not_connected(exc):
+	"""
+	Checks, whether :class:`requests.exceptions.ConnectionError` is raised
+	before the connection was established (the request is certainly not
+	sent: refused connection, unresolved host)
+	"""
+	try:
+		from urllib3.exceptions import NewConnectionError
+	except ImportError:
+		# requests < 2.16 vendors urllib3
+		from requests.packages.urllib3.exceptions import NewConnectionError
+
+	reason = exc.args[0] if exc.args else None
+	# urllib3 wraps the error of the last attempt into MaxRetryError
+	reason = getattr(reason, 'reason', reason)
+	return isinstance(reason, NewConnectionError)
+
 
 class FluentRequest(object):
 	def __init__(self):
+		requests = _import_requests()
 		self._r = requests.Request(
 			method='GET'
 		)
 		self.__timeout = 10
+		self.__stream = False
+		self.__json = None
+		self.__codec = None
+		self.__compression = None
 
 		# self.method = method
 		# self.url = url
@@ -42,7 +98,26 @@ def __cut_qs(url):
 		return re.sub(r'\?.*', '?***', url)
 
 	def timeout(self, timeout):
-		self.__timeout = float(timeout)
+		"""
+		:param timeout: Seconds, or ``(connect, read)`` tuple
+		:type timeout: float or tuple
+		"""
+		if isinstance(timeout, tuple):
+			self.__timeout = tuple(None if t is None else float(t) for t in timeout)
+		else:
+			self.__timeout = float(timeout)
+		return self
+
+	@property
+	def timeout_sec(self):
+		return self.__timeout
+
+	def stream(self, stream=True):
+		"""
+		Do not download the body on sending: read it with
+		:meth:`requests.Response.iter_content`
+		"""
+		self.__stream = bool(stream)
 		return self
 
 	def header(self, name, value):
@@ -76,26 +151,72 @@ def form(self, form):
 		return self
 
 	def json(self, json):
+		"""
+		Sets the JSON body, encoded on sending
+
+		:param json: Python objects, or already encoded JSON (:class:`bytes`)
+		"""
 		self.header('Content-Type', 'application/json')
-		self._r.json = json
+		self.__json = json
 		return self
 
-	def send(self):
-		with requests.sessions.Session() as s:
-			s.max_redirects = 1
-			s.verify = True
+	def codec(self, codec):
+		"""
+		:param codec: Codec of the JSON body, defaults to \
+			:func:`~route4me.sdk._internals.codec.get_codec`
+		:type codec: ~route4me.sdk._internals.codec.JsonCodec
+		"""
+		self.__codec = codec
+		return self
 
-			preq = s.prepare_request(self._r)
-			log.debug(
-				'send prepared request [%s] [%s]',
-				preq.method,
-				FluentRequest.__cut_qs(preq.url)
-			)
+	def compression(self, compression):
+		"""
+		:param compression: Compression of the JSON body
+		:type compression: ~route4me.sdk._internals.compression.Compression
+		"""
+		self.__compression = compression
+		return self
 
-			return s.send(
-				preq,
-				timeout=self.__timeout
-			)
+	def send(self, session=None):
+		"""
+		Sends the request
+
+		:param session: Long-living session (with connection pool) to send \
+			the request through. When omitted, a new one-shot session is \
+			created (and closed) for this single request, defaults to None
+		:type session: requests.Session, optional
+		:returns: Response
+		:rtype: requests.Response
+		"""
+		if session is not None:
+			return self.__send(session)
+
+		with new_session() as s:
+			return self.__send(s)
+
+	def __send(self, s):
+		body = self.__json
+		if body is not None and not isinstance(body, (bytes, bytearray)):
+			body = (self.__codec or get_codec()).dumps(body)
+		if body is not None and self.__compression is not None:
+			body, encoding = self.__compression.compress(body)
+			if encoding is not None:
+				self.header('Content-Encoding', encoding)
+		if body is not None:
+			self._r.data = body
+
+		preq = s.prepare_request(self._r)
+		log.debug(
+			'send prepared request [%s] [%s]',
+			preq.method,
+			FluentRequest.__cut_qs(preq.url)
+		)
+
+		return s.send(
+			preq,
+			timeout=self.__timeout,
+			stream=self.__stream,
+		)
 
 	def __repr__(self):
 		return '<FluentRequest, [{method}] [{url}]>'.format(
@@ -104,31 +225,275 @@ def __repr__(self):
 		)
 
 
+def build_user_agent(http_library, http_library_version):
+	"""
+	Builds the value of `User-Agent` HTTP-header
+
+	:param http_library: Name of the underlying HTTP library
+	:type http_library: str
+	:param http_library_version: Version of the underlying HTTP library
+	:type http_library_version: str
+	:rtype: str
+	"""
+	key = (http_library, http_library_version)
+	ua = _USER_AGENTS.get(key)
+	if ua is None:
+		# platform.* calls are slow (platform.release() may spawn `uname`),
+		# and the result never changes during the life of the process
+		ua = _USER_AGENTS[key] = _format_user_agent(http_library, http_library_version)
+	return ua
+
+
+def _format_user_agent(http_library, http_library_version):
+	import platform
+
+	return (
+		'{http_library}/{http_library_version} '
+		'({platform_name} {platform_version}) '
+		'Route4Me-Python-SDK/{sdk_version} '
+		'{python_implementation}/{python_version}'
+	).format(
+		http_library=http_library,
+		http_library_version=http_library_version,
+		platform_name=platform.system(),
+		platform_version=platform.release(),
+		sdk_version=VERSION_STRING,
+		python_version=platform.python_version(),
+		python_implementation=platform.python_implementation(),
+	)
+
+
+def build_url(base_host, path, subdomain=None, scheme='https'):
+	"""
+	Builds full URL of the API method
+
+	:param base_host: API host
+	:type base_host: str
+	:param path: Path (part of URL) to API method
+	:type path: str
+	:param subdomain: Subdomain of the :paramref:`~build_url.base_host`, \
+		defaults to None
+	:type subdomain: str, optional
+	:param scheme: URL scheme, defaults to ``https``
+	:type scheme: str, optional
+	:rtype: str
+	"""
+	subdomain = subdomain + '.' if subdomain else ''
+
+	# remove leading slashes from path
+	path = re.sub(r'^/+', '', path)
+
+	url = '{scheme}://{subdomain}{base_host}/{path}'.format(
+		scheme=scheme,
+		subdomain=subdomain,
+		base_host=base_host,
+		path=path,
+	)
+	return url
+
+
+def new_session(
+	pool_connections=10,
+	pool_maxsize=10,
+	pool_block=False,
+	keep_alive=True,
+):
+	"""
+	Creates new :class:`requests.Session`, configured to access Route4Me API
+
+	:param pool_connections: How many connection pools (one pool per \
+		host/subdomain) to cache
+	:type pool_connections: int, optional
+	:param pool_maxsize: Max number of connections to keep alive in one \
+		pool (per host/subdomain)
+	:type pool_maxsize: int, optional
+	:param pool_block: Block (and wait for a free connection) when all \
+		:paramref:`~new_session.pool_maxsize` connections to the host are \
+		in use, instead of opening extra (not pooled) connections
+	:type pool_block: bool, optional
+	:param keep_alive: Keep connections open between requests
+	:type keep_alive: bool, optional
+	:returns: Configured session
+	:rtype: requests.Session
+	"""
+	requests = _import_requests()
+	from requests.adapters import HTTPAdapter
+
+	s = requests.sessions.Session()
+	s.max_redirects = 1
+	s.verify = True
+
+	adapter = HTTPAdapter(
+		pool_connections=pool_connections,
+		pool_maxsize=pool_maxsize,
+		pool_block=pool_block,
+	)
+	s.mount('https://', adapter)
+	s.mount('http://', adapter)
+
+	if not keep_alive:
+		s.headers['Connection'] = 'close'
+
+	return s
+
+
 class NetworkClient(object):
 	"""
 	Internal API-client
 
+	Owns one long-living, thread-safe :class:`requests.Session`: all requests
+	sent through the client reuse pooled connections (one pool per
+	host/subdomain), so TCP and TLS handshakes are not repeated on every
+	call.
+
+	The client should be closed when it is not needed anymore: use
+	:meth:`close` or the context manager:
+
+	.. code-block:: python
+
+		with NetworkClient(api_key) as nc:
+			nc.get('/api.v4/optimization_problem.php')
+
 	.. versionadded:: 0.1.0
 	"""
-	def __init__(self, api_key, base_host='route4me.com'):
-
-		user_agent = (
-			'requests/{requests_version} '
-			'({platform_name} {platform_version}) '
-			'Route4Me-Python-SDK/{sdk_version} '
-			'{python_implementation}/{python_version}'
-		).format(
-			requests_version=requests.__version__,
-			platform_name=platform.system(),
-			platform_version=platform.release(),
-			sdk_version=VERSION_STRING,
-			python_version=platform.python_version(),
-			python_implementation=platform.python_implementation(),
-		)
+	def __init__(
+		self,
+		api_key,
+		base_host='route4me.com',
+		pool_connections=10,
+		pool_maxsize=10,
+		pool_block=False,
+		keep_alive=True,
+		scheme='https',
+		subdomains=True,
+		retry=None,
+		rate_limit=None,
+		circuit_breaker=None,
+		cache=None,
+		json_codec=None,
+		compression=None,
+		timeouts=None,
+	):
+		"""
+		:param api_key: Route4Me API key
+		:type api_key: str
+		:param base_host: API host, defaults to ``route4me.com``
+		:type base_host: str, optional
+		:param pool_connections: How many connection pools (one per \
+			host/subdomain) to cache, see :func:`new_session`
+		:type pool_connections: int, optional
+		:param pool_maxsize: Max number of connections kept alive per \
+			host/subdomain, see :func:`new_session`
+		:type pool_maxsize: int, optional
+		:param pool_block: Limit the number of simultaneous connections per \
+			host/subdomain to :paramref:`~NetworkClient.pool_maxsize`, see \
+			:func:`new_session`
+		:type pool_block: bool, optional
+		:param keep_alive: Keep connections open between requests
+		:type keep_alive: bool, optional
+		:param scheme: URL scheme, defaults to ``https``
+		:type scheme: str, optional
+		:param subdomains: Send requests to subdomains of the \
+			:paramref:`~NetworkClient.base_host` (like ``www.route4me.com``). \
+			Disable to send all requests to the host itself (a proxy, \
+			a local stub server), defaults to :data:`True`
+		:type subdomains: bool, optional
+		:param retry: Retry policy for transient failures (timeouts, \
+			``429``, ``503`` etc.), defaults to \
+			:class:`~route4me.sdk._internals.retry.RetryPolicy` with default \
+			settings. Use :data:`~route4me.sdk._internals.retry.NO_RETRY` \
+			to disable retries.
+		:type retry: ~route4me.sdk._internals.retry.RetryPolicy, optional
+		:param rate_limit: Client-side rate limiter, every attempt (retries \
+			too) waits for a token. Pass the same limiter to several clients \
+			to share the limit, see \
+			:mod:`~route4me.sdk._internals.ratelimit`. Unlimited by default.
+		:type rate_limit: ~route4me.sdk._internals.ratelimit.TokenBucket, \
+			optional
+		:param circuit_breaker: Fail fast (without sending requests) while \
+			an API method is unavailable, see \
+			:mod:`~route4me.sdk._internals.breaker`. Disabled by default.
+		:type circuit_breaker: \
+			~route4me.sdk._internals.breaker.CircuitBreaker, optional
+		:param cache: Cache of ``GET`` responses, see \
+			:mod:`~route4me.sdk._internals.cache`. Disabled by default.
+		:type cache: ~route4me.sdk._internals.cache.ResponseCache, optional
+		:param json_codec: Codec of request bodies and responses, defaults \
+			to the fastest installed one, see \
+			:mod:`~route4me.sdk._internals.codec`
+		:type json_codec: ~route4me.sdk._internals.codec.JsonCodec, optional
+		:param compression: Compression of JSON bodies (``Content-Encoding``), \
+			see :mod:`~route4me.sdk._internals.compression`. Disabled by \
+			default.
+		:type compression: \
+			~route4me.sdk._internals.compression.Compression, optional
+		:param timeouts: Connect, read and total timeouts per API method, \
+			see :mod:`~route4me.sdk._internals.timeouts`. By default \
+			requests fail after 5 seconds of connecting or 10 seconds of \
+			waiting for the response (120 seconds for creating and updating \
+			optimizations).
+		:type timeouts: ~route4me.sdk._internals.timeouts.TimeoutPolicy, \
+			optional
+		"""
 
-		self._user_agent = user_agent
+		self._user_agent = None
 		self.base_host = base_host
 		self.api_key = api_key
+		self.scheme = scheme
+		self.subdomains = subdomains
+		self.retry = retry if retry is not None else RetryPolicy()
+		self._retry_stats = RetryStats()
+		self.rate_limit = rate_limit
+		self.circuit_breaker = circuit_breaker
+		self.cache = cache
+		self._json_codec = json_codec
+		self.compression = compression
+		self.timeouts = timeouts if timeouts is not None else TimeoutPolicy()
+
+		self._session_options = {
+			'pool_connections': pool_connections,
+			'pool_maxsize': pool_maxsize,
+			'pool_block': pool_block,
+			'keep_alive': keep_alive,
+		}
+		self._session = None
+		self._session_lock = threading.Lock()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	@property
+	def session(self):
+		"""
+		Long-living session with the connection pool, shared by all requests
+		of this client. Created on first access (thread-safe).
+
+		:rtype: requests.Session
+		"""
+		s = self._session
+		if s is None:
+			with self._session_lock:
+				if self._session is None:
+					self._session = new_session(**self._session_options)
+				s = self._session
+		return s
+
+	def close(self):
+		"""
+		Closes all pooled connections.
+
+		It is safe to call this method several times. The client is still
+		usable after closing: a new session will be opened on the next request.
+		"""
+		with self._session_lock:
+			s = self._session
+			self._session = None
+
+		if s is not None:
+			s.close()
 
 	@property
 	def user_agent(self):
@@ -143,24 +508,49 @@ def user_agent(self):
 
 		:rtype: {str}
 		"""  # noqa: E101
-		return self._user_agent
+		ua = self._user_agent
+		if ua is None:
+			requests = _import_requests()
+			ua = self._user_agent = build_user_agent('requests', requests.__version__)
+		return ua
 
-	def __url(self, path, subdomain):
-		subdomain = subdomain + '.' if subdomain else ''
+	@property
+	def json_codec(self):
+		"""
+		Codec of request bodies and responses (resolved on the first use)
 
-		# remove leading slashes from path
-		path = re.sub(r'^/+', '', path)
+		:rtype: ~route4me.sdk._internals.codec.JsonCodec
+		"""
+		codec = self._json_codec
+		if codec is None:
+			codec = self._json_codec = get_codec()
+		return codec
 
-		url = 'https://{subdomain}{base_host}/{path}'.format(
-			subdomain=subdomain,
-			base_host=self.base_host,
-			path=path,
+	@property
+	def retry_stats(self):
+		"""
+		Retry metrics of the client (number of requests, retries by reason,
+		requests failed after retries)
+
+		:rtype: ~route4me.sdk._internals.retry.RetryStats
+		"""
+		return self._retry_stats
+
+	def __url(self, path, subdomain):
+		return build_url(
+			self.base_host,
+			path,
+			subdomain=subdomain if self.subdomains else None,
+			scheme=self.scheme,
 		)
-		return url
 
-	def __read_response(self, req):
+	def __read_response(self, req, raw=False):
 		res = self.__handle_net_exceptions(req)
 
+		if raw and res.status_code == 304:
+			# answer to a conditional request
+			return res
+
 		if res.status_code >= 300:
 			# TODO: need to parse text!
 			msg = res.text
@@ -176,10 +566,13 @@ def __read_response(self, req):
 				# TODO: implement! currently we have link to method, not a value
 				# method=req.method,
 				status_code=res.status_code,
+				headers=dict(res.headers),
 			)
 			raise ex
 		res.encoding = 'utf-8'
-		return res.json()
+		if raw:
+			return res
+		return self.json_codec.loads(res.content)
 
 	def __handle_net_exceptions(self, req):
 		req.user_agent(self.user_agent)
@@ -188,6 +581,7 @@ def __handle_net_exceptions(self, req):
 		req.header('Route4Me-Agent-Commit', COMMIT)
 		req.header('Route4Me-Agent-Build', BUILD)
 		req.accept('application/json')
+		req.header('Accept-Encoding', _accept_encoding())
 		req.header('Route4Me-Api-Key', self.api_key)
 
 		req.qs({
@@ -195,8 +589,9 @@ def __handle_net_exceptions(self, req):
 			'format': 'json',
 		})
 
+		requests = _import_requests()
 		try:
-			return req.send()
+			return req.send(session=self.session)
 
 		except requests.exceptions.SSLError as exc:
 			err = Route4MeNetworkError(
@@ -222,8 +617,10 @@ def __handle_net_exceptions(self, req):
 				message='Network timeout (still no bytes received)',
 				code='route4me.sdk.network.timeout',
 				details={
-					'timeout': req.timeout,
+					'timeout': req.timeout_sec,
 					'timeout_unit': 'sec',
+					# connection was not established: the request is not sent
+					'request_sent': not isinstance(exc, requests.exceptions.ConnectTimeout),
 				},
 				inner=exc,
 			)
@@ -233,92 +630,314 @@ def __handle_net_exceptions(self, req):
 			err = Route4MeNetworkError(
 				message='Can not connect, check your connection settings',
 				code='route4me.sdk.network.no_connection',
+				details={
+					# connection was not established: the request is not sent
+					'request_sent': not _not_connected(exc),
+				},
 				inner=exc,
 			)
 			log.error(err, exc_info=True)
 			raise err
 
-	def get(self, path, query=None, subdomain=None, timeout_sec=None):
-
-		url = self.__url(path, subdomain=subdomain)
-
-		req = FluentRequest()
-		req.method('GET')
-		req.url(url)
-		req.qs(query)
-
-		if timeout_sec is not None:
-			req.timeout(timeout_sec)
-
-		return self.__read_response(req)
-
-	# TODO: post, put and delete have the same body. Remove duplicate code!
-	def post(self, path, query=None, data=None, subdomain=None, timeout_sec=None):
+	def __send_guarded(self, req, circuit, raw, deadline):
+		# the token is taken before the circuit is checked: waiting for it
+		# says nothing about the API method, and must not hold a trial call
+		if self.rate_limit is not None:
+			if deadline is None:
+				self.rate_limit.acquire()
+			else:
+				delay = self.rate_limit.reserve()
+				if delay > 0:
+					deadline.sleep(delay)
+					deadline.check()
+
+		breaker = self.circuit_breaker
+		if breaker is not None:
+			breaker.before_call(circuit)
+
+		if breaker is None:
+			return self.__read_response(req, raw=raw)
 
+		try:
+			res = self.__read_response(req, raw=raw)
+		except Route4MeError as exc:
+			breaker.record(circuit, exc)
+			raise
+		except BaseException:
+			# interrupted, or an unexpected error: not a success of the probe
+			breaker.release(circuit)
+			raise
+		breaker.record(circuit)
+		return res
+
+	def __request(
+		self,
+		method,
+		path,
+		query=None,
+		data=None,
+		form=None,
+		subdomain=None,
+		timeout_sec=None,
+		idempotent=None,
+		raw=False,
+		headers=None,
+		stream=False,
+		deadline=None,
+	):
 		url = self.__url(path, subdomain=subdomain)
+		circuit = (subdomain, path.lstrip('/'))
 
-		req = FluentRequest()
-		req.method('POST')
-		req.url(url)
-		req.qs(query)
-		req.json(data)
+		timeout = self.timeouts.resolve(method, path, timeout_sec)
+		deadline = derive_deadline(timeout.total, current_deadline(), Deadline.of(deadline))
 
-		if timeout_sec is not None:
-			req.timeout(timeout_sec)
+		def attempt():
+			req = FluentRequest()
+			req.method(method)
+			req.url(url)
+			req.qs(query)
+			if form is not None:
+				req.form(form)
+			elif method != 'GET':
+				req.json(data)
+				req.codec(self.json_codec)
+				req.compression(self.compression)
 
-		return self.__read_response(req)
+			connect, read = timeout.connect, timeout.read
+			if deadline is not None:
+				connect, read = deadline.clamp(connect), deadline.clamp(read)
+			req.timeout((connect, read))
 
-	# TODO: post, put and delete have the same body. Remove duplicate code!
-	def put(self, path, query=None, data=None, subdomain=None, timeout_sec=None):
+			for name, value in (headers or {}).items():
+				req.header(name, value)
 
-		url = self.__url(path, subdomain=subdomain)
+			if stream:
+				req.stream()
 
-		req = FluentRequest()
-		req.method('PUT')
-		req.url(url)
-		req.qs(query)
-		req.json(data)
+			return self.__send_guarded(req, circuit, raw, deadline)
 
-		if timeout_sec is not None:
-			req.timeout(timeout_sec)
+		try:
+			return call_with_retries(
+				attempt,
+				self.retry,
+				self._retry_stats,
+				method,
+				idempotent=idempotent,
+				deadline=deadline,
+			)
+		finally:
+			if self.cache is not None and method != 'GET':
+				# even failed (timed out) request could change the entity
+				self.cache.invalidate(subdomain, path, query)
 
-		return self.__read_response(req)
+	def get(self, path, query=None, subdomain=None, timeout_sec=None, cache_ttl=None, deadline=None):
+		"""
+		GETs JSON data
+
+		:param timeout_sec: Timeouts of the call: seconds (connect and \
+			read), or :class:`~route4me.sdk._internals.timeouts.Timeout`. \
+			Not set fields are taken from \
+			:paramref:`~NetworkClient.timeouts`.
+		:type timeout_sec: float or \
+			~route4me.sdk._internals.timeouts.Timeout, optional
+		:param deadline: Deadline (or cancellation token) of the caller, or \
+			the remaining budget in seconds: socket timeouts are reduced to \
+			the remaining time, no retries are sent after it. Deadlines of \
+			:func:`~route4me.sdk._internals.timeouts.deadline_scope` apply \
+			too.
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:param cache_ttl: How long to cache the response (when the client \
+			has a cache): number of seconds, or a function, that accepts \
+			the response and returns the number of seconds. Defaults to \
+			the TTL of the cache, see \
+			:class:`~route4me.sdk._internals.cache.ResponseCache`
+		:type cache_ttl: float or callable, optional
+		"""
+		cache = self.cache
+		if cache is None:
+			return self.__request(
+				'GET',
+				path,
+				query=query,
+				subdomain=subdomain,
+				timeout_sec=timeout_sec,
+				deadline=deadline,
+			)
 
-	# TODO: post, put and delete have the same body. Remove duplicate code!
-	def delete(self, path, query=None, data=None, subdomain=None, timeout_sec=None):
+		key = cache.key(subdomain, path, query)
+		body = cache.lookup(key)
+		if body is not None:
+			return self.json_codec.loads(body)
+
+		def send(headers):
+			return self.__request(
+				'GET',
+				path,
+				query=query,
+				subdomain=subdomain,
+				timeout_sec=timeout_sec,
+				raw=True,
+				headers=headers,
+				deadline=deadline,
+			)
 
-		url = self.__url(path, subdomain=subdomain)
+		stale = cache.stale_entry(key)
+		res = send(cache.conditional_headers(stale))
+
+		if res.status_code == 304 and stale is None:
+			# nothing to revalidate (the entry is evicted, or the server
+			# answers 304 on its own): request the body unconditionally
+			log.warning('304 Not Modified without a cached entry of [%s], requesting again', path)
+			res = send(None)
+			if res.status_code == 304:
+				raise Route4MeApiError(
+					'Not Modified without a conditional request',
+					code='route4me.sdk.api_error',
+					details={
+						'status_code': res.status_code,
+					},
+					status_code=res.status_code,
+					headers=dict(res.headers),
+				)
+
+		not_modified = res.status_code == 304
+		body = stale['body'] if not_modified else res.text
+		value = self.json_codec.loads(body)
+
+		cache.store(
+			key,
+			body,
+			cache.ttl_for(path, value, cache_ttl),
+			headers=res.headers,
+			not_modified=not_modified,
+		)
+		return value
 
-		req = FluentRequest()
-		req.method('DELETE')
-		req.url(url)
-		req.qs(query)
-		req.json(data)
+	def get_stream(self, path, query=None, subdomain=None, timeout_sec=None, chunk_size=65536, deadline=None):
+		"""
+		GETs the response body chunk by chunk, without buffering it
+
+		The request is sent on the first iteration, the connection is
+		released when the generator is exhausted or closed. Responses are not
+		cached. Use with :func:`~route4me.sdk._internals.jsonstream.iter_array_items`
+		to parse large responses incrementally.
+
+		:param chunk_size: Size of chunks (bytes), defaults to 64 KiB
+		:type chunk_size: int, optional
+		:param deadline: Deadline of the call, see :meth:`get`: also stops \
+			reading the body
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Generator of response chunks
+		:rtype: generator(bytes)
+		:raises ~route4me.sdk.errors.Route4MeNetworkError: if the connection \
+			is lost while reading the body
+		"""
+		# checked between chunks of the body too
+		deadline = derive_deadline(Deadline.of(deadline), current_deadline())
 
-		if timeout_sec is not None:
-			req.timeout(timeout_sec)
+		res = self.__request(
+			'GET',
+			path,
+			query=query,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			raw=True,
+			stream=True,
+			deadline=deadline,
+		)
 
-		return self.__read_response(req)
+		requests = _import_requests()
+		try:
+			for chunk in res.iter_content(chunk_size=chunk_size):
+				if deadline is not None and deadline.expired():
+					raise deadline.error(request_sent=True)
+				yield chunk
+		except requests.exceptions.RequestException as exc:
+			err = Route4MeNetworkError(
+				message='Connection lost while reading the response',
+				code='route4me.sdk.network.no_connection',
+				details={
+					'request_sent': True,
+				},
+				inner=exc,
+			)
+			log.error(err, exc_info=True)
+			raise err
+		finally:
+			res.close()
 
-	def form(self, path, query=None, data=None, subdomain=None, timeout_sec=None):
+	def post(self, path, query=None, data=None, subdomain=None, timeout_sec=None, idempotent=None, deadline=None):
 		"""
-		Posts form data as `multipart/form-data`.
+		Posts JSON data
 
-		:param path str:         Path (part of URL) to API method
-		:param subdomains [str]: Send request to other subdomain of the API
-		:param **qargs: [description]
-		:returns: API response, JSON converted to ..
-		:rtype: {dict}
+		:param idempotent: Retry the request on all transient errors (as \
+			``GET``). By default ``POST`` is retried only when it certainly \
+			was not processed, see \
+			:class:`~route4me.sdk._internals.retry.RetryPolicy`
+		:type idempotent: bool, optional
 		"""
-		url = self.__url(path, subdomain=subdomain)
+		return self.__request(
+			'POST',
+			path,
+			query=query,
+			data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			idempotent=idempotent,
+			deadline=deadline,
+		)
 
-		req = FluentRequest()
-		req.method('POST')
-		req.url(url)
-		req.qs(query)
-		req.form(data)
+	def put(self, path, query=None, data=None, subdomain=None, timeout_sec=None, deadline=None):
+		return self.__request(
+			'PUT',
+			path,
+			query=query,
+			data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			deadline=deadline,
+		)
 
-		if timeout_sec is not None:
-			req.timeout(timeout_sec)
+	def delete(self, path, query=None, data=None, subdomain=None, timeout_sec=None, deadline=None):
+		return self.__request(
+			'DELETE',
+			path,
+			query=query,
+			data=data,
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			deadline=deadline,
+		)
 
-		return self.__read_response(req)
+	def form(self, path, query=None, data=None, subdomain=None, timeout_sec=None, idempotent=None, deadline=None):
+		"""
+		Posts form data as `application/x-www-form-urlencoded`.
+
+		:param path: Path (part of URL) to API method
+		:type path: str
+		:param subdomain: Send request to other subdomain of the API
+		:type subdomain: str, optional
+		:param timeout_sec: Timeouts of the call, see :meth:`get`
+		:type timeout_sec: float or \
+			~route4me.sdk._internals.timeouts.Timeout, optional
+		:param idempotent: Retry the request on all transient errors, see \
+			:meth:`post`
+		:type idempotent: bool, optional
+		:param deadline: Deadline of the call, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: API response, JSON converted to Python objects
+		:rtype: dict
+		"""
+		return self.__request(
+			'POST',
+			path,
+			query=query,
+			form=data if data is not None else {},
+			subdomain=subdomain,
+			timeout_sec=timeout_sec,
+			idempotent=idempotent,
+			deadline=deadline,
+		)
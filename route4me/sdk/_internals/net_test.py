@@ -4,10 +4,26 @@
 import pytest
 import json
 import logging
+import threading
+
+import mock
 
 from .net import NetworkClient
+from .net import build_user_agent
+from .net import FluentRequest
+from .codec import get_codec
+from .compression import Compression
+from .timeouts import Timeout
+from .timeouts import TimeoutPolicy
+from .timeouts import Deadline
+from .timeouts import deadline_scope
+from .retry import NO_RETRY
+from .breaker import CircuitBreaker
+from .cache import ResponseCache
+from ..errors import Route4MeError
 from ..errors import Route4MeNetworkError
 from ..errors import Route4MeApiError
+from ..self_test import api_error
 
 log = logging.getLogger(__name__)
 
@@ -31,6 +47,179 @@ def test_default_fields(self):
 			'user_agent contains `requests` and `Route4Me`'
 		)
 
+	def test_user_agent_is_cached(self):
+		with mock.patch('platform.release', return_value='4.8.0') as mock_release:
+			ua1 = build_user_agent('test-cached-lib', '1.0')
+			ua2 = build_user_agent('test-cached-lib', '1.0')
+
+		assert ua1 is ua2
+		assert '4.8.0' in ua1
+		assert mock_release.call_count == 1
+
+	def test_user_agent_is_shared_by_clients(self):
+		nc1 = NetworkClient(api_key='AAAA')
+		nc2 = NetworkClient(api_key='BBBB')
+
+		assert nc1.user_agent is nc2.user_agent
+
+
+class TestNetworkClientSession:
+	def test_session_is_reused(self):
+		nc = NetworkClient(api_key='AAAA')
+
+		s1 = nc.session
+		s2 = nc.session
+
+		assert s1 is s2
+
+	def test_pool_options(self):
+		nc = NetworkClient(
+			api_key='AAAA',
+			pool_connections=3,
+			pool_maxsize=7,
+			pool_block=True,
+		)
+
+		adapter = nc.session.get_adapter('https://www.route4me.com/')
+
+		assert adapter._pool_connections == 3
+		assert adapter._pool_maxsize == 7
+		assert adapter._pool_block is True
+		assert nc.session.max_redirects == 1
+		assert nc.session.verify is True
+
+	@pytest.mark.parametrize('keep_alive, exp', [
+		(True, 'keep-alive'),
+		(False, 'close'),
+	])
+	def test_keep_alive(self, keep_alive, exp):
+		nc = NetworkClient(api_key='AAAA', keep_alive=keep_alive)
+
+		assert nc.session.headers['Connection'] == exp
+
+	def test_close(self):
+		nc = NetworkClient(api_key='AAAA')
+		s1 = nc.session
+
+		with mock.patch.object(s1, 'close') as mock_close:
+			nc.close()
+			nc.close()
+
+		mock_close.assert_called_once_with()
+		assert nc.session is not s1
+
+	def test_context_manager(self):
+		with NetworkClient(api_key='AAAA') as nc:
+			s = nc.session
+
+		assert nc._session is None
+		assert s is not None
+
+	def test_requests_are_sent_through_session(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			nc = NetworkClient(api_key='AAAA')
+			nc.get('anything')
+			nc.post('anything', data={})
+
+		mock_req_class.return_value.send.assert_called_with(session=nc.session)
+
+
+def fake_response(status_code, data=None, headers=None):
+	res = mock.Mock()
+	res.status_code = status_code
+	res.headers = headers or {}
+	res.text = json.dumps(data)
+	res.content = res.text.encode('utf-8')
+	res.json.return_value = data
+	return res
+
+
+class TestNetworkClientRetry:
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_get_is_retried(self, mock_sleep):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = [
+				fake_response(503, headers={'Retry-After': '2'}),
+				fake_response(429),
+				fake_response(200, {'ok': 1}),
+			]
+
+			nc = NetworkClient(api_key='AAAA')
+			res = nc.get('anything')
+
+		assert res == {'ok': 1}
+		assert mock_sleep.call_args_list[0] == mock.call(2.0)
+		assert nc.retry_stats.as_dict()['reasons'] == {
+			'status:503': 1,
+			'status:429': 1,
+		}
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	@pytest.mark.parametrize('method', ['post', 'form'])
+	def test_post_is_not_retried_on_503(self, mock_sleep, method):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = [
+				fake_response(503),
+				fake_response(200, {'ok': 1}),
+			]
+
+			nc = NetworkClient(api_key='AAAA')
+			with pytest.raises(Route4MeApiError) as exc_info:
+				getattr(nc, method)('anything', data={})
+
+		assert exc_info.value.status_code == 503
+		assert mock_req_class.return_value.send.call_count == 1
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_idempotent_post_is_retried(self, mock_sleep):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = [
+				fake_response(503),
+				fake_response(200, {'ok': 1}),
+			]
+
+			nc = NetworkClient(api_key='AAAA')
+			res = nc.post('anything', data={}, idempotent=True)
+
+		assert res == {'ok': 1}
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	@pytest.mark.parametrize('method', ['get', 'post'])
+	def test_retried_on_connection_refused(self, mock_sleep, method):
+		nc = NetworkClient(api_key='AAAA', base_host='127.0.0.1:1')
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			getattr(nc, method)('anything')
+
+		exc = exc_info.value
+		assert exc.code == 'route4me.sdk.network.no_connection'
+		assert exc.details == {'request_sent': False}
+		# the server has not seen POST, so it is retried as GET
+		assert nc.retry_stats.as_dict()['retries'] == 2
+
+	def test_connection_lost_is_sent(self):
+		import requests
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = requests.exceptions.ConnectionError('reset')
+
+			nc = NetworkClient(api_key='AAAA', retry=NO_RETRY)
+			with pytest.raises(Route4MeNetworkError) as exc_info:
+				nc.post('anything', data={})
+
+		assert exc_info.value.details == {'request_sent': True}
+
+	def test_no_retry(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(503)
+
+			nc = NetworkClient(api_key='AAAA', retry=NO_RETRY)
+			with pytest.raises(Route4MeApiError):
+				nc.get('anything')
+
+		assert mock_req_class.return_value.send.call_count == 1
+
 
 @pytest.mark.network
 class TestNetworkClientRequestsOverHttpbin:
@@ -249,3 +438,422 @@ def test_get_raises_on_status_400(self):
 		exc = exc_info.value
 		assert exc is not None
 		assert exc.code == 'route4me.sdk.api_error'
+
+
+class TestNetworkClientRateLimit:
+	def test_every_attempt_takes_token(self):
+		limiter = mock.Mock()
+		with mock.patch('route4me.sdk._internals.retry.time.sleep'):
+			with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+				mock_req_class.return_value.send.side_effect = [
+					fake_response(503),
+					fake_response(200, {'ok': 1}),
+				]
+
+				nc = NetworkClient(api_key='AAAA', rate_limit=limiter)
+				nc.get('anything')
+
+		assert limiter.acquire.call_count == 2
+
+
+class TestNetworkClientCircuitBreaker:
+	def test_fails_fast_when_open(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(503)
+
+			nc = NetworkClient(
+				api_key='AAAA',
+				retry=NO_RETRY,
+				circuit_breaker=CircuitBreaker(failure_threshold=2),
+			)
+			for _ in range(2):
+				with pytest.raises(Route4MeApiError):
+					nc.get('/api.v4/optimization_problem.php', subdomain='www')
+
+			with pytest.raises(Route4MeNetworkError) as exc_info:
+				nc.get('api.v4/optimization_problem.php', subdomain='www')
+
+			# other path: request is sent
+			with pytest.raises(Route4MeApiError):
+				nc.get('api.v4/address.php', subdomain='www')
+
+		assert exc_info.value.code == 'route4me.sdk.network.circuit_open'
+		assert mock_req_class.return_value.send.call_count == 3
+
+	@pytest.mark.parametrize('exc_class', [ValueError, KeyboardInterrupt])
+	def test_unexpected_error_is_not_success(self, exc_class):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+		circuit = ('www', 'api.v4/optimization_problem.php')
+		breaker.before_call(circuit)
+		breaker.record(circuit, api_error(503))
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = exc_class('broken')
+
+			nc = NetworkClient(api_key='AAAA', retry=NO_RETRY, circuit_breaker=breaker)
+			with pytest.raises(exc_class):
+				nc.get('api.v4/optimization_problem.php', subdomain='www')
+
+		# the failed probe does not close the circuit
+		assert breaker.state(circuit) == 'half_open'
+
+	def test_rate_limit_wait_does_not_hold_trial_call(self):
+		breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+		circuit = ('www', 'api.v4/optimization_problem.php')
+		breaker.before_call(circuit)
+		breaker.record(circuit, api_error(503))
+
+		limiter = mock.Mock()
+		limiter.reserve.return_value = 30
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {'ok': 1})
+
+			nc = NetworkClient(api_key='AAAA', retry=NO_RETRY, rate_limit=limiter, circuit_breaker=breaker)
+			with pytest.raises(Route4MeNetworkError) as exc_info:
+				nc.get('api.v4/optimization_problem.php', subdomain='www', deadline=0.05)
+
+			assert exc_info.value.code == 'route4me.sdk.network.deadline_exceeded'
+			assert breaker.state(circuit) == 'half_open'
+			assert not mock_req_class.return_value.send.called
+
+			# the trial call is still available
+			limiter.reserve.return_value = 0
+			res = nc.get('api.v4/optimization_problem.php', subdomain='www', deadline=5)
+
+		assert res == {'ok': 1}
+		assert breaker.state(circuit) == 'closed'
+
+
+class TestNetworkClientCache:
+	def test_get_is_cached(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {'a': [1]})
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache())
+			res1 = nc.get('anything', query={'x_id': 1})
+			res1['a'].append(2)
+			res2 = nc.get('/anything', query={'x_id': 1})
+			nc.get('anything', query={'x_id': 2})
+
+		assert res2 == {'a': [1]}
+		assert mock_req_class.return_value.send.call_count == 2
+		assert nc.cache.stats == {'hits': 1, 'misses': 2, 'not_modified': 0}
+
+	def test_cache_ttl_hint(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {'a': 1})
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache())
+			nc.get('anything', cache_ttl=lambda res: 0)
+			nc.get('anything', cache_ttl=lambda res: 0)
+
+		assert mock_req_class.return_value.send.call_count == 2
+
+	@pytest.mark.parametrize('method', ['put', 'delete', 'post'])
+	def test_mutation_invalidates(self, method):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {'a': 1})
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache())
+			nc.get('anything', query={'x_id': 1})
+			getattr(nc, method)('anything', query={'x_id': 1, 'reoptimize': 1}, data={})
+			nc.get('anything', query={'x_id': 1})
+
+		assert mock_req_class.return_value.send.call_count == 3
+
+	def test_conditional_request(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = [
+				fake_response(200, {'a': 1}, headers={'ETag': '"v1"'}),
+				fake_response(304),
+				fake_response(200, {'a': 2}, headers={'ETag': '"v2"'}),
+			]
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache(default_ttl=0))
+			res1 = nc.get('anything')
+			header_names = [c[0][0] for c in mock_req_class.return_value.header.call_args_list]
+			assert 'If-None-Match' not in header_names
+
+			res2 = nc.get('anything')
+			mock_req_class.return_value.header.assert_any_call('If-None-Match', '"v1"')
+
+			res3 = nc.get('anything')
+
+		assert res1 == res2 == {'a': 1}
+		assert res3 == {'a': 2}
+		assert nc.cache.stats['not_modified'] == 1
+		assert nc.cache.stale_entry(nc.cache.key(None, 'anything'))['validators'] == {'etag': '"v2"'}
+
+	def test_not_modified_without_entry(self):
+		not_modified = fake_response(304)
+		not_modified.text = ''
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = [
+				fake_response(200, {'a': 1}, headers={'ETag': '"v1"'}),
+				not_modified,
+				fake_response(200, {'a': 2}, headers={'ETag': '"v2"'}),
+			]
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache(default_ttl=0))
+			nc.get('anything')
+			# evicted before the (unsolicited) 304
+			nc.cache.backend.clear()
+			res = nc.get('anything')
+
+		assert res == {'a': 2}
+		assert mock_req_class.return_value.send.call_count == 3
+		assert nc.cache.stats['not_modified'] == 0
+
+	def test_not_modified_unconditionally(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(304)
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache())
+			with pytest.raises(Route4MeApiError) as exc_info:
+				nc.get('anything')
+
+		assert exc_info.value.status_code == 304
+		assert mock_req_class.return_value.send.call_count == 2
+
+
+class TestNetworkClientStream:
+	def test_get_stream(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			res = mock_req_class.return_value.send.return_value = fake_response(200)
+			res.iter_content.return_value = iter([b'{"a":', b' 1}'])
+
+			nc = NetworkClient(api_key='AAAA', cache=ResponseCache())
+			chunks = nc.get_stream('anything', chunk_size=2)
+
+			assert not mock_req_class.return_value.send.called
+			assert b''.join(chunks) == b'{"a": 1}'
+
+		mock_req_class.return_value.stream.assert_called_once_with()
+		res.iter_content.assert_called_once_with(chunk_size=2)
+		res.close.assert_called_once_with()
+		assert nc.cache.stats['misses'] == 0
+
+	def test_connection_lost(self):
+		import requests
+
+		def broken():
+			yield b'{"a":'
+			raise requests.exceptions.ChunkedEncodingError('lost')
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			res = mock_req_class.return_value.send.return_value = fake_response(200)
+			res.iter_content.return_value = broken()
+
+			nc = NetworkClient(api_key='AAAA')
+			with pytest.raises(Route4MeNetworkError) as exc_info:
+				list(nc.get_stream('anything'))
+
+		assert exc_info.value.code == 'route4me.sdk.network.no_connection'
+		res.close.assert_called_once_with()
+
+	def test_api_error(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(404, {'errors': ['not found']})
+
+			nc = NetworkClient(api_key='AAAA')
+			with pytest.raises(Route4MeApiError):
+				list(nc.get_stream('anything'))
+
+
+class TestJsonCodec:
+	@pytest.mark.parametrize('data, exp', [
+		({'a': u'☃'}, u'{"a":"☃"}'.encode('utf-8')),
+		(b'{"pre": "encoded"}', b'{"pre": "encoded"}'),
+	])
+	def test_request_body(self, data, exp):
+		import requests
+
+		session = requests.Session()
+		with mock.patch.object(session, 'send') as mock_send:
+			FluentRequest().method('POST').url('https://example.com').json(data).codec(get_codec('json')).send(session)
+
+		preq = mock_send.call_args[0][0]
+		assert preq.body == exp
+		assert preq.headers['Content-Type'] == 'application/json'
+
+	def test_client_codec(self):
+		codec = mock.Mock(wraps=get_codec('json'))
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {'a': 1})
+
+			nc = NetworkClient(api_key='AAAA', json_codec=codec)
+			res = nc.post('anything', data={'b': 2})
+
+		assert res == {'a': 1}
+		mock_req_class.return_value.codec.assert_called_once_with(codec)
+		codec.loads.assert_called_once_with(b'{"a": 1}')
+
+
+class TestCompression:
+	@pytest.mark.parametrize('size, exp_encoding', [
+		(10, None),
+		(1000, 'gzip'),
+	])
+	def test_request_body(self, size, exp_encoding):
+		import requests
+		import zlib
+
+		data = {'addresses': ['Main St'] * size}
+		session = requests.Session()
+		with mock.patch.object(session, 'send') as mock_send:
+			req = FluentRequest().method('POST').url('https://example.com').json(data)
+			req.codec(get_codec('json')).compression(Compression('gzip', threshold=1024))
+			req.send(session)
+
+		preq = mock_send.call_args[0][0]
+		assert preq.headers.get('Content-Encoding') == exp_encoding
+		body = zlib.decompress(preq.body, 16 + zlib.MAX_WBITS) if exp_encoding else preq.body
+		assert json.loads(body.decode('utf-8')) == data
+
+	def test_accept_encoding(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			compression = Compression()
+			nc = NetworkClient(api_key='AAAA', compression=compression)
+			nc.put('anything', data={})
+
+		mock_req_class.return_value.compression.assert_called_once_with(compression)
+		accept = [c[0][1] for c in mock_req_class.return_value.header.call_args_list if c[0][0] == 'Accept-Encoding']
+		assert 'gzip' in accept[0]
+
+
+class TestTimeouts:
+	@pytest.mark.parametrize('method, path, timeout_sec, exp', [
+		('get', 'api.v4/optimization_problem.php', None, (5.0, 10.0)),
+		('post', 'api.v4/optimization_problem.php', None, (5.0, 120.0)),
+		('get', 'anything', 3, (3.0, 3.0)),
+		('get', 'anything', Timeout(read=30), (5.0, 30.0)),
+	])
+	def test_per_method(self, method, path, timeout_sec, exp):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			nc = NetworkClient(api_key='AAAA')
+			getattr(nc, method)(path, timeout_sec=timeout_sec)
+
+		mock_req_class.return_value.timeout.assert_called_once_with(exp)
+
+	def test_deadline_clamps_timeouts(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			nc = NetworkClient(api_key='AAAA', timeouts=TimeoutPolicy(default=Timeout(connect=5, read=10, total=2)))
+			nc.get('anything')
+
+		connect, read = mock_req_class.return_value.timeout.call_args[0][0]
+		assert 1.5 < connect <= 2
+		assert 1.5 < read <= 2
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_scope_deadline(self, mock_sleep):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			nc = NetworkClient(api_key='AAAA')
+			with deadline_scope(-1):
+				with pytest.raises(Route4MeNetworkError) as exc_info:
+					nc.get('anything')
+
+		assert exc_info.value.code == 'route4me.sdk.network.deadline_exceeded'
+		assert not mock_req_class.return_value.send.called
+
+
+class TestDeadlinePropagation:
+	def test_deadline_clamps_timeouts(self):
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(200, {})
+
+			nc = NetworkClient(api_key='AAAA')
+			nc.put('anything', data={}, deadline=2)
+
+		connect, read = mock_req_class.return_value.timeout.call_args[0][0]
+		assert 1.5 < connect <= 2
+		assert 1.5 < read <= 2
+
+	def test_cancellation_stops_retries(self):
+		token = Deadline()
+
+		def send(**kwargs):
+			token.cancel()
+			return fake_response(503)
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.side_effect = send
+
+			nc = NetworkClient(api_key='AAAA')
+			with pytest.raises(Route4MeApiError):
+				nc.get('anything', deadline=token)
+
+		assert mock_req_class.return_value.send.call_count == 1
+
+	def test_cancellation_interrupts_delay(self):
+		token = Deadline()
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			mock_req_class.return_value.send.return_value = fake_response(503, headers={'Retry-After': '30'})
+
+			nc = NetworkClient(api_key='AAAA')
+			threading.Timer(0.05, token.cancel).start()
+			with pytest.raises(Route4MeError) as exc_info:
+				nc.get('anything', deadline=token)
+
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
+		assert mock_req_class.return_value.send.call_count == 1
+
+	def test_cancelled_in_scope(self):
+		token = Deadline()
+		token.cancel()
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			nc = NetworkClient(api_key='AAAA')
+			with deadline_scope(token):
+				with pytest.raises(Route4MeError) as exc_info:
+					nc.delete('anything')
+
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
+		assert not mock_req_class.return_value.send.called
+
+	def test_rate_limit_wait_is_limited(self):
+		limiter = mock.Mock()
+		limiter.reserve.return_value = 30
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			nc = NetworkClient(api_key='AAAA', rate_limit=limiter)
+			with pytest.raises(Route4MeNetworkError) as exc_info:
+				nc.get('anything', deadline=0.05)
+
+		assert exc_info.value.code == 'route4me.sdk.network.deadline_exceeded'
+		assert not limiter.acquire.called
+		assert not mock_req_class.return_value.send.called
+
+	def test_stream_stops_reading(self):
+		token = Deadline()
+
+		def chunks():
+			yield b'{"a":'
+			token.cancel()
+			yield b' 1}'
+
+		with mock.patch('route4me.sdk._internals.net.FluentRequest') as mock_req_class:
+			res = mock_req_class.return_value.send.return_value = fake_response(200)
+			res.iter_content.return_value = chunks()
+
+			nc = NetworkClient(api_key='AAAA')
+			received = []
+			with pytest.raises(Route4MeError) as exc_info:
+				for chunk in nc.get_stream('anything', deadline=token):
+					received.append(chunk)
+
+		assert received == [b'{"a":']
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
+		assert exc_info.value.details['request_sent'] is True
+		res.close.assert_called_once_with()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+Paging helpers for array-like responses of the Route4Me API
+"""
+
+import threading
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .timeouts import bind_deadline
+
+log = logging.getLogger(__name__)
+
+
+class _PageFetcher(threading.Thread):
+	"""
+	Fetches one page in a background thread
+	"""
+
+	def __init__(self, fetch_page, limit, offset):
+		super(_PageFetcher, self).__init__(name='route4me-sdk-page-prefetch')
+		self.daemon = True
+
+		# the page is requested in the deadline scope of the consumer
+		self._fetch_page = bind_deadline(fetch_page)
+		self._limit = limit
+		self._offset = offset
+
+		self._page = None
+		self._exc = None
+
+	def run(self):
+		try:
+			self._page = self._fetch_page(self._limit, self._offset)
+		except Exception as exc:
+			self._exc = exc
+
+	def result(self):
+		self.join()
+		if self._exc is not None:
+			raise self._exc
+		return self._page
+
+
+def is_last_page(page, limit, offset):
+	"""
+	Checks, whether the page is the last one
+
+	:param page: Page
+	:type page: ~route4me.sdk.utils.PagedList
+	:param limit: Requested page size
+	:type limit: int
+	:param offset: Requested offset
+	:type offset: int
+	:rtype: bool
+	"""
+	cnt = len(page)
+	if cnt == 0 or cnt < limit:
+		return True
+
+	return page.total is not None and offset + cnt >= page.total
+
+
+def iterate_pages(fetch_page, page_size, prefetch=False):
+	"""
+	Enumerates items of all pages, requesting pages one by one
+
+	Only one page (two pages with :paramref:`~iterate_pages.prefetch`) is
+	kept in memory.
+
+	:param fetch_page: Function, that accepts ``limit`` and ``offset`` and \
+		returns :class:`~route4me.sdk.utils.PagedList`
+	:type fetch_page: callable
+	:param page_size: Page size (``limit``)
+	:type page_size: int
+	:param prefetch: Fetch the next page in a background thread while items \
+		of the current page are consumed, defaults to :data:`False`
+	:type prefetch: bool, optional
+	:returns: Generator of items
+	:raises ValueError: if :paramref:`~iterate_pages.page_size` is not positive
+	"""
+	page_size = int(page_size)
+	if page_size <= 0:
+		raise ValueError('page_size', 'positive int expected')
+
+	offset = 0
+	page = fetch_page(page_size, offset)
+
+	while True:
+		last = is_last_page(page, page_size, offset)
+		offset += page_size
+
+		fetcher = None
+		if prefetch and not last:
+			fetcher = _PageFetcher(fetch_page, page_size, offset)
+			fetcher.start()
+
+		for item in page:
+			yield item
+
+		if last:
+			return
+
+		if fetcher is not None:
+			page = fetcher.result()
+		else:
+			page = fetch_page(page_size, offset)
+
+
+def fetch_all_pages(fetch_page, page_size, workers=4):
+	"""
+	Fetches items of all pages: requests the first page and then, when the
+	total count is known, requests the rest pages in parallel
+
+	Failed requests are retried by the client (see
+	:class:`~route4me.sdk._internals.retry.RetryPolicy`), not here: retries
+	of pages would multiply attempts of the client.
+
+	:param fetch_page: Function, that accepts ``limit`` and ``offset`` and \
+		returns :class:`~route4me.sdk.utils.PagedList`
+	:type fetch_page: callable
+	:param page_size: Page size (``limit``)
+	:type page_size: int
+	:param workers: Max number of pages, requested at the same time, \
+		defaults to 4
+	:type workers: int, optional
+	:returns: All items, in order of pages
+	:rtype: list
+	:raises ~route4me.sdk.errors.Route4MeError: if a page failed (or the \
+		deadline of the caller has expired)
+	:raises ValueError: if :paramref:`~fetch_all_pages.page_size` or \
+		:paramref:`~fetch_all_pages.workers` is not positive
+	"""
+	page_size = int(page_size)
+	if page_size <= 0:
+		raise ValueError('page_size', 'positive int expected')
+	workers = int(workers)
+	if workers <= 0:
+		raise ValueError('workers', 'positive int expected')
+
+	@bind_deadline
+	def fetch(offset):
+		return fetch_page(page_size, offset)
+
+	first = fetch(0)
+	items = list(first)
+
+	if is_last_page(first, page_size, 0):
+		return items
+
+	if first.total is None:
+		# can't split to pages without total count, go one by one
+		offset = page_size
+		while True:
+			page = fetch(offset)
+			items.extend(page)
+			if is_last_page(page, page_size, offset):
+				return items
+			offset += page_size
+
+	offsets = range(page_size, first.total, page_size)
+
+	with ThreadPoolExecutor(max_workers=min(workers, len(offsets))) as executor:
+		for page in executor.map(fetch, offsets):
+			items.extend(page)
+
+	return items
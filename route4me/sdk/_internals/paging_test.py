@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from route4me.sdk.utils import PagedList
+
+from ..errors import Route4MeNetworkError
+
+from .paging import iterate_pages
+from .paging import is_last_page
+from .paging import fetch_all_pages
+
+
+class FakeListEndpoint(object):
+	def __init__(self, total, fail_on_offset=None, fail_times=None, exc_class=RuntimeError, with_total=True):
+		self.total = total
+		self.fail_on_offset = fail_on_offset
+		self.fail_times = fail_times
+		self.exc_class = exc_class
+		self.with_total = with_total
+		self.calls = []
+		self.threads = set()
+		self._lock = threading.Lock()
+
+	def __call__(self, limit, offset):
+		with self._lock:
+			self.calls.append((limit, offset))
+			self.threads.add(threading.current_thread().name)
+
+			if offset == self.fail_on_offset and self.fail_times != 0:
+				if self.fail_times is not None:
+					self.fail_times -= 1
+				raise self.exc_class('page failed')
+
+		items = list(range(offset, min(offset + limit, self.total)))
+		total = self.total if self.with_total else None
+		return PagedList(total=total, limit=limit, offset=offset, items=items)
+
+
+class Test_is_last_page(object):
+	@pytest.mark.parametrize('items, total, limit, offset, exp', [
+		([], 10, 5, 10, True),
+		([1, 2], 10, 5, 0, True),
+		([1, 2, 3, 4, 5], 10, 5, 0, False),
+		([1, 2, 3, 4, 5], 10, 5, 5, True),
+		([1, 2, 3, 4, 5], None, 5, 5, False),
+	])
+	def test_is_last_page(self, items, total, limit, offset, exp):
+		page = PagedList(total=total, limit=limit, offset=offset, items=items)
+
+		assert is_last_page(page, limit, offset) is exp
+
+
+class Test_iterate_pages(object):
+	@pytest.mark.parametrize('prefetch', [False, True])
+	@pytest.mark.parametrize('total, page_size, exp_calls', [
+		(0, 10, [(10, 0)]),
+		(7, 10, [(10, 0)]),
+		(10, 10, [(10, 0)]),
+		(25, 10, [(10, 0), (10, 10), (10, 20)]),
+	])
+	def test_all_items_in_order(self, total, page_size, exp_calls, prefetch):
+		fetch = FakeListEndpoint(total)
+
+		act = list(iterate_pages(fetch, page_size, prefetch=prefetch))
+
+		assert act == list(range(total))
+		assert fetch.calls == exp_calls
+
+	def test_lazy(self):
+		fetch = FakeListEndpoint(100)
+
+		gen = iterate_pages(fetch, 10)
+		assert fetch.calls == []
+
+		assert next(gen) == 0
+		assert fetch.calls == [(10, 0)]
+
+	def test_prefetch_in_background_thread(self):
+		fetch = FakeListEndpoint(25)
+
+		gen = iterate_pages(fetch, 10, prefetch=True)
+		assert next(gen) == 0
+
+		# the second page is requested before the first one is consumed
+		for t in threading.enumerate():
+			if t.name == 'route4me-sdk-page-prefetch':
+				t.join()
+		assert fetch.calls == [(10, 0), (10, 10)]
+
+		assert list(gen) == list(range(1, 25))
+		assert 'route4me-sdk-page-prefetch' in fetch.threads
+
+	@pytest.mark.parametrize('prefetch', [False, True])
+	def test_error_is_raised_to_consumer(self, prefetch):
+		fetch = FakeListEndpoint(25, fail_on_offset=10)
+
+		act = []
+		with pytest.raises(RuntimeError):
+			for i in iterate_pages(fetch, 10, prefetch=prefetch):
+				act.append(i)
+
+		assert act == list(range(10))
+
+	@pytest.mark.parametrize('page_size', [0, -1])
+	def test_raise_on_wrong_page_size(self, page_size):
+		with pytest.raises(ValueError):
+			list(iterate_pages(FakeListEndpoint(10), page_size))
+
+
+class Test_fetch_all_pages(object):
+	@pytest.mark.parametrize('total, page_size, workers', [
+		(0, 10, 4),
+		(7, 10, 4),
+		(10, 10, 4),
+		(25, 10, 4),
+		(1000, 7, 3),
+		(1000, 7, 100),
+	])
+	def test_all_items_in_order(self, total, page_size, workers):
+		fetch = FakeListEndpoint(total)
+
+		act = fetch_all_pages(fetch, page_size, workers=workers)
+
+		assert act == list(range(total))
+		exp_offsets = list(range(0, max(total, 1), page_size))
+		assert sorted(o for _, o in fetch.calls) == exp_offsets
+
+	def test_parallel(self):
+		fetch = FakeListEndpoint(100)
+
+		fetch_all_pages(fetch, 10, workers=4)
+
+		# first page - in the current thread, others - in pool
+		assert threading.current_thread().name in fetch.threads
+		assert len(fetch.threads) > 1
+
+	def test_without_total(self):
+		fetch = FakeListEndpoint(25, with_total=False)
+
+		act = fetch_all_pages(fetch, 10)
+
+		assert act == list(range(25))
+		assert fetch.calls == [(10, 0), (10, 10), (10, 20)]
+
+	@pytest.mark.parametrize('exc_class', [Route4MeNetworkError, RuntimeError])
+	def test_failed_page_is_not_retried(self, exc_class):
+		fetch = FakeListEndpoint(45, fail_on_offset=20, fail_times=1, exc_class=exc_class)
+
+		with pytest.raises(exc_class):
+			fetch_all_pages(fetch, 10)
+
+		# the client retries requests, the helper doesn't multiply attempts
+		assert [o for _, o in fetch.calls].count(20) == 1
+
+	@pytest.mark.parametrize('page_size, workers', [
+		(0, 1),
+		(1, 0),
+	])
+	def test_raise_on_wrong_args(self, page_size, workers):
+		with pytest.raises(ValueError):
+			fetch_all_pages(FakeListEndpoint(10), page_size, workers=workers)
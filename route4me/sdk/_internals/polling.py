@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+Polling of long-running operations (like optimizations in progress)
+
+Fixed-interval polling either reacts slowly or floods the API. Intervals
+of :class:`PollPolicy` depend on the current state of the operation (some
+states pass in a second, others take minutes) and grow while the state
+doesn't change; a new state starts from its base interval again:
+
+.. code-block:: python
+
+	poll = PollPolicy(intervals={OptimizationStateEnum.OPTIMIZING: 10})
+	opt = r4m.optimizations.wait_until_done(ID, timeout=600, poll=poll)
+"""
+
+import time
+import random
+import logging
+
+from ..enums import OptimizationStateEnum
+from ..errors import Route4MeError
+
+log = logging.getLogger(__name__)
+
+#: Base polling intervals (seconds) of optimization states: matrix and
+#: directions are computed in seconds, optimizing takes most of the time
+DEFAULT_INTERVALS = {
+	OptimizationStateEnum.INITIAL.value: 1,
+	OptimizationStateEnum.MATRIX_PROCESSING.value: 2,
+	OptimizationStateEnum.OPTIMIZING.value: 5,
+	OptimizationStateEnum.COMPUTING_DIRECTIONS.value: 2,
+}
+
+
+def _state_key(state):
+	return getattr(state, 'value', state)
+
+
+class PollPolicy(object):
+	"""
+	Describes how often to poll an operation in each state
+
+	Delay before the poll ``n`` in the same state (starting from ``1``) is
+	``interval * backoff ** (n - 1)``, capped by ``max_interval``. With
+	``jitter`` the delay is a random value between 75% and 100% of the
+	computed one, so many waiters do not poll in lockstep.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(
+		self,
+		intervals=None,
+		default_interval=2,
+		backoff=1.5,
+		max_interval=30,
+		jitter=True,
+	):
+		"""
+		:param intervals: Base intervals (seconds) by state (enum or its \
+			value), override :data:`DEFAULT_INTERVALS`
+		:type intervals: dict, optional
+		:param default_interval: Base interval of other states, seconds
+		:type default_interval: float, optional
+		:param backoff: Growth of the interval, while the state doesn't \
+			change, ``1`` --- fixed intervals
+		:type backoff: float, optional
+		:param max_interval: Max interval, seconds
+		:type max_interval: float, optional
+		:param jitter: Randomize intervals, defaults to :data:`True`
+		:type jitter: bool, optional
+		:raises ValueError: on not positive intervals or backoff less than 1
+		"""
+		merged = dict(DEFAULT_INTERVALS)
+		for state, interval in (intervals or {}).items():
+			merged[_state_key(state)] = interval
+
+		for interval in list(merged.values()) + [default_interval, max_interval]:
+			if interval <= 0:
+				raise ValueError('intervals', 'positive numbers expected')
+		if backoff < 1:
+			raise ValueError('backoff', 'not less than 1 expected')
+
+		self.intervals = dict((k, float(v)) for k, v in merged.items())
+		self.default_interval = float(default_interval)
+		self.backoff = float(backoff)
+		self.max_interval = float(max_interval)
+		self.jitter = jitter
+
+	def __repr__(self):
+		return '<PollPolicy, backoff={}, max_interval={}>'.format(self.backoff, self.max_interval)
+
+	def delay(self, state, polls):
+		"""
+		:param state: Current state (enum or its value)
+		:param polls: Number of polls, that have seen the state (``1`` after \
+			the first one)
+		:type polls: int
+		:returns: Delay before the next poll, seconds
+		:rtype: float
+		"""
+		interval = self.intervals.get(_state_key(state), self.default_interval)
+		delay = min(self.max_interval, interval * self.backoff ** max(0, polls - 1))
+		if self.jitter:
+			delay = random.uniform(0.75 * delay, delay)
+		return delay
+
+
+#: Policy of waiters without explicit one
+DEFAULT_POLL_POLICY = PollPolicy()
+
+
+class PollSchedule(object):
+	"""
+	Tracks states of a polled operation (or of a group of them) and computes
+	delays between polls
+	"""
+
+	def __init__(self, policy=None):
+		self.policy = policy if policy is not None else DEFAULT_POLL_POLICY
+		self.states = None
+		self.polls = 0
+
+	def next_delay(self, *states):
+		"""
+		:param states: States of polled operations, seen by the last poll
+		:returns: Delay before the next poll (the shortest one of the \
+			states), seconds
+		:rtype: float
+		"""
+		key = frozenset(_state_key(s) for s in states)
+		if key != self.states:
+			self.states = key
+			self.polls = 0
+		self.polls += 1
+
+		if not key:
+			return self.policy.delay(None, self.polls)
+		return min(self.policy.delay(s, self.polls) for s in key)
+
+
+def wait_timeout_error(deadline, **details):
+	"""
+	:param deadline: Expired (or cancelled) deadline of the waiter
+	:type deadline: ~route4me.sdk._internals.timeouts.Deadline
+	:param details: Details of the error (like the last seen state)
+	:returns: ``route4me.sdk.wait_timeout`` (or \
+		``route4me.sdk.cancelled``) error
+	:rtype: ~route4me.sdk.errors.Route4MeError
+	"""
+	if deadline.cancelled:
+		return deadline.error()
+
+	details.update({
+		'timeout': deadline.timeout,
+		'timeout_unit': 'sec',
+	})
+	return Route4MeError(
+		message='The operation is not completed in time',
+		code='route4me.sdk.wait_timeout',
+		details=details,
+	)
+
+
+def sleep_or_give_up(delay, deadline, **details):
+	"""
+	Sleeps before the next poll
+
+	:param delay: Seconds
+	:type delay: float
+	:param deadline: Deadline of the waiter
+	:type deadline: ~route4me.sdk._internals.timeouts.Deadline, optional
+	:param details: Details of the error
+	:raises ~route4me.sdk.errors.Route4MeError: when the deadline has \
+		expired (or is cancelled) during the delay, see \
+		:func:`wait_timeout_error`
+	"""
+	if deadline is None:
+		time.sleep(delay)
+		return
+
+	deadline.sleep(delay)
+	if deadline.expired():
+		raise wait_timeout_error(deadline, **details)
+
+
+def poll_until(fetch, state_of, is_done, policy=None, deadline=None):
+	"""
+	Polls an operation, until it is done
+
+	:param fetch: Function without arguments, requests the operation
+	:type fetch: callable
+	:param state_of: Function, that returns the state of the fetched \
+		operation
+	:type state_of: callable
+	:param is_done: Function, that checks, whether the state is final
+	:type is_done: callable
+	:param policy: Intervals between polls, defaults to \
+		:data:`DEFAULT_POLL_POLICY`
+	:type policy: PollPolicy, optional
+	:param deadline: Deadline of the waiter
+	:type deadline: ~route4me.sdk._internals.timeouts.Deadline, optional
+	:returns: The operation in the final state
+	:raises ~route4me.sdk.errors.Route4MeError: ``route4me.sdk.wait_timeout``, \
+		when the operation is not done before the deadline, or an error \
+		of :paramref:`~poll_until.fetch`
+	"""
+	schedule = PollSchedule(policy)
+	while True:
+		res = fetch()
+		state = state_of(res)
+		if is_done(state):
+			return res
+
+		delay = schedule.next_delay(state)
+		log.debug('state [%s] (poll %s), next poll in %.2f sec', state, schedule.polls, delay)
+		sleep_or_give_up(delay, deadline, state=state)
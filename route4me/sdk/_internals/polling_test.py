@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import mock
+
+from ..enums import OptimizationStateEnum
+from ..errors import Route4MeError
+
+from .polling import PollPolicy
+from .polling import PollSchedule
+from .polling import poll_until
+from .timeouts import Deadline
+
+
+OPTIMIZING = OptimizationStateEnum.OPTIMIZING.value
+INITIAL = OptimizationStateEnum.INITIAL.value
+
+
+class TestPollPolicy(object):
+	def test_backoff(self):
+		p = PollPolicy(jitter=False)
+
+		assert [p.delay(OPTIMIZING, n) for n in range(1, 5)] == [5, 7.5, 11.25, 16.875]
+		assert p.delay(OPTIMIZING, 100) == 30
+		assert p.delay(INITIAL, 1) == 1
+		assert p.delay(None, 1) == 2
+
+	def test_intervals(self):
+		p = PollPolicy(intervals={OptimizationStateEnum.OPTIMIZING: 1}, backoff=1, jitter=False)
+
+		assert p.delay(OptimizationStateEnum.OPTIMIZING, 10) == 1
+		assert p.delay(INITIAL, 10) == 1
+
+	def test_jitter(self):
+		p = PollPolicy()
+
+		for _ in range(100):
+			assert 3.75 <= p.delay(OPTIMIZING, 1) <= 5
+
+	@pytest.mark.parametrize('kwargs', [
+		{'intervals': {1: 0}},
+		{'default_interval': -1},
+		{'backoff': 0.5},
+	])
+	def test_invalid(self, kwargs):
+		with pytest.raises(ValueError):
+			PollPolicy(**kwargs)
+
+
+class TestPollSchedule(object):
+	def test_resets_on_state_change(self):
+		s = PollSchedule(PollPolicy(jitter=False))
+
+		assert s.next_delay(OPTIMIZING) == 5
+		assert s.next_delay(OPTIMIZING) == 7.5
+		assert s.next_delay(INITIAL) == 1
+
+	def test_shortest_of_states(self):
+		s = PollSchedule(PollPolicy(jitter=False))
+
+		assert s.next_delay(OPTIMIZING, INITIAL, OPTIMIZING) == 1
+		assert s.next_delay(INITIAL, OPTIMIZING) == 1.5
+
+
+class Test_poll_until(object):
+	@mock.patch('route4me.sdk._internals.polling.time.sleep')
+	def test_done(self, mock_sleep):
+		fetch = mock.Mock(side_effect=[1, 3, 3, 4])
+
+		res = poll_until(fetch, lambda r: r, lambda s: s == 4, policy=PollPolicy(jitter=False))
+
+		assert res == 4
+		assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 5, 7.5]
+
+	def test_timeout(self):
+		fetch = mock.Mock(return_value=OPTIMIZING)
+		policy = PollPolicy(default_interval=0.01, intervals={OPTIMIZING: 0.01}, backoff=1)
+
+		with pytest.raises(Route4MeError) as exc_info:
+			poll_until(fetch, lambda r: r, lambda s: False, policy=policy, deadline=Deadline(0.05))
+
+		exc = exc_info.value
+		assert exc.code == 'route4me.sdk.wait_timeout'
+		assert exc.details['state'] == OPTIMIZING
+		assert 2 <= fetch.call_count <= 6
+
+	def test_cancelled(self):
+		token = Deadline()
+
+		def fetch():
+			token.cancel()
+			return OPTIMIZING
+
+		with pytest.raises(Route4MeError) as exc_info:
+			poll_until(fetch, lambda r: r, lambda s: False, deadline=token)
+
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
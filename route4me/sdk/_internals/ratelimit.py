@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Client-side rate limiting (token bucket), to smooth traffic instead of
+being throttled by the Route4Me API (``429``)
+
+The bucket holds up to ``burst`` tokens and is refilled with ``rate`` tokens
+per second; every request takes one token. A request, that finds the bucket
+empty, *reserves* the next token and waits for it, so waiting requests are
+served in order of arrival and the long-term rate never exceeds ``rate``.
+
+.. code-block:: python
+
+	# shared by all endpoints of the client (and all threads using it)
+	r4m = ApiClient(api_key, rate_limit=TokenBucket(rate=10, burst=20))
+
+	# shared by all processes on the host
+	limiter = FileTokenBucket('/tmp/route4me.bucket', rate=10, burst=20)
+"""
+
+import os
+import time
+import struct
+import threading
+
+from . import monotonic as _clock
+
+
+def _refill(tokens, updated, now, rate, burst):
+	if now > updated:
+		tokens = min(burst, tokens + (now - updated) * rate)
+	return tokens
+
+
+def _validate(rate, burst):
+	rate = float(rate)
+	if rate <= 0:
+		raise ValueError('rate', 'positive number expected')
+
+	burst = rate if burst is None else float(burst)
+	if burst < 1:
+		raise ValueError('burst', 'at least 1 expected')
+	return rate, burst
+
+
+class TokenBucket(object):
+	"""
+	Thread-safe token bucket, shared by threads of one process
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, rate, burst=None):
+		"""
+		:param rate: Requests per second (long-term)
+		:type rate: float
+		:param burst: Max number of requests sent without waiting (bucket \
+			size), defaults to :paramref:`~TokenBucket.rate`
+		:type burst: float, optional
+		:raises ValueError: if :paramref:`~TokenBucket.rate` is not positive \
+			or :paramref:`~TokenBucket.burst` is less than 1
+		"""
+		self.rate, self.burst = _validate(rate, burst)
+
+		self._lock = threading.Lock()
+		self._tokens = self.burst
+		self._updated = _clock()
+
+	def __repr__(self):
+		return '<TokenBucket, rate={}, burst={}>'.format(self.rate, self.burst)
+
+	def reserve(self, tokens=1):
+		"""
+		Takes tokens (possibly, in advance)
+
+		:param tokens: Number of tokens to take
+		:type tokens: float, optional
+		:returns: How long to wait (seconds) before using the reserved tokens
+		:rtype: float
+		"""
+		with self._lock:
+			now = _clock()
+			self._tokens = _refill(self._tokens, self._updated, now, self.rate, self.burst) - tokens
+			self._updated = now
+			deficit = -self._tokens
+
+		return deficit / self.rate if deficit > 0 else 0.0
+
+	def acquire(self, tokens=1):
+		"""
+		Takes tokens, blocks until they are available
+
+		:param tokens: Number of tokens to take
+		:type tokens: float, optional
+		:returns: Time spent waiting, seconds
+		:rtype: float
+		"""
+		delay = self.reserve(tokens)
+		if delay > 0:
+			time.sleep(delay)
+		return delay
+
+
+class FileTokenBucket(object):
+	"""
+	Token bucket, shared by processes on the host through a state file
+
+	The state (number of tokens and the time of the last update) is stored in
+	:paramref:`~FileTokenBucket.path` and updated under an exclusive
+	:func:`fcntl.flock` lock. Processes should use the same ``rate`` and
+	``burst``. Available on POSIX systems only.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	_STATE = struct.Struct('<dd')
+
+	def __init__(self, path, rate, burst=None):
+		"""
+		:param path: Path to the state file (created if it is missing)
+		:type path: str
+		:param rate: Requests per second (long-term, all processes together)
+		:type rate: float
+		:param burst: Bucket size, defaults to :paramref:`~FileTokenBucket.rate`
+		:type burst: float, optional
+		:raises ValueError: on invalid :paramref:`~FileTokenBucket.rate` or \
+			:paramref:`~FileTokenBucket.burst`
+		:raises ImportError: on systems without :mod:`fcntl` (Windows)
+		"""
+		import fcntl
+		self._fcntl = fcntl
+
+		self.path = path
+		self.rate, self.burst = _validate(rate, burst)
+
+	def __repr__(self):
+		return '<FileTokenBucket, path={!r}, rate={}, burst={}>'.format(self.path, self.rate, self.burst)
+
+	def reserve(self, tokens=1):
+		"""
+		Takes tokens (possibly, in advance), see :meth:`TokenBucket.reserve`
+
+		:rtype: float
+		"""
+		fcntl = self._fcntl
+		state = self._STATE
+
+		fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+		try:
+			fcntl.flock(fd, fcntl.LOCK_EX)
+
+			# wall clock: monotonic clocks are not comparable between processes
+			now = time.time()
+
+			raw = os.read(fd, state.size)
+			if len(raw) == state.size:
+				avail, updated = state.unpack(raw)
+				avail = _refill(avail, updated, now, self.rate, self.burst)
+			else:
+				avail = self.burst
+
+			avail -= tokens
+
+			os.lseek(fd, 0, os.SEEK_SET)
+			os.write(fd, state.pack(avail, now))
+		finally:
+			# closing the descriptor releases the lock
+			os.close(fd)
+
+		return -avail / self.rate if avail < 0 else 0.0
+
+	def acquire(self, tokens=1):
+		"""
+		Takes tokens, blocks until they are available
+
+		:returns: Time spent waiting, seconds
+		:rtype: float
+		"""
+		delay = self.reserve(tokens)
+		if delay > 0:
+			time.sleep(delay)
+		return delay
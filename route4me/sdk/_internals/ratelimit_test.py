@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+import mock
+
+from .ratelimit import TokenBucket
+from .ratelimit import FileTokenBucket
+
+
+class TestTokenBucket(object):
+	@pytest.mark.parametrize('rate, burst', [
+		(0, None),
+		(-1, None),
+		(10, 0.5),
+	])
+	def test_invalid(self, rate, burst):
+		with pytest.raises(ValueError):
+			TokenBucket(rate, burst)
+
+	def test_burst_then_rate(self, clock):
+		bucket = TokenBucket(rate=10, burst=3)
+
+		delays = [bucket.reserve() for _ in range(6)]
+
+		assert delays == pytest.approx([0, 0, 0, 0.1, 0.2, 0.3])
+
+	def test_refill(self, clock):
+		bucket = TokenBucket(rate=10, burst=3)
+		for _ in range(3):
+			bucket.reserve()
+
+		clock.now += 0.2
+
+		assert bucket.reserve() == 0
+		assert bucket.reserve() == 0
+		assert bucket.reserve() == pytest.approx(0.1)
+
+	def test_refill_is_capped_by_burst(self, clock):
+		bucket = TokenBucket(rate=10, burst=2)
+
+		clock.now += 3600
+
+		delays = [bucket.reserve() for _ in range(3)]
+		assert delays == pytest.approx([0, 0, 0.1])
+
+	def test_shared_by_threads(self, clock):
+		bucket = TokenBucket(rate=100, burst=1)
+		delays = []
+		lock = threading.Lock()
+
+		def worker():
+			d = bucket.reserve()
+			with lock:
+				delays.append(d)
+
+		threads = [threading.Thread(target=worker) for _ in range(5)]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+
+		assert sorted(delays) == pytest.approx([0, 0.01, 0.02, 0.03, 0.04])
+
+	@mock.patch('route4me.sdk._internals.ratelimit.time.sleep')
+	def test_acquire_sleeps(self, mock_sleep, clock):
+		bucket = TokenBucket(rate=4, burst=1)
+
+		assert bucket.acquire() == 0
+		assert bucket.acquire() == 0.25
+
+		mock_sleep.assert_called_once_with(0.25)
+
+
+class TestFileTokenBucket(object):
+	@pytest.fixture(autouse=True)
+	def require_fcntl(self):
+		pytest.importorskip('fcntl')
+
+	def test_shared_by_instances(self, tmpdir):
+		path = str(tmpdir.join('bucket'))
+
+		b1 = FileTokenBucket(path, rate=1, burst=2)
+		b2 = FileTokenBucket(path, rate=1, burst=2)
+
+		assert b1.reserve() == 0
+		assert b2.reserve() == 0
+		assert b1.reserve() > 0.9
+		assert b2.reserve() > 1.9
+
+	def test_refill(self, tmpdir):
+		path = str(tmpdir.join('bucket'))
+		bucket = FileTokenBucket(path, rate=1, burst=1)
+
+		with mock.patch('route4me.sdk._internals.ratelimit.time.time', return_value=1000.0):
+			assert bucket.reserve() == 0
+			assert bucket.reserve() == 1.0
+
+		with mock.patch('route4me.sdk._internals.ratelimit.time.time', return_value=1002.0):
+			assert bucket.reserve() == 0
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""
+Retry policy for transient failures of the Route4Me API: timeouts, lost
+connections, rate limiting (``429``) and unavailable upstream (``502``,
+``503``, ``504``)
+"""
+
+import time
+import random
+import logging
+import threading
+
+from ..errors import Route4MeError
+from ..errors import Route4MeApiError
+
+log = logging.getLogger(__name__)
+
+#: Methods, that could be safely repeated (RFC 7231, section 4.2.2)
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+#: Statuses, that mean "not processed, try later"
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+#: Statuses, that are safe to retry even for non-idempotent requests: the
+#: request was rejected before processing
+NOT_PROCESSED_STATUSES = frozenset([429])
+
+#: Codes of network errors, that are worth a retry
+RETRY_CODES = frozenset([
+	'route4me.sdk.network.timeout',
+	'route4me.sdk.network.no_connection',
+])
+
+
+class RetryPolicy(object):
+	"""
+	Describes when and how long to wait before the next attempt
+
+	Idempotent requests (``GET``, ``PUT``, ``DELETE``) are retried on all
+	transient errors. Non-idempotent ones (``POST``, form) are retried only
+	when the request certainly was not processed: rejected with ``429`` or
+	failed to connect. Pass ``idempotent=True`` to the request method to
+	retry it as an idempotent one.
+
+	Delay before the attempt ``n`` (starting from ``1`` for the first retry)
+	is ``backoff_factor * 2 ** (n - 1)``, capped by ``backoff_max``. With
+	``jitter`` the delay is a random value between ``0`` and the computed one
+	("full jitter"), so clients do not retry in lockstep. ``Retry-After``
+	header of the response (seconds or HTTP-date) overrides the computed
+	delay (capped by ``retry_after_max``).
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(
+		self,
+		max_attempts=3,
+		backoff_factor=0.5,
+		backoff_max=30,
+		jitter=True,
+		statuses=RETRY_STATUSES,
+		codes=RETRY_CODES,
+		respect_retry_after=True,
+		retry_after_max=60,
+	):
+		"""
+		:param max_attempts: Max number of attempts (including the first \
+			one), ``1`` disables retries, defaults to 3
+		:type max_attempts: int, optional
+		:param backoff_factor: Delay before the first retry, seconds
+		:type backoff_factor: float, optional
+		:param backoff_max: Max delay between attempts, seconds
+		:type backoff_max: float, optional
+		:param jitter: Randomize delays, defaults to :data:`True`
+		:type jitter: bool, optional
+		:param statuses: HTTP statuses to retry
+		:type statuses: set(int), optional
+		:param codes: Codes of :class:`~route4me.sdk.errors.Route4MeError` \
+			to retry
+		:type codes: set(str), optional
+		:param respect_retry_after: Wait as long as ``Retry-After`` \
+			response header says
+		:type respect_retry_after: bool, optional
+		:param retry_after_max: Max accepted ``Retry-After``, seconds. \
+			The error is raised immediately, when the server asks to wait \
+			longer.
+		:type retry_after_max: float, optional
+		:raises ValueError: if :paramref:`~RetryPolicy.max_attempts` is not \
+			positive
+		"""
+		max_attempts = int(max_attempts)
+		if max_attempts <= 0:
+			raise ValueError('max_attempts', 'positive int expected')
+
+		self.max_attempts = max_attempts
+		self.backoff_factor = float(backoff_factor)
+		self.backoff_max = float(backoff_max)
+		self.jitter = jitter
+		self.statuses = frozenset(statuses)
+		self.codes = frozenset(codes)
+		self.respect_retry_after = respect_retry_after
+		self.retry_after_max = float(retry_after_max)
+
+	def __repr__(self):
+		return '<RetryPolicy, max_attempts={}, backoff_factor={}, backoff_max={}>'.format(
+			self.max_attempts,
+			self.backoff_factor,
+			self.backoff_max,
+		)
+
+	@staticmethod
+	def is_idempotent(method):
+		"""
+		:param method: HTTP method
+		:type method: str
+		:rtype: bool
+		"""
+		return method.upper() in IDEMPOTENT_METHODS
+
+	def reason(self, error):
+		"""
+		Retry reason of the error
+
+		:param error: Failure of the request
+		:type error: ~route4me.sdk.errors.Route4MeError
+		:returns: ``status:<code>`` for API errors, error code for network \
+			errors, :data:`None` if the error should not be retried
+		:rtype: str
+		"""
+		if isinstance(error, Route4MeApiError):
+			if error.status_code in self.statuses:
+				return 'status:{}'.format(error.status_code)
+			return None
+
+		if error.code in self.codes:
+			return error.code
+		return None
+
+	def backoff(self, attempt):
+		"""
+		Delay before the retry number :paramref:`~backoff.attempt`
+
+		:param attempt: Number of the retry, starting from ``1``
+		:type attempt: int
+		:returns: Delay, seconds
+		:rtype: float
+		"""
+		delay = min(self.backoff_max, self.backoff_factor * (2 ** (attempt - 1)))
+		if self.jitter:
+			delay = random.uniform(0, delay)
+		return delay
+
+	def delay(self, attempt, error, idempotent):
+		"""
+		Decides, whether to retry a failed attempt
+
+		:param attempt: Number of the failed attempt, starting from ``1``
+		:type attempt: int
+		:param error: Failure of the attempt
+		:type error: ~route4me.sdk.errors.Route4MeError
+		:param idempotent: Could the request be safely repeated
+		:type idempotent: bool
+		:returns: Delay before the next attempt (seconds), or :data:`None` \
+			if the error should be raised
+		:rtype: float
+		"""
+		if attempt >= self.max_attempts:
+			return None
+
+		if self.reason(error) is None:
+			return None
+
+		if not idempotent and not _not_processed(error):
+			return None
+
+		if self.respect_retry_after:
+			retry_after = _retry_after(error)
+			if retry_after is not None:
+				if retry_after > self.retry_after_max:
+					return None
+				return retry_after
+
+		return self.backoff(attempt)
+
+
+#: Policy without retries
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class RetryStats(object):
+	"""
+	Thread-safe counters of retries (metrics of a network client)
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.reset()
+
+	def reset(self):
+		with self._lock:
+			self._requests = 0
+			self._retries = 0
+			self._given_up = 0
+			self._reasons = {}
+
+	def record_request(self):
+		with self._lock:
+			self._requests += 1
+
+	def record_retry(self, reason):
+		with self._lock:
+			self._retries += 1
+			self._reasons[reason] = self._reasons.get(reason, 0) + 1
+
+	def record_given_up(self):
+		with self._lock:
+			self._given_up += 1
+
+	def as_dict(self):
+		"""
+		Snapshot of counters
+
+		:returns: ``requests`` (calls of the client), ``retries`` (repeated \
+			attempts), ``given_up`` (requests, failed after at least one \
+			retry) and ``reasons`` (retries by reason: ``status:503``, \
+			``route4me.sdk.network.timeout`` etc.)
+		:rtype: dict
+		"""
+		with self._lock:
+			return {
+				'requests': self._requests,
+				'retries': self._retries,
+				'given_up': self._given_up,
+				'reasons': dict(self._reasons),
+			}
+
+
+def call_with_retries(fn, policy, stats, method, idempotent=None, deadline=None):
+	"""
+	Calls :paramref:`~call_with_retries.fn` until success, non-retryable error
+	or the max number of attempts
+
+	:param fn: Function without arguments, sends one attempt
+	:type fn: callable
+	:param policy: Retry policy
+	:type policy: RetryPolicy
+	:param stats: Counters to update
+	:type stats: RetryStats
+	:param method: HTTP method
+	:type method: str
+	:param idempotent: Could the request be safely repeated, by default \
+		depends on :paramref:`~call_with_retries.method`
+	:type idempotent: bool, optional
+	:param deadline: No attempts are started after the deadline (or its \
+		cancellation), and no retries are scheduled, if the delay ends \
+		after it
+	:type deadline: ~route4me.sdk._internals.timeouts.Deadline, optional
+	:returns: Result of :paramref:`~call_with_retries.fn`
+	:raises ~route4me.sdk.errors.Route4MeError: error of the last attempt, \
+		``route4me.sdk.network.deadline_exceeded`` or \
+		``route4me.sdk.cancelled``
+	"""
+	if idempotent is None:
+		idempotent = policy.is_idempotent(method)
+
+	stats.record_request()
+
+	attempt = 1
+	while True:
+		if deadline is not None:
+			deadline.check()
+		try:
+			return fn()
+		except Route4MeError as exc:
+			delay = _delay_or_raise(policy, stats, attempt, exc, idempotent, deadline)
+
+		if deadline is not None:
+			# interrupted by cancellation
+			deadline.sleep(delay)
+		else:
+			time.sleep(delay)
+		attempt += 1
+
+
+def _delay_or_raise(policy, stats, attempt, exc, idempotent, deadline=None):
+	"""
+	Shared by sync and async clients: returns delay or re-raises the error
+	"""
+	reason = policy.reason(exc)
+	delay = policy.delay(attempt, exc, idempotent) if reason else None
+
+	if delay is not None and deadline is not None and delay >= deadline.remaining():
+		log.warning('attempt %s failed [%s], no time left to retry: %s', attempt, reason, exc)
+		delay = None
+
+	if delay is None:
+		if attempt > 1:
+			stats.record_given_up()
+		raise exc
+
+	stats.record_retry(reason)
+	log.warning(
+		'attempt %s of %s failed [%s], retry in %.2f sec: %s',
+		attempt,
+		policy.max_attempts,
+		reason,
+		delay,
+		exc,
+	)
+	return delay
+
+
+def _not_processed(error):
+	if isinstance(error, Route4MeApiError):
+		return error.status_code in NOT_PROCESSED_STATUSES
+	return bool(error.details) and error.details.get('request_sent') is False
+
+
+def _retry_after(error):
+	headers = getattr(error, 'headers', None)
+	if not headers:
+		return None
+
+	value = None
+	for k, v in headers.items():
+		if k.lower() == 'retry-after':
+			value = v.strip()
+			break
+	if not value:
+		return None
+
+	if value.isdigit():
+		return float(value)
+
+	# HTTP-date: rare, email is not imported with the SDK
+	from email.utils import parsedate_tz
+	from email.utils import mktime_tz
+
+	parsed = parsedate_tz(value)
+	if parsed is None:
+		return None
+
+	return max(0.0, mktime_tz(parsed) - time.time())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import time
+from email.utils import formatdate
+
+import pytest
+import mock
+
+from ..errors import Route4MeNetworkError
+from ..errors import Route4MeApiError
+from ..errors import Route4MeValidationError
+from ..self_test import api_error
+
+from .retry import RetryPolicy
+from .retry import RetryStats
+from .retry import NO_RETRY
+from .retry import call_with_retries
+from .timeouts import Deadline
+
+
+def network_error(code='route4me.sdk.network.timeout', request_sent=True):
+	return Route4MeNetworkError(
+		'error',
+		code=code,
+		details={'request_sent': request_sent},
+	)
+
+
+class TestRetryPolicy(object):
+	def test_max_attempts_should_be_positive(self):
+		with pytest.raises(ValueError):
+			RetryPolicy(max_attempts=0)
+
+	@pytest.mark.parametrize('attempt, exp', [
+		(1, 0.5),
+		(2, 1.0),
+		(3, 2.0),
+		(10, 30.0),
+	])
+	def test_backoff(self, attempt, exp):
+		policy = RetryPolicy(backoff_factor=0.5, backoff_max=30, jitter=False)
+
+		assert policy.backoff(attempt) == exp
+
+	def test_backoff_with_jitter(self):
+		policy = RetryPolicy(backoff_factor=1, jitter=True)
+
+		delays = [policy.backoff(3) for _ in range(100)]
+
+		assert all(0 <= d <= 4 for d in delays)
+		assert len(set(delays)) > 1
+
+	@pytest.mark.parametrize('error, exp', [
+		(api_error(429), 'status:429'),
+		(api_error(503), 'status:503'),
+		(api_error(400), None),
+		(api_error(500), None),
+		(network_error(), 'route4me.sdk.network.timeout'),
+		(network_error('route4me.sdk.network.no_connection'), 'route4me.sdk.network.no_connection'),
+		(network_error('route4me.sdk.security.invalid_certificate'), None),
+		(Route4MeValidationError('invalid'), None),
+	])
+	def test_reason(self, error, exp):
+		assert RetryPolicy().reason(error) == exp
+
+	@pytest.mark.parametrize('error, idempotent, exp_retry', [
+		(api_error(503), True, True),
+		(api_error(503), False, False),
+		(api_error(429), False, True),
+		(network_error(), False, False),
+		(network_error(request_sent=False), False, True),
+		(api_error(404), True, False),
+	])
+	def test_delay_idempotency(self, error, idempotent, exp_retry):
+		policy = RetryPolicy(jitter=False)
+
+		delay = policy.delay(1, error, idempotent)
+
+		assert (delay is not None) is exp_retry
+
+	def test_delay_stops_after_max_attempts(self):
+		policy = RetryPolicy(max_attempts=3, jitter=False)
+
+		assert policy.delay(2, api_error(503), True) == 1.0
+		assert policy.delay(3, api_error(503), True) is None
+		assert NO_RETRY.delay(1, api_error(503), True) is None
+
+	@pytest.mark.parametrize('headers, exp', [
+		({'Retry-After': '7'}, 7),
+		({'retry-after': ' 0 '}, 0),
+		({'Retry-After': 'not a date'}, 0.5),
+		({}, 0.5),
+	])
+	def test_retry_after(self, headers, exp):
+		policy = RetryPolicy(jitter=False)
+
+		assert policy.delay(1, api_error(429, headers), False) == exp
+
+	def test_retry_after_http_date(self):
+		policy = RetryPolicy(jitter=False)
+		headers = {'Retry-After': formatdate(time.time() + 10, usegmt=True)}
+
+		delay = policy.delay(1, api_error(503, headers), True)
+
+		assert 8 <= delay <= 10
+
+	def test_retry_after_too_long(self):
+		policy = RetryPolicy(retry_after_max=60)
+
+		assert policy.delay(1, api_error(503, {'Retry-After': '3600'}), True) is None
+
+	def test_retry_after_is_ignored(self):
+		policy = RetryPolicy(jitter=False, respect_retry_after=False)
+
+		assert policy.delay(1, api_error(503, {'Retry-After': '3600'}), True) == 0.5
+
+
+class Test_call_with_retries(object):
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_success_after_retries(self, mock_sleep):
+		fn = mock.Mock(side_effect=[api_error(503), network_error(), {'ok': 1}])
+		stats = RetryStats()
+
+		res = call_with_retries(fn, RetryPolicy(jitter=False), stats, 'GET')
+
+		assert res == {'ok': 1}
+		assert fn.call_count == 3
+		assert [c[0][0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+		assert stats.as_dict() == {
+			'requests': 1,
+			'retries': 2,
+			'given_up': 0,
+			'reasons': {
+				'status:503': 1,
+				'route4me.sdk.network.timeout': 1,
+			},
+		}
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_gives_up(self, mock_sleep):
+		err = api_error(503)
+		fn = mock.Mock(side_effect=err)
+		stats = RetryStats()
+
+		with pytest.raises(Route4MeApiError) as exc_info:
+			call_with_retries(fn, RetryPolicy(max_attempts=4), stats, 'DELETE')
+
+		assert exc_info.value is err
+		assert fn.call_count == 4
+		assert stats.as_dict()['retries'] == 3
+		assert stats.as_dict()['given_up'] == 1
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_post_is_not_retried(self, mock_sleep):
+		fn = mock.Mock(side_effect=api_error(503))
+		stats = RetryStats()
+
+		with pytest.raises(Route4MeApiError):
+			call_with_retries(fn, RetryPolicy(), stats, 'POST')
+
+		assert fn.call_count == 1
+		assert not mock_sleep.called
+		assert stats.as_dict()['given_up'] == 0
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_idempotent_post_is_retried(self, mock_sleep):
+		fn = mock.Mock(side_effect=[api_error(503), {'ok': 1}])
+
+		res = call_with_retries(fn, RetryPolicy(), RetryStats(), 'POST', idempotent=True)
+
+		assert res == {'ok': 1}
+		assert fn.call_count == 2
+
+	def test_other_exceptions_are_not_retried(self):
+		fn = mock.Mock(side_effect=ValueError('bad json'))
+
+		with pytest.raises(ValueError):
+			call_with_retries(fn, RetryPolicy(), RetryStats(), 'GET')
+
+		assert fn.call_count == 1
+
+	@mock.patch('route4me.sdk._internals.retry.time.sleep')
+	def test_no_retry_after_deadline(self, mock_sleep):
+		err = api_error(503)
+		fn = mock.Mock(side_effect=err)
+		deadline = mock.Mock(expired=mock.Mock(return_value=False), remaining=mock.Mock(return_value=0.4))
+
+		with pytest.raises(Route4MeApiError) as exc_info:
+			call_with_retries(fn, RetryPolicy(jitter=False), RetryStats(), 'GET', deadline=deadline)
+
+		assert exc_info.value is err
+		assert fn.call_count == 1
+		assert not mock_sleep.called
+
+	def test_expired_deadline(self):
+		fn = mock.Mock()
+		deadline = Deadline(-1)
+
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			call_with_retries(fn, RetryPolicy(), RetryStats(), 'GET', deadline=deadline)
+
+		assert exc_info.value.code == 'route4me.sdk.network.deadline_exceeded'
+		assert not fn.called
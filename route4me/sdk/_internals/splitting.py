@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+"""
+Splitting of oversized optimization problems into geographic clusters, and
+merging of solved parts back into one optimization
+
+Problems with thousands of addresses hit payload limits of the API and are
+solved slowly. :func:`split_optimization` partitions addresses by
+coordinates, so every part has at most ``max_addresses`` of them; depots
+are included into every part:
+
+.. code-block:: python
+
+	parts = split_optimization(opt, max_addresses=500, method=KMEANS)
+	created = r4m.optimizations.create_many(parts)
+	solved = r4m.optimizations.wait_until_done_many([p.ID for p in created.values()])
+	merged = merge_optimizations(solved.values())
+
+Clustering is done in pure Python on an equirectangular projection (good
+enough for areas of a city or a region).
+"""
+
+import re
+import math
+import copy
+import random
+
+from ..models import Address
+from ..models import Optimization
+from ..enums import OptimizationStateEnum
+
+#: Clustering by k-means (compact clusters, slower)
+KMEANS = 'kmeans'
+
+#: Clustering by a grid with equal number of addresses per cell (fast)
+GRID = 'grid'
+
+METHODS = (KMEANS, GRID)
+
+_PART_SUFFIX = re.compile(r' \[\d+/\d+\]$')
+
+
+def _project(addresses):
+	"""
+	:returns: Points (x, y) in degrees of latitude
+	:rtype: list(tuple(float, float))
+	"""
+	lats = []
+	for a in addresses:
+		if a.latitude is None or a.longitude is None:
+			raise ValueError('addresses', 'coordinates of all addresses expected: {!r}'.format(a.name))
+		lats.append(a.latitude)
+
+	scale = math.cos(math.radians(sum(lats) / len(lats))) if lats else 1.0
+	return [(a.longitude * scale, a.latitude) for a in addresses]
+
+
+def _dist2(p, q):
+	dx = p[0] - q[0]
+	dy = p[1] - q[1]
+	return dx * dx + dy * dy
+
+
+def _chunks(indices, size):
+	return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+
+def _nearest(p, centers):
+	x, y = p
+	best = 0
+	best_d = float('inf')
+	for c, (cx, cy) in enumerate(centers):
+		d = (x - cx) * (x - cx) + (y - cy) * (y - cy)
+		if d < best_d:
+			best, best_d = c, d
+	return best
+
+
+def kmeans(points, k, iterations=50, seed=0):
+	"""
+	Lloyd's k-means with k-means++ initialization
+
+	:param points: Points (x, y)
+	:type points: list(tuple(float, float))
+	:param k: Number of clusters
+	:type k: int
+	:param iterations: Max number of iterations
+	:type iterations: int, optional
+	:param seed: Seed of the random generator (results are reproducible)
+	:type seed: int, optional
+	:returns: Indices of points by cluster (empty clusters are dropped)
+	:rtype: list(list(int))
+	"""
+	n = len(points)
+	if k >= n:
+		return [[i] for i in range(n)]
+	if k <= 1:
+		return [list(range(n))]
+
+	rnd = random.Random(seed)
+	centers = [points[rnd.randrange(n)]]
+	nearest = [_dist2(p, centers[0]) for p in points]
+	while len(centers) < k:
+		total = sum(nearest)
+		if total == 0:
+			break
+		r = rnd.uniform(0, total)
+		for i, d in enumerate(nearest):
+			r -= d
+			if r <= 0:
+				break
+		centers.append(points[i])
+		nearest = [min(d, _dist2(p, points[i])) for p, d in zip(points, nearest)]
+
+	labels = None
+	for _ in range(iterations):
+		new_labels = [_nearest(p, centers) for p in points]
+		if new_labels == labels:
+			break
+		labels = new_labels
+
+		sums = [[0.0, 0.0, 0] for _ in centers]
+		for p, c in zip(points, labels):
+			s = sums[c]
+			s[0] += p[0]
+			s[1] += p[1]
+			s[2] += 1
+		centers = [(s[0] / s[2], s[1] / s[2]) if s[2] else centers[c] for c, s in enumerate(sums)]
+
+	clusters = [[] for _ in centers]
+	for i, c in enumerate(labels):
+		clusters[c].append(i)
+	return [c for c in clusters if c]
+
+
+def grid(points, max_size):
+	"""
+	Splits points into rows by latitude, and rows into cells by longitude,
+	with equal number of points per row and per cell
+
+	:param points: Points (x, y)
+	:type points: list(tuple(float, float))
+	:param max_size: Max number of points per cell
+	:type max_size: int
+	:returns: Indices of points by cell
+	:rtype: list(list(int))
+	"""
+	n = len(points)
+	cells = int(math.ceil(float(n) / max_size))
+	if cells <= 1:
+		return [list(range(n))] if n else []
+
+	rows = int(math.ceil(math.sqrt(cells)))
+	by_lat = sorted(range(n), key=lambda i: (points[i][1], points[i][0]))
+	row_size = int(math.ceil(float(n) / rows))
+
+	res = []
+	for row in _chunks(by_lat, row_size):
+		row.sort(key=lambda i: (points[i][0], points[i][1]))
+		cols = int(math.ceil(float(len(row)) / max_size))
+		res.extend(_chunks(row, int(math.ceil(float(len(row)) / cols))))
+	return res
+
+
+def cluster(points, max_size, method=KMEANS, seed=0):
+	"""
+	Partitions points into clusters of at most
+	:paramref:`~cluster.max_size` points
+
+	Clusters of k-means, that are still too big, are split again.
+
+	:param points: Points (x, y)
+	:type points: list(tuple(float, float))
+	:param max_size: Max number of points per cluster
+	:type max_size: int
+	:param method: :data:`KMEANS` or :data:`GRID`
+	:type method: str, optional
+	:param seed: Seed of k-means
+	:type seed: int, optional
+	:returns: Indices of points by cluster
+	:rtype: list(list(int))
+	:raises ValueError: on unknown method or not positive size
+	"""
+	max_size = int(max_size)
+	if max_size <= 0:
+		raise ValueError('max_size', 'positive int expected')
+	if method not in METHODS:
+		raise ValueError('method', 'one of {} expected'.format(', '.join(METHODS)))
+
+	if method == GRID:
+		return grid(points, max_size)
+
+	res = []
+	pending = [list(range(len(points)))]
+	while pending:
+		indices = pending.pop()
+		if len(indices) <= max_size:
+			if indices:
+				res.append(indices)
+			continue
+
+		k = int(math.ceil(float(len(indices)) / max_size))
+		parts = kmeans([points[i] for i in indices], k, seed=seed)
+		if len(parts) == 1:
+			# all points coincide: any split is as good
+			res.extend(_chunks(indices, max_size))
+			continue
+		pending.extend([indices[j] for j in p] for p in parts)
+
+	res.sort(key=lambda c: c[0])
+	return res
+
+
+def split_optimization(optimization, max_addresses, method=KMEANS, seed=0):
+	"""
+	Splits the optimization into parts with at most
+	:paramref:`~split_optimization.max_addresses` addresses (not counting
+	depots), grouped by location
+
+	Depots (addresses with ``is_depot``; the first address, when there are
+	no such addresses) are included into every part. Other data (parameters
+	etc.) is copied.
+
+	:param optimization: Optimization data
+	:type optimization: ~route4me.sdk.models.Optimization or dict
+	:param max_addresses: Max number of addresses per part
+	:type max_addresses: int
+	:param method: :data:`KMEANS` or :data:`GRID`
+	:type method: str, optional
+	:param seed: Seed of k-means (results are reproducible)
+	:type seed: int, optional
+	:returns: Parts, a single one when the optimization is small enough
+	:rtype: list(~route4me.sdk.models.Optimization)
+	:raises ValueError: when an address has no coordinates
+	"""
+	raw = optimization.raw if isinstance(optimization, Optimization) else optimization
+	addresses = raw.get('addresses') or []
+
+	depots = [a for a in addresses if a.get('is_depot')]
+	if not depots and addresses:
+		depots = addresses[:1]
+	depot_ids = set(id(d) for d in depots)
+	stops = [a for a in addresses if id(a) not in depot_ids]
+
+	clusters = cluster(_project([Address(a) for a in stops]), max_addresses, method=method, seed=seed)
+	if len(clusters) <= 1:
+		return [Optimization(raw)]
+
+	base = dict((k, v) for k, v in raw.items() if k != 'addresses')
+	name = (raw.get('parameters') or {}).get('route_name')
+
+	parts = []
+	for i, indices in enumerate(clusters):
+		part = copy.deepcopy(base)
+		part['addresses'] = depots + [stops[j] for j in indices]
+		if name:
+			part['parameters']['route_name'] = u'{} [{}/{}]'.format(name, i + 1, len(clusters))
+		parts.append(Optimization(part))
+	return parts
+
+
+#: States of optimizations, by progress (values of states do not follow it:
+#: ``COMPUTING_DIRECTIONS`` goes before ``OPTIMIZED``)
+_PROGRESS = [
+	OptimizationStateEnum.INITIAL.value,
+	OptimizationStateEnum.MATRIX_PROCESSING.value,
+	OptimizationStateEnum.OPTIMIZING.value,
+	OptimizationStateEnum.COMPUTING_DIRECTIONS.value,
+	OptimizationStateEnum.OPTIMIZED.value,
+]
+
+
+def _progress(state):
+	# unknown states are reported as the least progressed ones
+	return _PROGRESS.index(state) if state in _PROGRESS else -1
+
+
+def _merged_state(states):
+	if OptimizationStateEnum.ERROR.value in states:
+		return OptimizationStateEnum.ERROR.value
+	known = [s for s in states if s is not None]
+	# the least progressed part: any part in progress keeps the merged
+	# optimization in progress
+	return min(known, key=_progress) if known else None
+
+
+def merge_optimizations(parts):
+	"""
+	Merges solved parts (see :func:`split_optimization`) into one
+	optimization: routes and addresses of all parts, depots are listed once
+
+	The merged optimization has no ID of its own, IDs of the parts are in
+	``optimization_problem_ids`` of its raw data. Its state is ``ERROR``,
+	if any part failed, ``OPTIMIZED`` if all parts are solved, otherwise
+	the state of the least progressed part.
+
+	:param parts: Solved parts
+	:type parts: list(~route4me.sdk.models.Optimization)
+	:rtype: ~route4me.sdk.models.Optimization
+	"""
+	parts = [p.raw if isinstance(p, Optimization) else p for p in parts]
+	if not parts:
+		return Optimization({})
+
+	raw = dict((k, v) for k, v in parts[0].items() if k not in ('addresses', 'routes', 'links'))
+	raw['optimization_problem_id'] = None
+	raw['optimization_problem_ids'] = [p.get('optimization_problem_id') for p in parts]
+	raw['state'] = _merged_state([p.get('state') for p in parts])
+	raw['routes'] = [r for p in parts for r in (p.get('routes') or [])]
+
+	addresses = []
+	depots = set()
+	for p in parts:
+		for a in p.get('addresses') or []:
+			if a.get('is_depot'):
+				key = (a.get('lat'), a.get('lng'), a.get('address'))
+				if key in depots:
+					continue
+				depots.add(key)
+			addresses.append(a)
+	raw['addresses'] = addresses
+
+	name = (raw.get('parameters') or {}).get('route_name')
+	if name:
+		raw['parameters'] = dict(raw['parameters'], route_name=_PART_SUFFIX.sub(u'', name))
+
+	return Optimization(raw)
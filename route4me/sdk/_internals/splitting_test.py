@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from ..models import Optimization
+from ..enums import OptimizationStateEnum
+
+from .splitting import GRID
+from .splitting import KMEANS
+from .splitting import cluster
+from .splitting import kmeans
+from .splitting import split_optimization
+from .splitting import merge_optimizations
+
+
+def blobs(centers, size, seed=1):
+	rnd = random.Random(seed)
+	return [
+		(x + rnd.uniform(-0.01, 0.01), y + rnd.uniform(-0.01, 0.01))
+		for x, y in centers
+		for _ in range(size)
+	]
+
+
+def problem(n, depot=True, seed=1):
+	rnd = random.Random(seed)
+	addresses = [
+		{'address': str(i), 'lat': 40 + rnd.random(), 'lng': -74 + rnd.random()}
+		for i in range(n)
+	]
+	if depot:
+		addresses.insert(1, {'address': 'depot', 'lat': 40.5, 'lng': -73.5, 'is_depot': True})
+	return {'parameters': {'route_name': 'Shift'}, 'addresses': addresses}
+
+
+class Test_kmeans(object):
+	def test_separates_blobs(self):
+		points = blobs([(0, 0), (1, 1), (0, 1)], 20)
+
+		clusters = kmeans(points, 3)
+
+		assert sorted(sorted(c) for c in clusters) == [
+			list(range(0, 20)),
+			list(range(20, 40)),
+			list(range(40, 60)),
+		]
+
+	def test_reproducible(self):
+		points = blobs([(0, 0), (0.05, 0.05)], 50)
+
+		assert kmeans(points, 4, seed=7) == kmeans(points, 4, seed=7)
+
+	def test_small(self):
+		assert kmeans([(0, 0), (1, 1)], 5) == [[0], [1]]
+		assert kmeans([(0, 0), (1, 1)], 1) == [[0, 1]]
+
+
+class Test_cluster(object):
+	@pytest.mark.parametrize('method', [KMEANS, GRID])
+	def test_max_size(self, method):
+		points = blobs([(0, 0), (1, 1)], 100)
+
+		clusters = cluster(points, 30, method=method)
+
+		assert all(0 < len(c) <= 30 for c in clusters)
+		assert sorted(i for c in clusters for i in c) == list(range(200))
+
+	def test_coinciding_points(self):
+		clusters = cluster([(1, 1)] * 10, 4)
+
+		assert sorted(len(c) for c in clusters) == [2, 4, 4]
+
+	@pytest.mark.parametrize('kwargs', [
+		{'max_size': 0},
+		{'max_size': 1, 'method': 'other'},
+	])
+	def test_invalid(self, kwargs):
+		with pytest.raises(ValueError):
+			cluster([(0, 0)], **kwargs)
+
+
+class Test_split_optimization(object):
+	@pytest.mark.parametrize('method', [KMEANS, GRID])
+	def test_parts(self, method):
+		data = problem(250)
+
+		parts = split_optimization(Optimization(data), 100, method=method)
+
+		assert len(parts) >= 3
+		for i, p in enumerate(parts):
+			addresses = p.raw['addresses']
+			assert addresses[0]['address'] == 'depot'
+			assert len(addresses) <= 101
+			assert p.raw['parameters']['route_name'] == 'Shift [{}/{}]'.format(i + 1, len(parts))
+
+		stops = sorted(a['address'] for p in parts for a in p.raw['addresses'][1:])
+		assert stops == sorted(str(i) for i in range(250))
+		# the source is not changed
+		assert data['parameters']['route_name'] == 'Shift'
+
+	def test_first_address_is_depot_by_default(self):
+		parts = split_optimization(problem(30, depot=False), 10)
+
+		assert all(p.raw['addresses'][0]['address'] == '0' for p in parts)
+
+	def test_small(self):
+		data = problem(10)
+
+		parts = split_optimization(data, 100)
+
+		assert len(parts) == 1
+		assert parts[0].raw is data
+
+	def test_no_coordinates(self):
+		data = problem(10)
+		del data['addresses'][5]['lat']
+
+		with pytest.raises(ValueError):
+			split_optimization(data, 5)
+
+
+class Test_merge_optimizations(object):
+	def test_merge(self):
+		depot = {'address': 'depot', 'lat': 1, 'lng': 2, 'is_depot': True}
+		parts = [
+			Optimization({
+				'optimization_problem_id': ID,
+				'state': state,
+				'parameters': {'route_name': 'Shift [{}/2]'.format(i + 1)},
+				'addresses': [dict(depot), {'address': ID}],
+				'routes': [{'route_id': ID}],
+				'links': {},
+			})
+			for i, (ID, state) in enumerate([('A', 4), ('B', 3)])
+		]
+
+		merged = merge_optimizations(parts)
+
+		assert merged.ID is None
+		assert merged.raw['optimization_problem_ids'] == ['A', 'B']
+		assert merged.state == OptimizationStateEnum.OPTIMIZING
+		assert merged.raw['parameters']['route_name'] == 'Shift'
+		assert [a['address'] for a in merged.raw['addresses']] == ['depot', 'A', 'B']
+		assert merged.raw['routes'] == [{'route_id': 'A'}, {'route_id': 'B'}]
+		assert 'links' not in merged.raw
+
+	@pytest.mark.parametrize('states, exp', [
+		([4, 4], OptimizationStateEnum.OPTIMIZED),
+		([4, 5], OptimizationStateEnum.ERROR),
+		([2, 3], OptimizationStateEnum.MATRIX_PROCESSING),
+		([4, 6], OptimizationStateEnum.COMPUTING_DIRECTIONS),
+		([6, 3, 4], OptimizationStateEnum.OPTIMIZING),
+		([6, 1], OptimizationStateEnum.INITIAL),
+	])
+	def test_state(self, states, exp):
+		merged = merge_optimizations([Optimization({'state': s}) for s in states])
+
+		assert merged.state == exp
+
+	def test_empty(self):
+		assert merge_optimizations([]).raw == {}
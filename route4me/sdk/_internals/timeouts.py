@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+"""
+Timeouts of API calls
+
+Every call has two timeouts per attempt: ``connect`` (establishing the
+connection) and ``read`` (waiting for the next bytes of the response), and
+an optional ``total`` --- the deadline of the whole call, retries and
+delays between them included.
+
+Defaults depend on the API method: creating a big optimization takes
+minutes, while reading one should fail fast. They are configured with
+:class:`TimeoutPolicy`:
+
+.. code-block:: python
+
+	timeouts = TimeoutPolicy(
+		default=Timeout(connect=3, read=10, total=30),
+		paths={
+			'api.v4/optimization_problem.php': {
+				'POST': Timeout(read=300),
+			},
+		},
+	)
+	r4m = ApiClient(api_key, timeouts=timeouts)
+
+Deadlines propagate through batch helpers: requests sent inside
+:func:`deadline_scope` (in the same thread, or in worker threads of batch
+helpers) do not outlive the deadline of the scope. A :class:`Deadline`
+doubles as a cancellation token: after :meth:`Deadline.cancel` no more
+requests are sent on its behalf.
+"""
+
+import weakref
+import threading
+import contextlib
+
+from ..errors import Route4MeError
+from ..errors import Route4MeNetworkError
+
+from . import monotonic as _clock
+
+_INFINITY = float('inf')
+
+# guards children of deadlines
+_lock = threading.Lock()
+
+
+class Timeout(object):
+	"""
+	Timeouts of a call, seconds (:data:`None` --- inherited from the policy)
+
+	.. versionadded:: 0.1.0
+	"""
+
+	__slots__ = ('connect', 'read', 'total')
+
+	def __init__(self, connect=None, read=None, total=None):
+		"""
+		:param connect: Timeout of establishing a connection (per attempt)
+		:type connect: float, optional
+		:param read: Max time between bytes of the response (per attempt)
+		:type read: float, optional
+		:param total: Deadline of the whole call, retries included
+		:type total: float, optional
+		"""
+		self.connect = None if connect is None else float(connect)
+		self.read = None if read is None else float(read)
+		self.total = None if total is None else float(total)
+
+	@classmethod
+	def of(cls, value):
+		"""
+		:param value: Number of seconds (both ``connect`` and ``read``, as \
+			:mod:`requests` treats it) or :class:`Timeout`
+		:type value: float or Timeout
+		:rtype: Timeout
+		"""
+		if value is None or isinstance(value, Timeout):
+			return value
+		return cls(connect=value, read=value)
+
+	def merge(self, base):
+		"""
+		:param base: Timeouts for the fields, that are not set
+		:type base: Timeout
+		:rtype: Timeout
+		"""
+		if base is None:
+			return self
+		return Timeout(
+			connect=base.connect if self.connect is None else self.connect,
+			read=base.read if self.read is None else self.read,
+			total=base.total if self.total is None else self.total,
+		)
+
+	def __eq__(self, other):
+		if not isinstance(other, Timeout):
+			return NotImplemented
+		return (self.connect, self.read, self.total) == (other.connect, other.read, other.total)
+
+	def __ne__(self, other):
+		eq = self.__eq__(other)
+		return eq if eq is NotImplemented else not eq
+
+	def __repr__(self):
+		return '<Timeout, connect={}, read={}, total={}>'.format(self.connect, self.read, self.total)
+
+
+#: Timeouts of requests without a more specific setting
+DEFAULT_TIMEOUT = Timeout(connect=5, read=10)
+
+#: Calls, that legitimately take long: optimization of many addresses
+DEFAULT_PATH_TIMEOUTS = {
+	'api.v4/optimization_problem.php': {
+		'POST': Timeout(read=120),
+		'PUT': Timeout(read=120),
+	},
+}
+
+
+class TimeoutPolicy(object):
+	"""
+	Default timeouts per API method
+
+	The most specific setting wins: timeout of the call, then of the path and
+	HTTP method, of the path, of the HTTP method, and the default one. Not
+	set fields are inherited from less specific settings.
+
+	.. versionadded:: 0.1.0
+	"""
+
+	def __init__(self, default=DEFAULT_TIMEOUT, methods=None, paths=None):
+		"""
+		:param default: Timeouts of all requests
+		:type default: Timeout or float, optional
+		:param methods: Timeouts per HTTP method (like ``GET``)
+		:type methods: dict, optional
+		:param paths: Timeouts per path (like \
+			``api.v4/optimization_problem.php``): :class:`Timeout` or a \
+			dict of timeouts per HTTP method, defaults to \
+			:data:`DEFAULT_PATH_TIMEOUTS`
+		:type paths: dict, optional
+		"""
+		if paths is None:
+			paths = DEFAULT_PATH_TIMEOUTS
+
+		self.default = Timeout.of(default) or Timeout()
+		self.methods = dict((k.upper(), Timeout.of(v)) for k, v in (methods or {}).items())
+		self.paths = {}
+		for path, v in paths.items():
+			if isinstance(v, dict):
+				v = dict((k.upper(), Timeout.of(t)) for k, t in v.items())
+			else:
+				v = Timeout.of(v)
+			self.paths[path.lstrip('/')] = v
+
+	def resolve(self, method, path, timeout=None):
+		"""
+		:param method: HTTP method
+		:type method: str
+		:param path: Path to API method
+		:type path: str
+		:param timeout: Timeout of the call
+		:type timeout: Timeout or float, optional
+		:returns: Timeouts of the call
+		:rtype: Timeout
+		"""
+		method = method.upper()
+		chain = [Timeout.of(timeout)]
+
+		by_path = self.paths.get(path.lstrip('/'))
+		if isinstance(by_path, dict):
+			chain.append(by_path.get(method))
+		else:
+			chain.append(by_path)
+
+		chain.append(self.methods.get(method))
+
+		res = self.default
+		for t in reversed(chain):
+			if t is not None:
+				res = t.merge(res)
+		return res
+
+
+class Deadline(object):
+	"""
+	Point in time, after which a call should not continue, and cancellation
+	token of the call
+
+	A deadline could be derived from other (parent) ones: it expires not
+	later than its parents and is cancelled with any of them. Cancellation
+	interrupts delays between retries, but not the request in progress.
+
+	.. code-block:: python
+
+		token = Deadline()               # no time limit, only cancellation
+		r4m.optimizations.get(ID, deadline=token)
+
+		# in other thread (e.g. when the client has disconnected)
+		token.cancel()
+
+	.. versionadded:: 0.1.0
+	"""
+
+	__slots__ = ('timeout', 'expires_at', 'parents', '_event', '_children', '__weakref__')
+
+	def __init__(self, timeout=None, parents=()):
+		"""
+		:param timeout: Seconds from now, :data:`None` --- no time limit
+		:type timeout: float, optional
+		:param parents: Deadlines to inherit the expiration and cancellation \
+			from
+		:type parents: list(Deadline), optional
+		"""
+		self.timeout = None if timeout is None else float(timeout)
+		self.expires_at = _INFINITY if timeout is None else _clock() + self.timeout
+		self.parents = tuple(p for p in parents if p is not None)
+		self._event = threading.Event()
+		self._children = weakref.WeakSet()
+
+		for p in self.parents:
+			p._adopt(self)
+
+	@classmethod
+	def of(cls, value):
+		"""
+		:param value: Number of seconds or :class:`Deadline`
+		:type value: float or Deadline
+		:rtype: Deadline
+		"""
+		if value is None or isinstance(value, Deadline):
+			return value
+		return cls(value)
+
+	def __repr__(self):
+		if self.cancelled:
+			return '<Deadline, cancelled>'
+		return '<Deadline, remaining={:.3f}>'.format(self.remaining())
+
+	def _adopt(self, child):
+		with _lock:
+			self._children.add(child)
+		if self.cancelled:
+			child.cancel()
+
+	def cancel(self):
+		"""
+		Cancels the call: no more attempts or pages are requested, delays
+		between them are interrupted. Derived deadlines are cancelled too.
+		"""
+		self._event.set()
+		with _lock:
+			children = list(self._children)
+		for c in children:
+			c.cancel()
+
+	@property
+	def cancelled(self):
+		"""
+		:rtype: bool
+		"""
+		return self._event.is_set()
+
+	def descends_from(self, other):
+		"""
+		:returns: Is :paramref:`~Deadline.descends_from.other` this deadline \
+			or one of its ancestors
+		:rtype: bool
+		"""
+		if other is self:
+			return True
+		return any(p.descends_from(other) for p in self.parents)
+
+	def remaining(self):
+		"""
+		:returns: Seconds left (negative after expiration, zero after \
+			cancellation, infinity without a time limit)
+		:rtype: float
+		"""
+		if self.cancelled:
+			return 0.0
+		remaining = self.expires_at - _clock()
+		for p in self.parents:
+			remaining = min(remaining, p.remaining())
+		return remaining
+
+	def expired(self):
+		return self.remaining() <= 0
+
+	def clamp(self, timeout):
+		"""
+		:param timeout: Timeout of an operation, :data:`None` --- unlimited
+		:type timeout: float
+		:returns: The timeout, reduced to the remaining time (:data:`None`, \
+			if both are unlimited)
+		:rtype: float
+		"""
+		remaining = max(0.0, self.remaining())
+		if timeout is None:
+			return None if remaining == _INFINITY else remaining
+		return min(timeout, remaining)
+
+	def sleep(self, seconds):
+		"""
+		Waits for :paramref:`~Deadline.sleep.seconds`, but not after the
+		expiration or cancellation
+		"""
+		self._event.wait(self.clamp(seconds))
+
+	def check(self):
+		"""
+		:raises ~route4me.sdk.errors.Route4MeNetworkError: if the deadline \
+			has expired (code ``route4me.sdk.network.deadline_exceeded``)
+		:raises ~route4me.sdk.errors.Route4MeError: if the call is \
+			cancelled (code ``route4me.sdk.cancelled``)
+		"""
+		if self.expired():
+			raise self.error()
+
+	def error(self, request_sent=False):
+		"""
+		:param request_sent: Was the request sent (its response is not read \
+			completely)
+		:type request_sent: bool, optional
+		:rtype: ~route4me.sdk.errors.Route4MeError
+		"""
+		stage = 'the response is not read' if request_sent else 'the request is not sent'
+		if self.cancelled:
+			return Route4MeError(
+				message='Cancelled, {}'.format(stage),
+				code='route4me.sdk.cancelled',
+				details={
+					'request_sent': request_sent,
+				},
+			)
+		return Route4MeNetworkError(
+			message='Deadline exceeded, {}'.format(stage),
+			code='route4me.sdk.network.deadline_exceeded',
+			details={
+				'timeout': self.timeout,
+				'timeout_unit': 'sec',
+				'request_sent': request_sent,
+			},
+		)
+
+
+def derive_deadline(timeout=None, *parents):
+	"""
+	:param timeout: Own time limit (seconds) or a deadline
+	:type timeout: float or Deadline, optional
+	:param parents: Deadlines to inherit from (:data:`None` are ignored)
+	:type parents: Deadline
+	:returns: Deadline, that expires (or is cancelled) with any of \
+		:paramref:`~derive_deadline.parents`, and not later than \
+		:paramref:`~derive_deadline.timeout`; :data:`None`, if there are no \
+		limits at all
+	:rtype: Deadline
+	"""
+	parents = [p for p in parents if p is not None]
+	if isinstance(timeout, Deadline):
+		parents.append(timeout)
+		timeout = None
+
+	if timeout is None:
+		# reuse the deadline, that already includes the others
+		for p in parents:
+			if all(p.descends_from(o) for o in parents):
+				return p
+		if not parents:
+			return None
+	return Deadline(timeout, parents)
+
+
+_local = threading.local()
+
+
+def current_deadline():
+	"""
+	:returns: Deadline of the innermost :func:`deadline_scope` of the \
+		current thread
+	:rtype: Deadline
+	"""
+	return getattr(_local, 'deadline', None)
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
+	"""
+	Requests, sent in the scope (in the current thread), do not outlive the
+	deadline and stop, when it is cancelled. Nested scopes can not extend
+	the deadline of outer ones.
+
+	:param deadline: Deadline (or cancellation token), or timeout in \
+		seconds, :data:`None` --- no limit
+	:type deadline: Deadline or float
+	"""
+	outer = current_deadline()
+	_local.deadline = derive_deadline(deadline, outer)
+	try:
+		yield _local.deadline
+	finally:
+		_local.deadline = outer
+
+
+def bind_deadline(fn):
+	"""
+	Wraps :paramref:`~bind_deadline.fn` to run in the deadline scope of the
+	current thread: for calls in worker threads
+
+	:param fn: Function
+	:type fn: callable
+	:rtype: callable
+	"""
+	deadline = current_deadline()
+	if deadline is None:
+		return fn
+
+	def bound(*args, **kwargs):
+		with deadline_scope(deadline):
+			return fn(*args, **kwargs)
+	return bound
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from ..errors import Route4MeError
+from ..errors import Route4MeNetworkError
+
+from .timeouts import Timeout
+from .timeouts import TimeoutPolicy
+from .timeouts import Deadline
+from .timeouts import deadline_scope
+from .timeouts import current_deadline
+from .timeouts import bind_deadline
+from .timeouts import derive_deadline
+
+
+PATH = 'api.v4/optimization_problem.php'
+
+
+class TestTimeout(object):
+	def test_of(self):
+		assert Timeout.of(None) is None
+		assert Timeout.of(3) == Timeout(connect=3, read=3)
+
+		t = Timeout(read=1)
+		assert Timeout.of(t) is t
+
+	def test_merge(self):
+		t = Timeout(read=60).merge(Timeout(connect=5, read=10, total=30))
+
+		assert t == Timeout(connect=5, read=60, total=30)
+		assert t != Timeout(connect=5, read=60)
+
+
+class TestTimeoutPolicy(object):
+	def test_defaults(self):
+		policy = TimeoutPolicy()
+
+		assert policy.resolve('GET', PATH) == Timeout(connect=5, read=10)
+		assert policy.resolve('post', '/' + PATH) == Timeout(connect=5, read=120)
+		assert policy.resolve('POST', 'api.v4/address.php') == Timeout(connect=5, read=10)
+
+	def test_precedence(self):
+		policy = TimeoutPolicy(
+			default=Timeout(connect=1, read=2, total=3),
+			methods={'get': Timeout(read=4)},
+			paths={
+				'a': Timeout(connect=5),
+				'b': {'GET': Timeout(total=6)},
+			},
+		)
+
+		assert policy.resolve('GET', 'x') == Timeout(connect=1, read=4, total=3)
+		assert policy.resolve('GET', 'a') == Timeout(connect=5, read=4, total=3)
+		assert policy.resolve('GET', 'b') == Timeout(connect=1, read=4, total=6)
+		assert policy.resolve('PUT', 'b') == Timeout(connect=1, read=2, total=3)
+		assert policy.resolve('GET', 'b', 7) == Timeout(connect=7, read=7, total=6)
+		assert policy.resolve('GET', 'b', Timeout(total=8)) == Timeout(connect=1, read=4, total=8)
+
+
+class TestDeadline(object):
+	def test_remaining(self, clock):
+		d = Deadline(10)
+
+		clock.now += 4
+		assert d.remaining() == 6
+		assert d.clamp(None) == 6
+		assert d.clamp(2) == 2
+		assert d.clamp(60) == 6
+		d.check()
+
+		clock.now += 6
+		assert d.expired()
+		assert d.clamp(2) == 0
+		with pytest.raises(Route4MeNetworkError) as exc_info:
+			d.check()
+
+		exc = exc_info.value
+		assert exc.code == 'route4me.sdk.network.deadline_exceeded'
+		assert exc.details['request_sent'] is False
+
+	def test_of(self, clock):
+		d = Deadline(1)
+
+		assert Deadline.of(None) is None
+		assert Deadline.of(d) is d
+		assert Deadline.of(3).remaining() == 3
+
+	def test_no_time_limit(self):
+		d = Deadline()
+
+		assert not d.expired()
+		assert d.clamp(None) is None
+		assert d.clamp(3) == 3
+
+	def test_cancel(self):
+		d = Deadline(60)
+		d.cancel()
+
+		assert d.cancelled
+		assert d.expired()
+		assert d.clamp(3) == 0
+		with pytest.raises(Route4MeError) as exc_info:
+			d.check()
+
+		exc = exc_info.value
+		assert not isinstance(exc, Route4MeNetworkError)
+		assert exc.code == 'route4me.sdk.cancelled'
+		assert exc.details['request_sent'] is False
+
+	def test_cancel_interrupts_sleep(self):
+		d = Deadline()
+		threading.Timer(0.05, d.cancel).start()
+
+		d.sleep(30)
+
+		assert d.cancelled
+
+	def test_derived(self, clock):
+		token = Deadline()
+		d = Deadline(10, parents=[token, Deadline(5)])
+
+		assert d.remaining() == 5
+		assert d.descends_from(token)
+
+		token.cancel()
+		assert d.cancelled
+		assert d.error().code == 'route4me.sdk.cancelled'
+
+		# derived from already cancelled
+		assert Deadline(parents=[token]).cancelled
+
+	def test_cancel_does_not_propagate_to_parents(self):
+		parent = Deadline()
+		Deadline(parents=[parent]).cancel()
+
+		assert not parent.cancelled
+
+
+class Test_derive_deadline(object):
+	def test_no_limits(self):
+		assert derive_deadline() is None
+		assert derive_deadline(None, None, None) is None
+
+	def test_reuses_deadline(self, clock):
+		d = Deadline(10)
+		child = Deadline(5, parents=[d])
+
+		assert derive_deadline(d) is d
+		assert derive_deadline(None, None, d) is d
+		assert derive_deadline(child, d) is child
+
+	def test_links_parents(self, clock):
+		d1 = Deadline(10)
+		d2 = Deadline(5)
+		d = derive_deadline(30, d1, d2)
+
+		assert d.remaining() == 5
+		assert d.descends_from(d1) and d.descends_from(d2)
+
+		d = derive_deadline(2, d1)
+		assert d.remaining() == 2
+
+
+class TestDeadlineScope(object):
+	def test_nested_scope_can_not_extend(self, clock):
+		with deadline_scope(10) as outer:
+			with deadline_scope(60) as inner:
+				assert inner.remaining() == 10
+			with deadline_scope(outer) as inner:
+				assert inner is outer
+			with deadline_scope(5) as inner:
+				assert current_deadline() is inner
+				assert inner.remaining() == 5
+			assert current_deadline() is outer
+
+		assert current_deadline() is None
+
+	def test_no_deadline(self):
+		with deadline_scope(None):
+			assert current_deadline() is None
+
+	def test_cancellation_token(self, clock):
+		token = Deadline()
+
+		with deadline_scope(10):
+			with deadline_scope(token) as d:
+				assert d.remaining() == 10
+
+				token.cancel()
+				assert d.cancelled
+
+	def test_bind_to_other_thread(self):
+		seen = []
+
+		with deadline_scope(10) as d:
+			fn = bind_deadline(lambda: seen.append(current_deadline()))
+
+		t = threading.Thread(target=fn)
+		t.start()
+		t.join()
+
+		assert seen == [d]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous (:mod:`asyncio`) Route4Me API client
+
+Requires Python 3.5+ and `aiohttp <https://pypi.org/project/aiohttp/>`_:
+
+.. code-block:: bash
+
+	$ pip install route4me-sdk[async]
+
+.. code-block:: python
+
+	from route4me.sdk.aio import AsyncApiClient
+
+	async def main():
+		async with AsyncApiClient(api_key=YOUR_API_KEY) as r4m:
+			opt = await r4m.optimizations.get(OPTIMIZATION_ID)
+
+"""
+
+from .version import VERSION_STRING
+
+from .endpoints.optimizations_aio import AsyncOptimizations
+
+from route4me.sdk._internals.aionet import AsyncNetworkClient
+
+
+__all__ = [
+	'AsyncApiClient',
+]
+
+
+class AsyncApiClient(object):
+	"""
+	Route4Me API client (async)
+
+	Async twin of :class:`~route4me.sdk.ApiClient`. All endpoints share one
+	connection pool and one concurrency limit.
+	"""
+
+	version = VERSION_STRING
+
+	def __init__(self, api_key=None, **network_options):
+		"""
+		:param api_key: Route4Me API key
+		:type api_key: str
+		:param network_options: Options of the network client (connection \
+			pool, concurrency limit, timeout etc.), see \
+			:class:`~route4me.sdk._internals.aionet.AsyncNetworkClient`
+		"""
+		nc = AsyncNetworkClient(api_key=api_key, **network_options)
+		self._network_client = nc
+
+		resource_params = {
+			'api_key': api_key,
+			'_network_client': nc,
+		}
+
+		self._optimizations = AsyncOptimizations(**resource_params)
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def close(self):
+		"""
+		Closes all pooled connections, shared by endpoints
+		"""
+		await self._network_client.close()
+
+	@property
+	def optimizations(self):
+		"""
+		Optimization endpoint functions
+
+		:returns: Optimization namespace
+		:rtype: :class:`~endpoints.optimizations_aio.AsyncOptimizations`
+		"""
+		return self._optimizations
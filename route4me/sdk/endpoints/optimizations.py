@@ -21,17 +21,137 @@
 
 """
 
-import pydash
-
+from ..models import BaseModel
 from ..models import Optimization
+from ..models import Address
 from ..enums import OptimizationStateEnum
 
+from ..errors import Route4MeError
 from ..errors import Route4MeApiError
 from route4me.sdk.utils import PagedList
+from route4me.sdk.utils import BatchResult
 
 from route4me.sdk._internals import add_limit_offset_to_query_string
+from route4me.sdk._internals.paging import iterate_pages
+from route4me.sdk._internals.paging import fetch_all_pages
+from route4me.sdk._internals.batch import map_bounded
+from route4me.sdk._internals.batch import unique
+from route4me.sdk._internals.batch import pipeline
 from route4me.sdk._internals.typeconv import bool201
 from route4me.sdk._internals.net import NetworkClient
+from route4me.sdk._internals.cache import FOREVER
+from route4me.sdk._internals.jsonstream import iter_array_items
+from route4me.sdk._internals.jsonstream import HEAVY_KEYS
+from route4me.sdk._internals.timeouts import Deadline
+from route4me.sdk._internals.timeouts import deadline_scope
+from route4me.sdk._internals.timeouts import derive_deadline
+from route4me.sdk._internals.timeouts import current_deadline
+from route4me.sdk._internals.polling import PollSchedule
+from route4me.sdk._internals.polling import poll_until
+from route4me.sdk._internals.polling import sleep_or_give_up
+from route4me.sdk._internals.polling import wait_timeout_error
+from route4me.sdk._internals.callbacks import OptimizationCallback
+from route4me.sdk._internals.splitting import KMEANS
+from route4me.sdk._internals.splitting import split_optimization
+from route4me.sdk._internals.splitting import merge_optimizations
+
+
+_PATH = '/api.v4/optimization_problem.php'
+_SUBDOMAIN = 'www'
+
+
+def _raw(data):
+	if isinstance(data, BaseModel):
+		return data.raw
+	return data
+
+
+def _create_query(optimized_callback_url):
+	if not optimized_callback_url:
+		return None
+	return {
+		'optimized_callback_url': optimized_callback_url,
+	}
+
+
+def _list_query(states, limit, offset):
+	qs = {}
+	add_limit_offset_to_query_string(limit, offset, qs)
+
+	if states:
+		s = OptimizationStateEnum.parse_many(states)
+		qs['state'] = ','.join([str(i.value) for i in s])
+
+	return qs
+
+
+def _paged_list(res, limit, offset):
+	return PagedList(
+		total=res['totalRecords'],
+		limit=limit,
+		offset=offset,
+		items=[Optimization(item) for item in res['optimizations']],
+	)
+
+
+def _update_query(ID, reoptimize):
+	return {
+		'optimization_problem_id': ID,
+		'reoptimize': bool201(reoptimize),
+	}
+
+
+#: States, in which the API doesn't change an optimization by itself
+_FINAL_STATES = frozenset([
+	OptimizationStateEnum.OPTIMIZED.value,
+	OptimizationStateEnum.ERROR.value,
+])
+
+#: States of optimizations in progress
+_IN_PROGRESS_STATES = [
+	OptimizationStateEnum.INITIAL,
+	OptimizationStateEnum.MATRIX_PROCESSING,
+	OptimizationStateEnum.OPTIMIZING,
+	OptimizationStateEnum.COMPUTING_DIRECTIONS,
+]
+
+#: Cache TTL of optimizations in progress, seconds
+_IN_PROGRESS_CACHE_TTL = 5
+
+
+def _cache_ttl(res):
+	"""
+	Optimizations in final states are cached forever (until changed through
+	the same client), in progress --- for several seconds
+	"""
+	state = res.get('state') if isinstance(res, dict) else None
+	if state in _FINAL_STATES:
+		return FOREVER
+	return _IN_PROGRESS_CACHE_TTL
+
+
+def _is_done(state):
+	return state in _FINAL_STATES
+
+
+def _state_of(optimization):
+	return optimization.raw.get('state')
+
+
+def _check_removed(res):
+	if not (isinstance(res, dict) and res.get('status')):
+		# TODO: this exception should contain METHOD and URL fields
+		raise Route4MeApiError(
+			'Not expected response',
+			code='route4me.sdk.api_error',
+			details={
+				'res': res,
+			},
+			method='DELETE',
+			# url=''
+		)
+
+	return True
 
 
 class Optimizations(object):
@@ -45,7 +165,7 @@ def __init__(self, api_key=None, _network_client=None):
 			nc = NetworkClient(api_key)
 		self.__nc = nc
 
-	def create(self, optimization_data, optimized_callback_url=None):
+	def create(self, optimization_data, optimized_callback_url=None, deadline=None):
 		"""
 		Create a new optimization through the Route4Me API
 
@@ -78,30 +198,235 @@ def create(self, optimization_data, optimized_callback_url=None):
 		:param optimized_callback_url: Optimization done callback URL, defaults \
 			to None
 		:type optimized_callback_url: str or None, optional
+		:param deadline: Deadline of the call, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
 		:returns: New optimization
 		:rtype: ~route4me.sdk.models.Optimization
 		"""
 
-		query = None
-		if optimized_callback_url:
-			query = {
-				'optimized_callback_url': optimized_callback_url,
-			}
-
-		data = optimization_data
+		query = _create_query(optimized_callback_url)
 
-		# if isinstance(optimization_data, BaseModel):
-		# 	data = optimization_data.raw
+		data = _raw(optimization_data)
 
 		res = self.__nc.post(
-			'/api.v4/optimization_problem.php',
-			subdomain='www',
+			_PATH,
+			subdomain=_SUBDOMAIN,
 			query=query,
 			data=data,
+			deadline=deadline,
 		)
 		return Optimization(res)
 
-	def get(self, ID):
+	def create_many(
+		self,
+		optimizations,
+		concurrency=4,
+		optimized_callback_url=None,
+		max_pending=None,
+		deadline=None,
+	):
+		"""
+		Create many optimizations, sending up to
+		:paramref:`~create_many.concurrency` requests at the same time.
+
+		Optimizations are taken from the iterable lazily (a generator is
+		fine), serialized in a separate thread while previous ones are being
+		sent, and no more than :paramref:`~create_many.max_pending` of them
+		are kept in memory, waiting for a free connection. Set
+		``pool_maxsize`` of the client (see
+		:class:`~route4me.sdk._internals.net.NetworkClient`) not less than
+		:paramref:`~create_many.concurrency`.
+
+		A failed request doesn't abort the batch:
+
+		.. code-block:: python
+
+			res = r4m.optimizations.create_many(load_problems(), concurrency=8)
+			for i, opt in res.items():
+				print(i, opt.ID)
+			for i, exc in res.errors.items():
+				print(i, 'failed', exc)
+
+		:param optimizations: Optimization data
+		:type optimizations: iterable of ~route4me.sdk.models.Optimization \
+			or dict
+		:param concurrency: Max number of simultaneous requests, defaults to 4
+		:type concurrency: int, optional
+		:param optimized_callback_url: Optimization done callback URL of \
+			all optimizations, see :meth:`create`
+		:type optimized_callback_url: str, optional
+		:param max_pending: Max number of serialized optimizations, waiting \
+			to be sent, defaults to ``2 * concurrency``
+		:type max_pending: int, optional
+		:param deadline: Deadline (or cancellation token) of the batch, see \
+			:meth:`get`: not sent optimizations fail with \
+			``route4me.sdk.network.deadline_exceeded`` or \
+			``route4me.sdk.cancelled``
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: New optimizations by index in \
+			:paramref:`~create_many.optimizations` (in order of submission), \
+			with errors of failed requests in \
+			:attr:`~route4me.sdk.utils.BatchResult.errors`
+		:rtype: ~route4me.sdk.utils.BatchResult
+		"""
+		codec = self.__nc.json_codec
+
+		def serialize(optimization_data):
+			return codec.dumps(_raw(optimization_data))
+
+		def send(body):
+			# already encoded JSON is sent as is
+			return self.create(body, optimized_callback_url=optimized_callback_url)
+
+		with deadline_scope(deadline):
+			return pipeline(
+				optimizations,
+				send,
+				concurrency,
+				prepare=serialize,
+				max_pending=max_pending,
+			)
+
+	def create_split(
+		self,
+		optimization_data,
+		max_addresses,
+		method=KMEANS,
+		concurrency=4,
+		optimized_callback_url=None,
+		timeout=None,
+		poll=None,
+		deadline=None,
+	):
+		"""
+		Create an oversized optimization as several smaller ones: addresses
+		are partitioned into geographic clusters (see
+		:func:`~route4me.sdk._internals.splitting.split_optimization`), parts
+		are created in parallel (see :meth:`create_many`), solved (see
+		:meth:`wait_until_done_many`) and merged back into one optimization.
+
+		Parts, that are not solved in time, are merged as created (without
+		routes): the merged optimization stays in progress then.
+
+		.. code-block:: python
+
+			opt = r4m.optimizations.create_split(data, max_addresses=500)
+			for route in opt.raw['routes']:
+				...
+			part_IDs = opt.raw['optimization_problem_ids']
+
+		:param optimization_data: Optimization data
+		:type optimization_data: ~route4me.sdk.models.Optimization or dict
+		:param max_addresses: Max number of addresses (not counting depots) \
+			per part
+		:type max_addresses: int
+		:param method: Clustering method: \
+			:data:`~route4me.sdk._internals.splitting.KMEANS` or \
+			:data:`~route4me.sdk._internals.splitting.GRID`
+		:type method: str, optional
+		:param concurrency: Max number of simultaneous requests, defaults to 4
+		:type concurrency: int, optional
+		:param optimized_callback_url: Optimization done callback URL of \
+			every part, see :meth:`create`
+		:type optimized_callback_url: str, optional
+		:param timeout: Max time to wait for the parts to be solved, \
+			seconds, defaults to no limit
+		:type timeout: float, optional
+		:param poll: Intervals between polls of the parts
+		:type poll: ~route4me.sdk._internals.polling.PollPolicy, optional
+		:param deadline: Deadline of the creation and the waiting, see \
+			:meth:`create_many`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Merged optimization (without ID of its own, see \
+			:func:`~route4me.sdk._internals.splitting.merge_optimizations`)
+		:rtype: ~route4me.sdk.models.Optimization
+
+		:raises ValueError: when an address has no coordinates
+		:raises ~route4me.sdk.errors.Route4MeError: \
+			``route4me.sdk.optimization.split_failed``, if some parts are \
+			not created: IDs of created ones (to remove them or to retry \
+			the rest) and errors by part are in the details
+		"""
+		parts = split_optimization(optimization_data, max_addresses, method=method)
+
+		with deadline_scope(deadline):
+			res = self.create_many(
+				parts,
+				concurrency=concurrency,
+				optimized_callback_url=optimized_callback_url,
+			)
+			if res.errors:
+				raise Route4MeError(
+					'{} of {} parts of the optimization are not created'.format(len(res.errors), len(parts)),
+					code='route4me.sdk.optimization.split_failed',
+					details={
+						'created': [opt.ID for opt in res.values()],
+						'errors': dict(res.errors),
+					},
+				)
+
+			created = [res[i] for i in range(len(parts))]
+			# parts are queued: routes are known, when they are solved
+			solved = self.wait_until_done_many(
+				[opt.ID for opt in created],
+				timeout=timeout,
+				poll=poll,
+				concurrency=concurrency,
+			)
+
+		return merge_optimizations([solved.get(opt.ID, opt) for opt in created])
+
+	def create_async_with_callback(self, optimization_data, receiver, deadline=None):
+		"""
+		Create a new optimization, that reports its completion to the
+		callback receiver (instead of polling, see :meth:`wait_until_done`)
+
+		.. code-block:: python
+
+			with CallbackServer(public_url=PUBLIC_URL) as srv:
+				future = r4m.optimizations.create_async_with_callback(data, srv.receiver)
+				done = future.result(timeout=600)
+				opt = r4m.optimizations.get(done.ID)
+
+		:param optimization_data: Optimization data
+		:type optimization_data: ~route4me.sdk.models.Optimization or dict
+		:param receiver: Receiver of callbacks, its \
+			:attr:`~route4me.sdk._internals.callbacks.CallbackReceiver.callback_url` \
+			is passed as ``optimized_callback_url``
+		:type receiver: ~route4me.sdk._internals.callbacks.CallbackReceiver
+		:param deadline: Deadline of the creation, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Future, resolved with \
+			:class:`~route4me.sdk._internals.callbacks.OptimizationCallback` \
+			(ID and the final state), when the optimization is solved or \
+			failed
+		:rtype: concurrent.futures.Future
+		:raises ~route4me.sdk.errors.Route4MeError: if the optimization is \
+			not created
+		"""
+		opt = self.create(
+			optimization_data,
+			optimized_callback_url=receiver.callback_url,
+			deadline=deadline,
+		)
+
+		future = receiver.expect(opt.ID)
+		state = _state_of(opt)
+		if _is_done(state):
+			# solved immediately, the callback could be not sent at all
+			receiver.resolve(OptimizationCallback(
+				opt.ID,
+				OptimizationStateEnum(state),
+				None,
+				{'optimization_problem_id': opt.ID, 'state': state},
+			))
+		return future
+
+	def get(self, ID, deadline=None):
 		"""
 		GET a single optimization by ID.
 
@@ -111,6 +436,11 @@ def get(self, ID):
 
 		:param ID: Optimization Problem ID
 		:type ID: str
+		:param deadline: Deadline (or cancellation token) of the call, or \
+			the remaining budget in seconds, see \
+			:class:`~route4me.sdk._internals.timeouts.Deadline`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
 		:returns: Optimization data
 		:rtype: ~route4me.sdk.models.Optimization
 
@@ -119,16 +449,111 @@ def get(self, ID):
 		"""
 
 		res = self.__nc.get(
-			'/api.v4/optimization_problem.php',
-			subdomain='www',
+			_PATH,
+			subdomain=_SUBDOMAIN,
 			query={
 				'optimization_problem_id': ID,
-			}
+			},
+			cache_ttl=_cache_ttl,
+			deadline=deadline,
 		)
 
 		return Optimization(res)
 
-	def list(self, states=None, limit=None, offset=None):
+	def iter_addresses(self, ID, skip=HEAVY_KEYS, meta=None, chunk_size=65536, deadline=None):
+		"""
+		GET addresses of a single optimization, parsing the response while it
+		is downloaded.
+
+		Unlike :meth:`get`, the whole response is never kept in memory: only
+		the current address. Heavy subtrees (``directions``,
+		``path_to_next`` of addresses, ``routes`` of the optimization) are
+		skipped without decoding by default:
+
+		.. code-block:: python
+
+			meta = {}
+			for addr in r4m.optimizations.iter_addresses(ID, meta=meta):
+				print(addr.ID, addr.address)
+			print(meta['state'])
+
+		:param ID: Optimization Problem ID
+		:type ID: str
+		:param skip: Keys to skip in addresses and in the optimization, pass \
+			an empty set to get complete addresses, defaults to \
+			:data:`~route4me.sdk._internals.jsonstream.HEAVY_KEYS`
+		:type skip: set(str), optional
+		:param meta: Receives other fields of the optimization (raw data), \
+			available after the iteration
+		:type meta: dict, optional
+		:param chunk_size: Size of downloaded chunks (bytes), defaults to \
+			64 KiB
+		:type chunk_size: int, optional
+		:param deadline: Deadline of the call (downloading included), see \
+			:meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Generator of addresses
+		:rtype: generator(~route4me.sdk.models.Address)
+
+		:raises ~route4me.sdk.errors.Route4MeEntityNotFoundError: if \
+			optimization was not found
+		"""
+		chunks = self.__nc.get_stream(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query={
+				'optimization_problem_id': ID,
+			},
+			chunk_size=chunk_size,
+			deadline=deadline,
+		)
+
+		for raw in iter_array_items(chunks, 'addresses', skip=skip, meta=meta):
+			yield Address(raw)
+
+	def get_many(self, IDs, concurrency=8, timeout=None, deadline=None):
+		"""
+		GET many optimizations by IDs, sending up to
+		:paramref:`~get_many.concurrency` requests at the same time.
+
+		Requests share pooled connections of the client, so set
+		``pool_maxsize`` of the client (see
+		:class:`~route4me.sdk._internals.net.NetworkClient`) not less than
+		:paramref:`~get_many.concurrency`.
+
+		A failed request doesn't abort the batch:
+
+		.. code-block:: python
+
+			res = r4m.optimizations.get_many(IDs, concurrency=16)
+			for ID, opt in res.items():
+				print(ID, opt.state)
+			for ID, exc in res.errors.items():
+				print(ID, 'failed', exc)
+
+		:param IDs: Optimization Problem IDs
+		:type IDs: list(str)
+		:param concurrency: Max number of simultaneous requests, defaults to 8
+		:type concurrency: int, optional
+		:param timeout: Deadline of the whole batch (seconds): requests, \
+			not completed in time, fail with \
+			``route4me.sdk.network.deadline_exceeded`` or a timeout
+		:type timeout: float, optional
+		:param deadline: Deadline (or cancellation token) of the caller, \
+			see :meth:`get`: after its cancellation not started requests \
+			fail with ``route4me.sdk.cancelled``
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Optimizations by ID (in order of :paramref:`~get_many.IDs`), \
+			with errors of failed requests in \
+			:attr:`~route4me.sdk.utils.BatchResult.errors`
+		:rtype: ~route4me.sdk.utils.BatchResult
+		"""
+		with deadline_scope(deadline), deadline_scope(timeout):
+			return map_bounded(self.get, IDs, concurrency)
+
+	def list(self, states=None, limit=None, offset=None, deadline=None):
 		"""
 		GET all optimizations belonging to a user.
 
@@ -146,25 +571,228 @@ def list(self, states=None, limit=None, offset=None):
 		:type limit: int, optional
 		:param offset: Search starting position, defaults to None
 		:type offset: int, optional
+		:param deadline: Deadline of the call, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
 		"""
-		qs = {}
-		add_limit_offset_to_query_string(limit, offset, qs)
-
-		if states:
-			s = OptimizationStateEnum.parse_many(states)
-			qs['state'] = ','.join([str(i.value) for i in s])
+		qs = _list_query(states, limit, offset)
 
 		res = self.__nc.get(
-			'/api.v4/optimization_problem.php',
-			subdomain='www',
-			query=qs
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query=qs,
+			# lists change with states of optimizations, and are polled by
+			# wait_until_done_many: only revalidated (ETag), never reused
+			cache_ttl=0,
+			deadline=deadline,
 		)
 
+		return _paged_list(res, limit, offset)
+
+	def iter_all(self, states=None, page_size=100, prefetch=False, deadline=None):
+		"""
+		Enumerates ALL optimizations belonging to a user, page by page.
+
+		Pages are requested using :meth:`list` while the generator is consumed,
+		so only one page is kept in memory:
+
+		.. code-block:: python
+
+			for opt in r4m.optimizations.iter_all(page_size=500, prefetch=True):
+				print(opt.ID, opt.state)
+
+		:param states: Filter by states, see :meth:`list`, defaults to None
+		:type states: str or list(str) or list(OptimizationStateEnum), optional
+		:param page_size: How many optimizations to request at once, \
+			defaults to 100
+		:type page_size: int, optional
+		:param prefetch: Request the next page in a background thread, while \
+			the current one is consumed, defaults to :data:`False`
+		:type prefetch: bool, optional
+		:param deadline: Deadline of all pages, see :meth:`get`: no pages \
+			are requested after it
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Generator of optimizations
+		:rtype: generator(~route4me.sdk.models.Optimization)
+		"""
+		# the budget starts now, not on the first page
+		deadline = Deadline.of(deadline)
+
+		def fetch_page(limit, offset):
+			return self.list(states=states, limit=limit, offset=offset, deadline=deadline)
+
+		return iterate_pages(fetch_page, page_size, prefetch=prefetch)
+
+	def list_all(self, states=None, workers=4, page_size=100, timeout=None, deadline=None):
+		"""
+		GET ALL optimizations belonging to a user, requesting pages in
+		parallel.
+
+		The first page is requested to get the total count, then the rest
+		pages are requested in parallel, using a pool of
+		:paramref:`~list_all.workers` threads. Optimizations are returned in
+		the same order as :meth:`iter_all` enumerates them.
+
+		:param states: Filter by states, see :meth:`list`, defaults to None
+		:type states: str or list(str) or list(OptimizationStateEnum), optional
+		:param workers: Max number of pages requested at the same time, \
+			defaults to 4
+		:type workers: int, optional
+		:param page_size: How many optimizations to request at once, \
+			defaults to 100
+		:type page_size: int, optional
+		:param timeout: Deadline of all pages (seconds), retries included
+		:type timeout: float, optional
+		:param deadline: Deadline (or cancellation token) of the caller, \
+			see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: All optimizations
+		:rtype: ~route4me.sdk.utils.PagedList
+
+		:raises ~route4me.sdk.errors.Route4MeError: if a page failed after \
+			all retries of the client (see \
+			:class:`~route4me.sdk._internals.retry.RetryPolicy`)
+		"""
+		def fetch_page(limit, offset):
+			return self.list(states=states, limit=limit, offset=offset)
+
+		with deadline_scope(deadline), deadline_scope(timeout):
+			items = fetch_all_pages(
+				fetch_page,
+				page_size,
+				workers=workers,
+			)
+
 		return PagedList(
-			total=res['totalRecords'],
-			limit=limit,
-			offset=offset,
-			items=[Optimization(item) for item in res['optimizations']],
+			total=len(items),
+			items=items,
+		)
+
+	def wait_until_done(self, ID, timeout=None, poll=None, deadline=None):
+		"""
+		Waits until the optimization is solved (or failed), polling it with
+		intervals, that depend on its state (see
+		:class:`~route4me.sdk._internals.polling.PollPolicy`)
+
+		.. code-block:: python
+
+			opt = r4m.optimizations.create(data)
+			opt = r4m.optimizations.wait_until_done(opt.ID, timeout=600)
+			if opt.state == OptimizationStateEnum.ERROR:
+				...
+
+		:param ID: Optimization Problem ID
+		:type ID: str
+		:param timeout: Max time to wait, seconds, defaults to no limit
+		:type timeout: float, optional
+		:param poll: Intervals between polls
+		:type poll: ~route4me.sdk._internals.polling.PollPolicy, optional
+		:param deadline: Deadline (or cancellation token) of the caller, \
+			see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:returns: Optimization in the state ``OPTIMIZED`` or ``ERROR``
+		:rtype: ~route4me.sdk.models.Optimization
+
+		:raises ~route4me.sdk.errors.Route4MeError: \
+			``route4me.sdk.wait_timeout``, if the optimization is not done \
+			in time
+		:raises ~route4me.sdk.errors.Route4MeEntityNotFoundError: if \
+			optimization was not found
+		"""
+		deadline = derive_deadline(timeout, Deadline.of(deadline), current_deadline())
+
+		return poll_until(
+			lambda: self.get(ID, deadline=deadline),
+			_state_of,
+			_is_done,
+			policy=poll,
+			deadline=deadline,
+		)
+
+	def wait_until_done_many(self, IDs, timeout=None, poll=None, deadline=None, concurrency=8):
+		"""
+		Waits until all the optimizations are solved (or failed)
+
+		Optimizations are polled in bulk: every poll lists all optimizations
+		in progress (see :meth:`list_all`), only finished ones are requested
+		one by one (see :meth:`get_many`). Intervals between polls depend
+		on states of the optimizations, that are still in progress.
+
+		Failures of single optimizations do not stop the waiting:
+
+		.. code-block:: python
+
+			res = r4m.optimizations.wait_until_done_many(IDs, timeout=600)
+			for ID, opt in res.items():
+				print(ID, opt.state)
+			for ID, exc in res.errors.items():
+				print(ID, 'not done', exc.code)
+
+		:param IDs: Optimization Problem IDs
+		:type IDs: list(str)
+		:param timeout: Max time to wait, seconds, defaults to no limit
+		:type timeout: float, optional
+		:param poll: Intervals between polls
+		:type poll: ~route4me.sdk._internals.polling.PollPolicy, optional
+		:param deadline: Deadline (or cancellation token) of the caller, \
+			see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
+		:param concurrency: Max number of simultaneous requests of finished \
+			optimizations, defaults to 8
+		:type concurrency: int, optional
+		:returns: Optimizations in the state ``OPTIMIZED`` or ``ERROR`` by \
+			ID (in order of :paramref:`~wait_until_done_many.IDs`), errors \
+			of not found optimizations and ``route4me.sdk.wait_timeout`` \
+			of not done in time in \
+			:attr:`~route4me.sdk.utils.BatchResult.errors`
+		:rtype: ~route4me.sdk.utils.BatchResult
+
+		:raises ~route4me.sdk.errors.Route4MeError: if the list of \
+			optimizations in progress can not be requested
+		"""
+		IDs = unique(IDs)
+		done = {}
+		errors = {}
+		pending = list(IDs)
+		schedule = PollSchedule(poll)
+
+		with deadline_scope(deadline), deadline_scope(timeout) as d:
+			while True:
+				in_progress = dict(
+					(o.ID, _state_of(o))
+					for o in self.list_all(states=_IN_PROGRESS_STATES)
+				)
+
+				finished = [ID for ID in pending if ID not in in_progress]
+				fetched = self.get_many(finished, concurrency=concurrency) if finished else {}
+				for ID in finished:
+					if ID in fetched.errors:
+						errors[ID] = fetched.errors[ID]
+					elif _is_done(_state_of(fetched[ID])):
+						done[ID] = fetched[ID]
+					else:
+						# not listed yet, or restarted
+						in_progress[ID] = _state_of(fetched[ID])
+
+				pending = [ID for ID in pending if ID not in done and ID not in errors]
+				if not pending:
+					break
+
+				delay = schedule.next_delay(*[in_progress[ID] for ID in pending])
+				try:
+					sleep_or_give_up(delay, d)
+				except Route4MeError:
+					for ID in pending:
+						errors[ID] = wait_timeout_error(d, state=in_progress[ID])
+					break
+
+		return BatchResult(
+			((ID, done[ID]) for ID in IDs if ID in done),
+			((ID, errors[ID]) for ID in IDs if ID in errors),
 		)
 
 	def update(
@@ -174,6 +802,7 @@ def update(
 		reoptimize=False,
 		# TODO: try to implement or remove!
 		# optimized_callback_url=None,
+		deadline=None,
 	):
 		"""
 		Update existing optimization problem, by changing some parameters or
@@ -194,25 +823,26 @@ def update(
 		:param reoptimize: Whether to re-run optimization, defaults to \
 			:data:`False`
 		:type reoptimize: bool, optional
+		:param deadline: Deadline of the call, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
 		:returns: Updated optimization
 		:rtype: ~route4me.sdk.models.Optimization
 		"""
-		query = {
-			'optimization_problem_id': ID,
-			'reoptimize': bool201(reoptimize),
-		}
+		query = _update_query(ID, reoptimize)
 
-		data = optimization_data if optimization_data else {}
+		data = _raw(optimization_data) if optimization_data else {}
 
 		res = self.__nc.put(
-			'/api.v4/optimization_problem.php',
-			subdomain='www',
+			_PATH,
+			subdomain=_SUBDOMAIN,
 			query=query,
 			data=data,
+			deadline=deadline,
 		)
 		return Optimization(res)
 
-	def remove(self, ID):
+	def remove(self, ID, deadline=None):
 		"""
 		Remove an existing optimization belonging to an user.
 
@@ -222,6 +852,9 @@ def remove(self, ID):
 
 		:param ID: Optimization Problem ID
 		:type ID: str
+		:param deadline: Deadline of the call, see :meth:`get`
+		:type deadline: ~route4me.sdk._internals.timeouts.Deadline or \
+			float, optional
 		:returns: Always :data:`True`
 		:rtype: bool
 
@@ -232,34 +865,24 @@ def remove(self, ID):
 		"""
 
 		res = self.__nc.delete(
-			'/api.v4/optimization_problem.php',
-			subdomain='www',
+			_PATH,
+			subdomain=_SUBDOMAIN,
 			query={
 				'optimization_problem_id': ID,
-			}
+			},
+			deadline=deadline,
 		)
 
-		if not pydash.get(res, 'status'):
-			# TODO: this exception should contain METHOD and URL fields
-			raise Route4MeApiError(
-				'Not expected response',
-				code='route4me.sdk.api_error',
-				details={
-					'res': res,
-				},
-				method='DELETE',
-				# url=''
-			)
-
-		return True
+		return _check_removed(res)
 
 	def reoptimize(
 		self,
 		ID,
 		# optimization_data=None,
 		# optimized_callback_url=None,
+		deadline=None,
 	):
 		"""
 		An alias for :meth:`.update`, with ``reoptimize`` set to :data:`True`
 		"""
-		return self.update(ID=ID, reoptimize=True)
+		return self.update(ID=ID, reoptimize=True, deadline=deadline)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous (:mod:`asyncio`) twin of the
+:mod:`~route4me.sdk.endpoints.optimizations` endpoint.
+
+All methods are coroutines and return the same models as the synchronous
+endpoint.
+
+.. seealso:: https://route4me.io/docs/#optimizations
+
+"""
+
+from ..models import Optimization
+
+from route4me.sdk._internals.aionet import AsyncNetworkClient
+
+from .optimizations import _PATH
+from .optimizations import _SUBDOMAIN
+from .optimizations import _raw
+from .optimizations import _create_query
+from .optimizations import _list_query
+from .optimizations import _paged_list
+from .optimizations import _update_query
+from .optimizations import _check_removed
+
+
+class AsyncOptimizations(object):
+	"""
+	Optimizations endpoint (async)
+
+	See :class:`~route4me.sdk.endpoints.optimizations.Optimizations` for the
+	description of methods and parameters. ``deadline`` (a deadline,
+	cancellation token or the remaining budget in seconds) applies to all
+	attempts of the call, as in the synchronous endpoint.
+	"""
+
+	def __init__(self, api_key=None, _network_client=None):
+		nc = _network_client
+		if nc is None:
+			nc = AsyncNetworkClient(api_key)
+		self.__nc = nc
+
+	async def create(self, optimization_data, optimized_callback_url=None, deadline=None):
+		"""
+		Create a new optimization through the Route4Me API
+
+		:returns: New optimization
+		:rtype: ~route4me.sdk.models.Optimization
+		"""
+		res = await self.__nc.post(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query=_create_query(optimized_callback_url),
+			data=_raw(optimization_data),
+			deadline=deadline,
+		)
+		return Optimization(res)
+
+	async def get(self, ID, deadline=None):
+		"""
+		GET a single optimization by ID.
+
+		:returns: Optimization data
+		:rtype: ~route4me.sdk.models.Optimization
+		"""
+		res = await self.__nc.get(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query={
+				'optimization_problem_id': ID,
+			},
+			deadline=deadline,
+		)
+		return Optimization(res)
+
+	async def list(self, states=None, limit=None, offset=None, deadline=None):
+		"""
+		GET all optimizations belonging to a user.
+
+		:returns: One page of optimizations
+		:rtype: ~route4me.sdk.utils.PagedList
+		"""
+		res = await self.__nc.get(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query=_list_query(states, limit, offset),
+			deadline=deadline,
+		)
+		return _paged_list(res, limit, offset)
+
+	async def update(self, ID, optimization_data=None, reoptimize=False, deadline=None):
+		"""
+		Update existing optimization problem
+
+		:returns: Updated optimization
+		:rtype: ~route4me.sdk.models.Optimization
+		"""
+		data = _raw(optimization_data) if optimization_data else {}
+
+		res = await self.__nc.put(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query=_update_query(ID, reoptimize),
+			data=data,
+			deadline=deadline,
+		)
+		return Optimization(res)
+
+	async def remove(self, ID, deadline=None):
+		"""
+		Remove an existing optimization belonging to an user.
+
+		:returns: Always :data:`True`
+		:rtype: bool
+		"""
+		res = await self.__nc.delete(
+			_PATH,
+			subdomain=_SUBDOMAIN,
+			query={
+				'optimization_problem_id': ID,
+			},
+			deadline=deadline,
+		)
+		return _check_removed(res)
+
+	async def reoptimize(self, ID, deadline=None):
+		"""
+		An alias for :meth:`.update`, with ``reoptimize`` set to :data:`True`
+		"""
+		return await self.update(ID=ID, reoptimize=True, deadline=deadline)
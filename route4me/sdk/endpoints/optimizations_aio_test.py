@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from route4me.sdk.self_test import load_json  # noqa: E402
+from route4me.sdk.self_test_aio import StubApiServer  # noqa: E402
+from route4me.sdk.self_test_aio import run  # noqa: E402
+
+from route4me.sdk.aio import AsyncApiClient  # noqa: E402
+from route4me.sdk.utils import PagedList  # noqa: E402
+
+from .optimizations_aio import AsyncOptimizations  # noqa: E402
+
+from ..models import Optimization  # noqa: E402
+from ..models import OptimizationStateEnum  # noqa: E402
+
+from ..errors import Route4MeError  # noqa: E402
+from ..errors import Route4MeApiError  # noqa: E402
+
+from route4me.sdk._internals.timeouts import Deadline  # noqa: E402
+
+
+def call(method_name, response, *args, **kwargs):
+	"""
+	Runs one endpoint method against a stub server, returns the result and
+	the request received by the server
+	"""
+	async def scenario():
+		async with StubApiServer() as srv:
+			srv.add_response(data=response)
+
+			async with AsyncApiClient(api_key='test', **srv.client_options) as r4m:
+				res = await getattr(r4m.optimizations, method_name)(*args, **kwargs)
+
+			return res, srv.requests[-1]
+
+	return run(scenario())
+
+
+class TestAsyncOptimizations(object):
+	def test_ctor(self):
+		ns = AsyncOptimizations(api_key='11111111111111111111111111111111')
+
+		assert ns is not None
+
+	def test_create(self):
+		o = Optimization()
+		o.state = OptimizationStateEnum.MATRIX_PROCESSING
+
+		res, req = call(
+			'create',
+			{'optimization_problem_id': '1EDB78F63556D99336E06A13A34CF139', 'state': 2},
+			o,
+			optimized_callback_url='https://callback.route4me.com/callback?q=1',
+		)
+
+		assert req['method'] == 'POST'
+		assert req['path'] == '/api.v4/optimization_problem.php'
+		assert req['json'] == dict(o)
+		assert req['query']['optimized_callback_url'] == 'https://callback.route4me.com/callback?q=1'
+
+		assert isinstance(res, Optimization)
+		assert res.ID == '1EDB78F63556D99336E06A13A34CF139'
+		assert res.state == OptimizationStateEnum.MATRIX_PROCESSING
+
+	def test_get(self):
+		sample_response_data = load_json(
+			'submodules', 'route4me-api-data-examples', 'Optimizations',
+			'get_response.json'
+		)
+
+		res, req = call('get', sample_response_data, '07372F2CF3814EC6DFFAFE92E22771AA')
+
+		assert req['method'] == 'GET'
+		assert req['query']['optimization_problem_id'] == '07372F2CF3814EC6DFFAFE92E22771AA'
+		assert req['json'] is None
+
+		assert isinstance(res, Optimization)
+		assert res.ID == '07372F2CF3814EC6DFFAFE92E22771AA'
+		assert res == Optimization(sample_response_data)
+
+	def test_list(self):
+		sample_response_data = load_json(
+			'submodules', 'route4me-api-data-examples', 'Optimizations',
+			'list_response.json'
+		)
+
+		res, req = call(
+			'list',
+			sample_response_data,
+			states=[OptimizationStateEnum.INITIAL, OptimizationStateEnum.OPTIMIZED],
+			limit=10,
+			offset=20,
+		)
+
+		assert req['method'] == 'GET'
+		assert req['query']['state'] == '1,4'
+		assert req['query']['limit'] == '10'
+		assert req['query']['offset'] == '20'
+
+		assert isinstance(res, PagedList)
+		assert res.total == 447
+		assert res.limit == 10
+		assert res.offset == 20
+		assert isinstance(res[0], Optimization)
+
+	@pytest.mark.parametrize('method_name, reoptimize', [
+		('update', '0'),
+		('reoptimize', '1'),
+	])
+	def test_update(self, method_name, reoptimize):
+		res, req = call(
+			method_name,
+			{'optimization_problem_id': '07372F2CF3814EC6DFFAFE92E22771AA'},
+			'07372F2CF3814EC6DFFAFE92E22771AA',
+		)
+
+		assert req['method'] == 'PUT'
+		assert req['query']['optimization_problem_id'] == '07372F2CF3814EC6DFFAFE92E22771AA'
+		assert req['query']['reoptimize'] == reoptimize
+		assert req['json'] == {}
+
+		assert isinstance(res, Optimization)
+
+	def test_remove(self):
+		res, req = call('remove', {'status': True}, 'DE62B03510AB5A6A876093F30F6C7BF5')
+
+		assert req['method'] == 'DELETE'
+		assert req['query']['optimization_problem_id'] == 'DE62B03510AB5A6A876093F30F6C7BF5'
+		assert res is True
+
+	def test_remove_failed(self):
+		with pytest.raises(Route4MeApiError):
+			call('remove', None, 'DE62B03510AB5A6A876093F30F6C7BF5')
+
+	@pytest.mark.parametrize('method_name, args', [
+		('create', ({},)),
+		('get', ('A',)),
+		('list', ()),
+		('update', ('A', {})),
+		('remove', ('A',)),
+		('reoptimize', ('A',)),
+	])
+	def test_deadline(self, method_name, args):
+		token = Deadline()
+		token.cancel()
+
+		async def scenario():
+			async with StubApiServer() as srv:
+				srv.add_response(data={})
+
+				async with AsyncApiClient(api_key='test', **srv.client_options) as r4m:
+					with pytest.raises(Route4MeError) as exc_info:
+						await getattr(r4m.optimizations, method_name)(*args, deadline=token)
+
+				return exc_info.value, srv.requests
+
+		exc, requests = run(scenario())
+
+		assert exc.code == 'route4me.sdk.cancelled'
+		assert requests == []
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import json
 import datetime
 import logging
 
@@ -15,6 +16,12 @@
 import route4me.sdk.endpoints.optimizations as M
 
 from route4me.sdk.utils import PagedList
+from route4me.sdk.utils import BatchResult
+from route4me.sdk._internals.timeouts import Deadline
+from route4me.sdk._internals.cache import ResponseCache
+from route4me.sdk._internals.polling import PollPolicy
+from route4me.sdk._internals.callbacks import CallbackReceiver
+from route4me.sdk._internals.callbacks import OptimizationCallback
 
 from ..models import Address
 from ..models import Optimization
@@ -23,6 +30,7 @@
 from ..models import OptimizationStateEnum
 from ..models import OptimizationFactorEnum
 
+from ..errors import Route4MeError
 from ..errors import Route4MeApiError
 
 log = logging.getLogger(__name__)
@@ -201,6 +209,57 @@ def test_get(self):
 		assert isinstance(a0, Address)
 		assert a0.ID == 154456307
 
+	@pytest.mark.parametrize('state, exp', [
+		(OptimizationStateEnum.OPTIMIZED, float('inf')),
+		(OptimizationStateEnum.ERROR, float('inf')),
+		(OptimizationStateEnum.OPTIMIZING, 5),
+		(None, 5),
+	])
+	def test_get_cache_ttl(self, state, exp):
+		self.set_response(data={})
+
+		nc = mock.Mock(wraps=M.NetworkClient(api_key='test'))
+		r = Optimizations(_network_client=nc)
+		r.get('A')
+
+		cache_ttl = nc.get.call_args[1]['cache_ttl']
+		assert cache_ttl({'state': state and state.value}) == exp
+
+	def test_list_is_not_cached(self):
+		self.set_response(data={'optimizations': [], 'totalRecords': 0})
+		res = self.mock_fluent_request_class.return_value.send.return_value
+		res.text = '{"optimizations": [], "totalRecords": 0}'
+		res.headers = {}
+
+		nc = mock.Mock(wraps=M.NetworkClient(api_key='test', cache=ResponseCache()))
+		r = Optimizations(_network_client=nc)
+		r.list(states=[OptimizationStateEnum.OPTIMIZING])
+		r.list(states=[OptimizationStateEnum.OPTIMIZING])
+
+		assert nc.get.call_args[1]['cache_ttl'] == 0
+		assert self.mock_fluent_request_class.return_value.send.call_count == 2
+
+	def test_get_many(self):
+
+		r = Optimizations(api_key='test')
+
+		def fake_get(ID):
+			if ID == 'BAD':
+				raise Route4MeApiError('not found', status_code=404)
+			return Optimization({'optimization_problem_id': ID})
+
+		with mock.patch.object(r, 'get', side_effect=fake_get) as mock_get:
+			res = r.get_many(['A', 'BAD', 'B', 'A'], concurrency=2)
+
+		assert mock_get.call_count == 3
+
+		assert list(res.keys()) == ['A', 'B']
+		assert isinstance(res['A'], Optimization)
+		assert res['B'].ID == 'B'
+
+		assert list(res.errors.keys()) == ['BAD']
+		assert isinstance(res.errors['BAD'], Route4MeApiError)
+
 	def test_list_no_states(self):
 
 		sample_response_data = load_json(
@@ -286,6 +345,290 @@ def test_list_with_states(self):
 		res0 = res[0]
 		assert isinstance(res0, Optimization)
 
+	def test_iter_all(self):
+
+		sample_response_data = load_json(
+			# '..', '..', '..',
+			'submodules', 'route4me-api-data-examples', 'Optimizations',
+			'list_response.json'
+		)
+
+		self.set_response(data=sample_response_data)
+
+		r = Optimizations(api_key='test')
+
+		with mock.patch.object(r, 'list', wraps=r.list) as mock_list:
+			it = r.iter_all(states='1,4', page_size=2)
+			res = [next(it) for _ in range(3)]
+
+		mock_list.assert_has_calls([
+			mock.call(states='1,4', limit=2, offset=0, deadline=None),
+			mock.call(states='1,4', limit=2, offset=2, deadline=None),
+		])
+
+		mock_freq = self.last_request()
+		mock_freq.qs.assert_any_call({
+			'state': '1,4',
+			'limit': 2,
+			'offset': 2,
+		})
+
+		assert all(isinstance(o, Optimization) for o in res)
+		assert res[0].ID == '7EC3FC88737C29E93A54E88243ACBC77'
+		assert res[2].ID == '7EC3FC88737C29E93A54E88243ACBC77'
+
+	def test_iter_all_stops_on_cancellation(self):
+		self.set_response(data=load_json(
+			'submodules', 'route4me-api-data-examples', 'Optimizations',
+			'list_response.json'
+		))
+		token = Deadline()
+
+		r = Optimizations(api_key='test')
+		it = r.iter_all(page_size=2, deadline=token)
+		next(it)
+		token.cancel()
+
+		with pytest.raises(Route4MeError) as exc_info:
+			list(it)
+
+		assert exc_info.value.code == 'route4me.sdk.cancelled'
+		assert self.mock_fluent_request_class.return_value.send.call_count == 1
+
+	def test_get_many_cancelled(self):
+		token = Deadline()
+		token.cancel()
+
+		r = Optimizations(api_key='test')
+		res = r.get_many(['A', 'B'], deadline=token)
+
+		assert not res
+		assert [e.code for e in res.errors.values()] == ['route4me.sdk.cancelled'] * 2
+		assert not self.mock_fluent_request_class.return_value.send.called
+
+	def test_create_many(self):
+		self.set_response(data={'optimization_problem_id': 'A', 'state': 1})
+
+		def problems():
+			for i in range(5):
+				yield {'parameters': {'route_name': str(i)}}
+
+		r = Optimizations(api_key='test')
+		res = r.create_many(problems(), concurrency=2, optimized_callback_url='https://example.com/cb')
+
+		assert list(res.keys()) == [0, 1, 2, 3, 4]
+		assert all(isinstance(o, Optimization) for o in res.values())
+
+		mock_freq = self.last_request()
+		bodies = sorted(c[0][0] for c in mock_freq.json.call_args_list)
+		assert bodies == [
+			json.dumps({'parameters': {'route_name': str(i)}}, separators=(',', ':')).encode('utf-8')
+			for i in range(5)
+		]
+		mock_freq.qs.assert_any_call({'optimized_callback_url': 'https://example.com/cb'})
+
+	def test_create_many_failures(self):
+		r = Optimizations(api_key='test')
+
+		def fake_create(body, optimized_callback_url):
+			if b'BAD' in body:
+				raise Route4MeApiError('invalid', status_code=400)
+			return Optimization(json.loads(body.decode('utf-8')))
+
+		data = [{'optimization_problem_id': ID} for ID in ['A', 'BAD', 'B']]
+		with mock.patch.object(r, 'create', side_effect=fake_create):
+			res = r.create_many(data)
+
+		assert [o.ID for o in res.values()] == ['A', 'B']
+		assert list(res.errors.keys()) == [1]
+
+	@pytest.mark.parametrize('fail', [False, True])
+	def test_create_split(self, fail):
+		r = Optimizations(api_key='test')
+		data = {
+			'parameters': {'route_name': 'Shift'},
+			'addresses': [{'address': 'depot', 'lat': 1, 'lng': 1, 'is_depot': True}] + [
+				{'address': str(i), 'lat': 1 + (i % 2), 'lng': 1 + i * 0.0001}
+				for i in range(6)
+			],
+		}
+
+		def fake_create(body, optimized_callback_url):
+			raw = json.loads(body.decode('utf-8'))
+			if fail and '[2/2]' in raw['parameters']['route_name']:
+				raise Route4MeApiError('invalid', status_code=400)
+			raw['optimization_problem_id'] = raw['parameters']['route_name'][-4]
+			raw['state'] = 1
+			created[raw['optimization_problem_id']] = raw
+			return Optimization(raw)
+
+		def fake_wait(IDs, **kwargs):
+			# solved parts: routes are known
+			return BatchResult(
+				(ID, Optimization(dict(created[ID], state=4, routes=[{'route_id': ID}])))
+				for ID in IDs
+			)
+
+		created = {}
+
+		with mock.patch.object(r, 'create', side_effect=fake_create):
+			with mock.patch.object(r, 'wait_until_done_many', side_effect=fake_wait) as mock_wait:
+				if fail:
+					with pytest.raises(Route4MeError) as exc_info:
+						r.create_split(data, max_addresses=3)
+				else:
+					res = r.create_split(data, max_addresses=3, timeout=600)
+
+		if fail:
+			exc = exc_info.value
+			assert exc.code == 'route4me.sdk.optimization.split_failed'
+			assert exc.details['created'] == ['1']
+			assert list(exc.details['errors'].keys()) == [1]
+			assert not mock_wait.called
+			return
+
+		assert mock_wait.call_args[0][0] == ['1', '2']
+		assert mock_wait.call_args[1]['timeout'] == 600
+		assert res.ID is None
+		assert res.state == OptimizationStateEnum.OPTIMIZED
+		assert res.raw['optimization_problem_ids'] == ['1', '2']
+		assert res.raw['parameters']['route_name'] == 'Shift'
+		assert len(res.raw['routes']) == 2
+		names = [a['address'] for a in res.raw['addresses']]
+		assert names[0] == 'depot'
+		assert sorted(names[1:]) == [str(i) for i in range(6)]
+
+	def test_create_split_not_solved_in_time(self):
+		r = Optimizations(api_key='test')
+		data = {
+			'addresses': [{'address': 'depot', 'lat': 1, 'lng': 1, 'is_depot': True}] + [
+				{'address': str(i), 'lat': 1 + (i % 2), 'lng': 1 + i * 0.0001}
+				for i in range(6)
+			],
+		}
+		created = iter([
+			Optimization({'optimization_problem_id': 'A', 'state': 1}),
+			Optimization({'optimization_problem_id': 'B', 'state': 1}),
+		])
+		solved = Optimization({'optimization_problem_id': 'A', 'state': 4, 'routes': [{'route_id': 'A'}]})
+
+		with mock.patch.object(r, 'create', side_effect=lambda *a, **kw: next(created)):
+			with mock.patch.object(r, 'wait_until_done_many', return_value=BatchResult([('A', solved)])):
+				res = r.create_split(data, max_addresses=3, concurrency=1)
+
+		assert res.state == OptimizationStateEnum.INITIAL
+		assert res.raw['optimization_problem_ids'] == ['A', 'B']
+		assert res.raw['routes'] == [{'route_id': 'A'}]
+
+	@pytest.mark.parametrize('state, done', [(1, False), (4, True)])
+	def test_create_async_with_callback(self, state, done):
+		r = Optimizations(api_key='test')
+		receiver = CallbackReceiver(url='https://example.com/cb', secret='s')
+		opt = Optimization({'optimization_problem_id': 'A', 'state': state})
+
+		with mock.patch.object(r, 'create', return_value=opt) as mock_create:
+			future = r.create_async_with_callback({}, receiver)
+
+		mock_create.assert_called_once_with(
+			{},
+			optimized_callback_url='https://example.com/cb?token=s',
+			deadline=None,
+		)
+		assert future.done() is done
+
+		receiver.resolve(OptimizationCallback('A', OptimizationStateEnum.ERROR, None, {}))
+		assert future.result().ID == 'A'
+
+	@mock.patch('route4me.sdk._internals.polling.time.sleep')
+	def test_wait_until_done(self, mock_sleep):
+		r = Optimizations(api_key='test')
+
+		states = [1, 3, 3, 4]
+		opts = [Optimization({'optimization_problem_id': 'A', 'state': s}) for s in states]
+
+		with mock.patch.object(r, 'get', side_effect=opts) as mock_get:
+			res = r.wait_until_done('A', poll=PollPolicy(jitter=False))
+
+		assert res.state == OptimizationStateEnum.OPTIMIZED
+		assert mock_get.call_count == 4
+		mock_get.assert_called_with('A', deadline=None)
+		assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 5, 7.5]
+
+	def test_wait_until_done_timeout(self):
+		r = Optimizations(api_key='test')
+		opt = Optimization({'optimization_problem_id': 'A', 'state': 3})
+
+		with mock.patch.object(r, 'get', return_value=opt):
+			with pytest.raises(Route4MeError) as exc_info:
+				r.wait_until_done('A', timeout=0.01)
+
+		assert exc_info.value.code == 'route4me.sdk.wait_timeout'
+
+	@mock.patch('route4me.sdk._internals.polling.time.sleep')
+	def test_wait_until_done_many(self, mock_sleep):
+		r = Optimizations(api_key='test')
+
+		def opt(ID, state):
+			return Optimization({'optimization_problem_id': ID, 'state': state})
+
+		in_progress = [
+			[opt('A', 3), opt('B', 1), opt('X', 3)],
+			[opt('A', 3), opt('X', 3)],
+			[opt('X', 3)],
+		]
+
+		def fake_get(ID):
+			if ID == 'BAD':
+				raise Route4MeApiError('not found', status_code=404)
+			return opt(ID, 4 if ID != 'C' else 5)
+
+		with mock.patch.object(r, 'list_all', side_effect=in_progress) as mock_list_all:
+			with mock.patch.object(r, 'get', side_effect=fake_get) as mock_get:
+				res = r.wait_until_done_many(['A', 'B', 'C', 'BAD', 'A'], poll=PollPolicy(jitter=False))
+
+		assert mock_list_all.call_count == 3
+		mock_list_all.assert_called_with(states=M._IN_PROGRESS_STATES)
+		assert sorted(c[0][0] for c in mock_get.call_args_list) == ['A', 'B', 'BAD', 'C']
+		# the shortest interval of states in progress
+		assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 5]
+
+		assert list(res.keys()) == ['A', 'B', 'C']
+		assert res['C'].state == OptimizationStateEnum.ERROR
+		assert list(res.errors.keys()) == ['BAD']
+
+	def test_wait_until_done_many_timeout(self):
+		r = Optimizations(api_key='test')
+		listed = [Optimization({'optimization_problem_id': 'A', 'state': 2})]
+
+		with mock.patch.object(r, 'list_all', return_value=listed):
+			res = r.wait_until_done_many(['A'], timeout=0.01)
+
+		assert not res
+		exc = res.errors['A']
+		assert exc.code == 'route4me.sdk.wait_timeout'
+		assert exc.details['state'] == 2
+
+	def test_list_all(self):
+
+		r = Optimizations(api_key='test')
+
+		def fake_list(states, limit, offset):
+			items = [
+				Optimization({'optimization_problem_id': str(i)})
+				for i in range(offset, min(offset + limit, 25))
+			]
+			return PagedList(total=25, limit=limit, offset=offset, items=items)
+
+		with mock.patch.object(r, 'list', side_effect=fake_list) as mock_list:
+			res = r.list_all(states='1', page_size=10, workers=2)
+
+		assert mock_list.call_count == 3
+		mock_list.assert_any_call(states='1', limit=10, offset=20)
+
+		assert isinstance(res, PagedList)
+		assert res.total == 25
+		assert [o.ID for o in res] == [str(i) for i in range(25)]
+
 	def test_update(self):
 
 		sample_response_data = load_json(
@@ -400,5 +743,39 @@ def test_reoptimize(self):
 
 		mock_update.assert_called_once_with(
 			ID='07372F2CF3814EC6DFFAFE92E22771AA',
-			reoptimize=True
+			reoptimize=True,
+			deadline=None,
 		)
+
+	def test_iter_addresses(self):
+		data = {
+			'optimization_problem_id': 'A',
+			'state': 4,
+			'addresses': [
+				{'route_destination_id': 1, 'directions': [{'steps': []}], 'path_to_next': []},
+				{'route_destination_id': 2, 'directions': [], 'path_to_next': [{'lat': 1, 'lng': 2}]},
+			],
+			'routes': [{'route_id': 'R'}],
+		}
+		self.set_response(data=data)
+		self.last_request().send.return_value.iter_content.return_value = [json.dumps(data).encode('utf-8')]
+
+		r = Optimizations(api_key='test')
+		meta = {}
+		res = list(r.iter_addresses('A', meta=meta))
+
+		mock_freq = self.last_request()
+		mock_freq.method.assert_called_with('GET')
+		mock_freq.qs.assert_any_call({
+			'optimization_problem_id': 'A'
+		})
+		mock_freq.stream.assert_called_once_with()
+
+		assert [type(a) for a in res] == [Address, Address]
+		assert [a.ID for a in res] == [1, 2]
+		assert 'directions' not in res[0]
+		assert meta == {'optimization_problem_id': 'A', 'state': 4}
+
+		self.last_request().send.return_value.iter_content.return_value = [json.dumps(data).encode('utf-8')]
+		res = list(r.iter_addresses('A', skip=()))
+		assert res[1]['path_to_next'] == [{'lat': 1, 'lng': 2}]
@@ -55,6 +55,8 @@ class Route4MeNetworkError(Route4MeError):
 	- network timeout
 	- wrong redirects (Route4Me API doesn't send redirect responses)
 	- no connection, no path to route (DNS)
+	- open circuit, when the API method is unavailable (request is not sent)
+	- expired deadline of the call (request is not sent)
 
 	More details could be observed using :py:attr:`~.Route4MeError.code` and
 	:py:attr:`~.Route4MeError.details`
@@ -80,6 +82,7 @@ def __init__(
 		method=None,
 		url=None,
 		status_code=None,
+		headers=None,
 	):
 		m = '[{status}] {message}'.format(
 			status=status_code,
@@ -97,6 +100,11 @@ def __init__(
 		self.url = url
 		self.status_code = status_code
 
+		#: Headers of the response (``Retry-After`` etc.)
+		#:
+		#: :type: dict
+		self.headers = headers
+
 
 class Route4MeValidationError(Route4MeError):
 	"""
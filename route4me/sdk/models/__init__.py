@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import pydash
+try:
+	from collections.abc import MutableMapping
+except ImportError:  # pragma: no cover
+	# python 2
+	from collections import MutableMapping
 
 # reimport enums for convenience:
 from ..enums import AlgorithmTypeEnum
@@ -15,13 +19,58 @@
 
 from route4me.sdk._internals.decorators import dict_property
 from route4me.sdk._internals.decorators import dict_enum_property
+from route4me.sdk._internals.decorators import compile_getter
+from route4me.sdk._internals.decorators import compile_setter
 from route4me.sdk._internals import timestamp_and_seconds2datetime
 from route4me.sdk._internals import datetime2timestamp_and_seconds
 
 
-class BaseModel(dict):
+_get_route_date = compile_getter('parameters.route_date')
+_set_route_date = compile_setter('parameters.route_date')
+_get_route_time = compile_getter('parameters.route_time')
+_set_route_time = compile_setter('parameters.route_time')
+
+
+class BaseModel(MutableMapping):
+	"""
+	Base class for models: a *view* over raw data (parsed JSON).
+
+	Raw data is wrapped **by reference**, not copied: reading and changing the
+	model reads and changes the underlying :class:`dict` (and vice versa).
+	Models behave like read-write mappings, use :attr:`raw` to get the
+	underlying :class:`dict` (for example, to serialize it to JSON):
+
+	.. code-block:: python
+
+		raw = {'lat': 1.0}
+		addr = Address(raw)
+		addr.latitude = 2.0
+
+		assert addr.raw is raw
+		assert raw['lat'] == 2.0
+
+	.. versionchanged:: 0.1.0
+
+		Models are not :class:`dict` subclasses anymore:
+		``isinstance(model, dict)`` is :data:`False` and ``json.dumps(model)``
+		fails. Check for :class:`collections.abc.Mapping`, pass
+		:attr:`raw` where a :class:`dict` is expected, ``dict(model)`` makes
+		a copy.
+	"""
+
+	__slots__ = ('_raw', '_decoded', )
+
 	def __init__(self, raw=None):
-		super(BaseModel, self).__init__(raw)
+		if raw is None:
+			raw = {}
+		elif isinstance(raw, BaseModel):
+			raw = raw.raw
+
+		self._raw = raw
+
+		# memoized decoded values of properties (enums, datetimes), see
+		# :func:`~route4me.sdk._internals.decorators.decode_cached`
+		self._decoded = None
 
 	@property
 	def raw(self):
@@ -31,10 +80,51 @@ def raw(self):
 		:getter: Get, property is readonly
 		:rtype: dict
 		"""
-		return self
+		return self._raw
+
+	def copy(self):
+		"""
+		Creates a new model over a (shallow) copy of raw data
+
+		:rtype: BaseModel
+		"""
+		return type(self)(dict(self._raw))
+
+	def __getitem__(self, key):
+		return self._raw[key]
+
+	def __setitem__(self, key, value):
+		self._raw[key] = value
+
+	def __delitem__(self, key):
+		del self._raw[key]
+
+	def __contains__(self, key):
+		return key in self._raw
+
+	def __iter__(self):
+		return iter(self._raw)
+
+	def __len__(self):
+		return len(self._raw)
+
+	def get(self, key, default=None):
+		return self._raw.get(key, default)
+
+	def __repr__(self):
+		return '{cls}({raw!r})'.format(
+			cls=type(self).__name__,
+			raw=self._raw,
+		)
 
 
 class TiedListWrapper(list):
+	"""
+	List-like property of a model, tied to a list in raw data of the parent.
+
+	Items are returned as models (views over raw items), no raw data is
+	copied on item access and iteration.
+	"""
 	def __init__(self, parent, key, anytype):
 		self._parent = parent
 		self._key = key
@@ -58,7 +148,7 @@ def _raw(self):
 		:returns: A raw object from parent
 		:rtype: list
 		"""
-		return pydash.get(self._parent, self._key)
+		return self._parent.raw.get(self._key)
 
 	def link(self):
 		"""
@@ -79,7 +169,7 @@ def unlink(self):
 		self._parent.raw[self._key] = None
 
 	def unset(self):
-		self._parent.pop(self._key)
+		self._parent.raw.pop(self._key)
 
 	def __getitem__(self, index):
 		r = super(TiedListWrapper, self).__getitem__(index)
@@ -116,6 +206,8 @@ class Address(BaseModel):
 		- **schema**: https://github.com/route4me/route4me-json-schemas/blob/master/Address.dtd
 	"""
 
+	__slots__ = ()
+
 	def __init__(self, raw=None):
 		"""
 		Create instance **LOCALLY**.
@@ -291,6 +383,8 @@ class Optimization(BaseModel):
 
 	"""
 
+	__slots__ = ('_addresses', )
+
 	def __init__(self, raw=None):
 		"""
 		Create instance **LOCALLY**.
@@ -319,11 +413,7 @@ def __init__(self, raw=None):
 			}
 		super(Optimization, self).__init__(raw=raw)
 
-		self._addresses = TiedListWrapper(
-			parent=self,
-			key='addresses',
-			anytype=Address
-		)
+		self._addresses = None
 
 	# ==========================================================================
 
@@ -546,16 +636,29 @@ def route_datetime(self):
 		# So, we have UNIX timestamp (seconds) and seconds from day start. Lets
 		# create date
 
-		d = pydash.get(self.raw, 'parameters.route_date')
-		t = pydash.get(self.raw, 'parameters.route_time')
+		d = _get_route_date(self.raw)
+		t = _get_route_time(self.raw)
+
+		if d is None:
+			return None
 
-		return timestamp_and_seconds2datetime(d, t)
+		cache = self._decoded
+		if cache is None:
+			cache = self._decoded = {}
+		else:
+			c = cache.get('route_datetime')
+			if c is not None and c[0] is d and c[1] is t:
+				return c[2]
+
+		res = timestamp_and_seconds2datetime(d, t)
+		cache['route_datetime'] = (d, t, res)
+		return res
 
 	@route_datetime.setter
 	def route_datetime(self, value):
 		d, t = datetime2timestamp_and_seconds(value)
-		pydash.set_(self.raw, 'parameters.route_date', d)
-		pydash.set_(self.raw, 'parameters.route_time', t)
+		_set_route_date(self.raw, d)
+		_set_route_time(self.raw, t)
 
 	# ==========================================================================
 
@@ -566,6 +669,12 @@ def addresses(self):
 
 		<AUTO>
 		"""
+		if self._addresses is None:
+			self._addresses = TiedListWrapper(
+				parent=self,
+				key='addresses',
+				anytype=Address
+			)
 		return self._addresses
 
 	@property
@@ -578,7 +687,7 @@ def links(self):
 		:deleter: Del
 		:rtype: dict or None
 		"""
-		return pydash.get(self.raw, 'links')
+		return self.raw.get('links')
 
 	@links.deleter
 	def links(self, value):
@@ -1,14 +1,76 @@
 # -*- coding: utf-8 -*-
 
-# import pytest
+import json
+import datetime
+
 import mock
+import pytz
+import pytest
 
+from . import BaseModel
 from . import TiedListWrapper
 
 from . import Address
 from . import Optimization
 
 
+class TestBaseModel(object):
+	def test_wraps_raw_by_reference(self):
+		raw = {'lat': 1.0}
+		addr = Address(raw)
+
+		assert addr.raw is raw
+
+		addr.latitude = 2.0
+		assert raw['lat'] == 2.0
+
+		raw['lat'] = 3.0
+		assert addr.latitude == 3.0
+
+	def test_mapping_interface(self):
+		raw = {'a': 1}
+		m = BaseModel(raw)
+
+		m['b'] = 2
+		del m['a']
+
+		assert raw == {'b': 2}
+		assert 'b' in m
+		assert len(m) == 1
+		assert list(m) == ['b']
+		assert m.get('a') is None
+		assert m == {'b': 2}
+		assert dict(m) == {'b': 2}
+
+	def test_not_a_dict(self):
+		m = Address({'lat': 1.0})
+
+		assert not isinstance(m, dict)
+		with pytest.raises(TypeError):
+			json.dumps(m)
+		assert json.loads(json.dumps(m.raw)) == {'lat': 1.0}
+
+	def test_model_from_model(self):
+		raw = {'lat': 1.0}
+		addr = Address(Address(raw))
+
+		assert addr.raw is raw
+
+	def test_copy(self):
+		raw = {'lat': 1.0}
+		addr = Address(raw)
+
+		cp = addr.copy()
+		cp.latitude = 2.0
+
+		assert isinstance(cp, Address)
+		assert cp.raw is not raw
+		assert addr.latitude == 1.0
+
+	def test_repr(self):
+		assert repr(Address({'lat': 1.0})) == "Address({'lat': 1.0})"
+
+
 class TestTiedListWrapper_Existing_Address(object):
 
 	parent = None
@@ -62,6 +124,19 @@ def test_iterator_on_existance_parent(self):
 
 			cnt += 1
 
+	def test_items_are_views(self):
+		raw = self.parent.raw['addresses']
+
+		for i, a in enumerate(self.mylist):
+			assert a.raw is raw[i]
+
+		assert self.mylist[1].raw is raw[1]
+
+	def test_item_mutation_flows_to_parent(self):
+		self.parent.addresses[0].latitude = 11.0
+
+		assert self.parent.raw['addresses'][0]['lat'] == 11.0
+
 	def test_append_model(self):
 
 		addr = Address(raw={'route_destination_id': 123})
@@ -99,6 +174,37 @@ def test_unset(self):
 
 
 class TestOptimization(object):
+	def test_route_datetime_cached(self):
+		opt = Optimization({
+			'parameters': {
+				'route_date': 1504137600,
+				'route_time': 16281,
+			}
+		})
+
+		dt = opt.route_datetime
+
+		assert dt == datetime.datetime(2017, 8, 31, 4, 31, 21, tzinfo=pytz.utc)
+		assert opt.route_datetime is dt
+
+	def test_route_datetime_cache_invalidated(self):
+		opt = Optimization({
+			'parameters': {
+				'route_date': 1504137600,
+				'route_time': 16281,
+			}
+		})
+		opt.route_datetime
+
+		opt.raw['parameters']['route_time'] = 0
+		assert opt.route_datetime == datetime.datetime(2017, 8, 31, tzinfo=pytz.utc)
+
+		opt.route_datetime = datetime.datetime(2016, 6, 17, 1, 0, 0, tzinfo=pytz.utc)
+		assert opt.route_datetime == datetime.datetime(2016, 6, 17, 1, 0, 0, tzinfo=pytz.utc)
+
+		del opt.raw['parameters']['route_date']
+		assert opt.route_datetime is None
+
 	def test_links(self):
 		opt = Optimization(raw={
 
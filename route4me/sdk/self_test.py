@@ -5,6 +5,8 @@
 
 import mock
 
+from .errors import Route4MeApiError
+
 
 class MockerResourceWithNetworkClient(object):
 
@@ -39,6 +41,7 @@ def set_response(self, status_code=200, data=None, **qw):
 		x = mock.MagicMock()
 		x.status_code = status_code
 		x.json.return_value = data
+		x.content = json.dumps(data).encode('utf-8')
 
 		for k in qw:
 			x.k = qw[k]
@@ -49,6 +52,28 @@ def last_request(self):
 		return self.mock_fluent_request_class.return_value
 
 
+class FakeClock(object):
+	"""
+	Monotonic clock, that stands still until :attr:`now` is changed (see
+	the ``clock`` fixture)
+	"""
+
+	def __init__(self, now=1000.0):
+		self.now = now
+
+	def __call__(self):
+		return self.now
+
+
+def api_error(status_code, headers=None):
+	return Route4MeApiError(
+		'error',
+		code='route4me.sdk.api_error',
+		status_code=status_code,
+		headers=headers,
+	)
+
+
 def load_json(*path_names):
 	with open(os.path.join(
 		# '..', '..', '..',
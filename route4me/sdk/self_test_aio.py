@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import json
+import asyncio
+
+
+def run(coro):
+	"""
+	Runs the coroutine in a new event loop (:func:`asyncio.run` is not
+	available before Python 3.7)
+	"""
+	loop = asyncio.new_event_loop()
+	asyncio.set_event_loop(loop)
+	try:
+		return loop.run_until_complete(coro)
+	finally:
+		asyncio.set_event_loop(None)
+		loop.close()
+
+
+class StubApiServer(object):
+	"""
+	Local HTTP server, which pretends to be Route4Me API
+
+	Used to test async clients without access to the real API. Responses are
+	served in order of :meth:`add_response` calls (the last one is repeated),
+	received requests are stored in :attr:`requests`, the max number of
+	requests processed at the same time --- in :attr:`max_in_flight`.
+
+	.. code-block:: python
+
+		async with StubApiServer() as srv:
+			srv.add_response(data={'status': True})
+			nc = AsyncNetworkClient('key', **srv.client_options)
+	"""
+
+	def __init__(self):
+		from aiohttp import web
+		self._web = web
+
+		self.requests = []
+		self.in_flight = 0
+		self.max_in_flight = 0
+		self._responses = []
+		self._runner = None
+		self.port = None
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.stop()
+
+	@property
+	def client_options(self):
+		return {
+			'base_host': '127.0.0.1:{}'.format(self.port),
+			'scheme': 'http',
+			'subdomains': False,
+		}
+
+	def add_response(self, status_code=200, data=None, delay=0, headers=None):
+		self._responses.append((status_code, data, delay, headers))
+
+	async def start(self):
+		web = self._web
+
+		app = web.Application()
+		app.router.add_route('*', '/{tail:.*}', self._handle)
+
+		self._runner = web.AppRunner(app)
+		await self._runner.setup()
+
+		site = web.TCPSite(self._runner, '127.0.0.1', 0)
+		await site.start()
+
+		self.port = site._server.sockets[0].getsockname()[1]
+
+	async def stop(self):
+		if self._runner is not None:
+			await self._runner.cleanup()
+			self._runner = None
+
+	async def _handle(self, request):
+		self.in_flight += 1
+		self.max_in_flight = max(self.max_in_flight, self.in_flight)
+		try:
+			return await self._respond(request)
+		finally:
+			self.in_flight -= 1
+
+	async def _respond(self, request):
+		body = await request.text()
+
+		self.requests.append({
+			'method': request.method,
+			'path': request.path,
+			'query': dict(request.query),
+			'headers': dict(request.headers),
+			'json': json.loads(body) if body and request.content_type == 'application/json' else None,
+			'body': body,
+		})
+
+		if len(self._responses) > 1:
+			status_code, data, delay, headers = self._responses.pop(0)
+		elif self._responses:
+			status_code, data, delay, headers = self._responses[0]
+		else:
+			status_code, data, delay, headers = 200, None, 0, None
+
+		if delay:
+			await asyncio.sleep(delay)
+
+		return self._web.Response(
+			status=status_code,
+			text=json.dumps(data),
+			content_type='application/json',
+			headers=headers,
+		)
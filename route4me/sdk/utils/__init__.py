@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
+
 
 class PagedList(list):
 	"""
@@ -47,3 +49,37 @@ def offset(self):
 		:rtype: int
 		"""
 		return self._r4m_offset
+
+
+class BatchResult(OrderedDict):
+	"""
+	Result of a batch operation (many similar requests to the Route4Me API).
+
+	Maps keys (for example, IDs of requested entities) to results of
+	successful requests, in order of keys in the batch. Failed requests don't
+	abort the batch: errors are collected per key in :attr:`errors`.
+	"""
+	def __init__(self, items=None, errors=None):
+		super(BatchResult, self).__init__(() if items is None else items)
+
+		self._r4m_errors = OrderedDict(() if errors is None else errors)
+
+	@property
+	def errors(self):
+		"""
+		Errors of failed requests
+
+		:getter: Exceptions, by keys
+		:rtype: ~collections.OrderedDict
+		"""
+		return self._r4m_errors
+
+	@property
+	def ok(self):
+		"""
+		Whether all requests of the batch succeeded
+
+		:getter: :data:`True` when there are no errors
+		:rtype: bool
+		"""
+		return not self._r4m_errors
@@ -63,7 +63,6 @@ def rewrite_version():
 		'Operating System :: OS Independent',
 		'Programming Language :: Python',
 		'Programming Language :: Python :: 2',
-		'Programming Language :: Python :: 2.6',
 		'Programming Language :: Python :: 2.7',
 		'Programming Language :: Python :: 3',
 		'Programming Language :: Python :: 3.3',
@@ -80,14 +79,19 @@ def rewrite_version():
 		'six             ==1.10.0',
 		'requests        ==2.18.4',
 		'enum34          ==1.1.6',
-		'pydash          ==4.1.0',
-		'arrow           ==0.10.0',
+		'futures         ==3.1.1 ; python_version < "3.2"',
 	],
 	# include_package_data=True,
 
-	# extras_require={
-	#     'dev': REQUIREMENTS_DEV,
-	# },
+	extras_require={
+		# 'dev': REQUIREMENTS_DEV,
+		'async': [
+			'aiohttp         >=3.0 ; python_version >= "3.5"',
+		],
+		'matrix': [
+			'numpy           >=1.11',
+		],
+	},
 
 	# entry_points='''
 	#     [console_scripts]